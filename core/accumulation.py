@@ -0,0 +1,87 @@
+import numpy as np
+
+from .density import histogram2d
+
+
+class AccumulationBuffer:
+    """Dense float32 grid for trails and density maps that fade over time.
+
+    Replaces ``{(x, y): value}`` dicts: decay, adding new density and finding
+    the peak are whole-array operations, and cells that fade below the floor
+    are simply zero instead of deleted keys. The buffer is cleared whenever
+    the terminal size changes.
+    """
+
+    def __init__(self, width=0, height=0):
+        self.width = -1
+        self.height = -1
+        self._mirror = None
+        self.resize(width, height)
+
+    def resize(self, width, height):
+        """Match the terminal size (clears the buffer when it changes)"""
+        if (width, height) == (self.width, self.height):
+            return
+        self.width = width
+        self.height = height
+        self.data = np.zeros((height, width), dtype=np.float32)
+        self._mirror = None
+
+    def clear(self):
+        self.data.fill(0)
+
+    def decay(self, factor, floor=0.0):
+        """Multiply every cell by ``factor`` and zero the ones below ``floor``"""
+        data = self.data
+        data *= np.float32(factor)
+        if floor > 0:
+            data[data < floor] = 0
+
+    def add(self, values, scale=1.0):
+        """Add a dense ``(height, width)`` array, optionally scaled"""
+        if scale == 1.0:
+            self.data += values
+        else:
+            self.data += np.multiply(values, scale, dtype=np.float32)
+
+    def splat(self, xs, ys, weights=1.0):
+        """Add ``weights`` at the given cell coordinates (off-grid is ignored)"""
+        histogram2d(xs, ys, self.width, self.height, weights, out=self.data)
+
+    def peak(self, empty=1.0):
+        """Largest value, or ``empty`` when nothing has been accumulated"""
+        if not self.data.size:
+            return empty
+        peak = float(self.data.max())
+        return peak if peak > 0 else empty
+
+    def log_normalize(self, threshold=1.0, offset=5.0, gain=1.0, data=None):
+        """``log(v) / log(peak + offset) * gain`` clamped to 1.
+
+        Returns ``(norm, lit)`` where ``lit`` marks cells above ``threshold``;
+        ``norm`` is 0 elsewhere. ``data`` defaults to the buffer itself (pass
+        a mirrored view to normalize what is actually shown).
+        """
+        if data is None:
+            data = self.data
+        lit = data > threshold
+        scale = np.float32(gain / np.log(self.peak() + offset))
+        norm = np.log(np.where(lit, data, np.float32(1)))
+        norm *= scale
+        np.minimum(norm, 1, out=norm)
+        return norm, lit
+
+    def mirrored(self):
+        """The buffer folded into quad symmetry.
+
+        Cells right of ``width // 2`` read column ``width - 1 - x`` and cells
+        below ``height // 2`` read row ``height - 1 - y``, so the top-left
+        quadrant is reflected into the other three.
+        """
+        if self._mirror is None:
+            xs = np.arange(self.width)
+            ys = np.arange(self.height)
+            xs = np.where(xs > self.width // 2, self.width - 1 - xs, xs)
+            ys = np.where(ys > self.height // 2, self.height - 1 - ys, ys)
+            self._mirror = (ys[:, None], xs[None, :])
+        return self.data[self._mirror]
@@ -0,0 +1,429 @@
+import numpy as np
+
+from .utils import reset_color
+from .color import ansi_table
+from . import profiler
+
+
+def codepoints(text):
+    """Convert a string (e.g. a character ramp) to an array of codepoints"""
+    return np.array([ord(ch) for ch in text], dtype=np.uint32)
+
+
+def hash2d(xs, ys, salt=0):
+    """Cheap deterministic integer hash of cell coordinates (vectorized).
+
+    Returns uint32 values; use ``% n`` to turn them into stable per-cell
+    noise (e.g. sparkles) without calling ``hash()`` for every cell.
+    """
+    xs = np.asarray(xs, dtype=np.uint32)
+    ys = np.asarray(ys, dtype=np.uint32)
+    v = xs * np.uint32(374761393) + ys * np.uint32(668265263) + np.uint32((salt * 2246822519) & 0xFFFFFFFF)
+    v ^= v >> np.uint32(13)
+    v *= np.uint32(1274126177)
+    v ^= v >> np.uint32(16)
+    return v
+
+
+class Canvas:
+    """Reusable array-backed character canvas with vectorized drawing.
+
+    A cell is stored across parallel arrays: ``chars`` (unicode codepoints),
+    ``rgb`` (foreground color), ``colored`` (whether the cell emits a color
+    escape) and, optionally, ``depth`` for nearest-wins plotting where a
+    larger ``z`` is closer to the viewer.
+
+    Colors may be ``None`` (leave the cell uncolored), an ``(r, g, b)`` tuple,
+    or an array with one color per painted cell. Characters may be a string,
+    a codepoint or an array of codepoints. Everything is clipped to the canvas.
+    """
+
+    def __init__(self, width=0, height=0, depth=False):
+        self.width = -1
+        self.height = -1
+        self.use_depth = depth
+        self.resize(width, height)
+
+    def resize(self, width, height):
+        """Reallocate buffers if the size changed; returns True if it did"""
+        width = max(0, int(width))
+        height = max(0, int(height))
+        if (width, height) == (self.width, self.height):
+            return False
+
+        self.width = width
+        self.height = height
+        self.x0 = 0
+        self.y0 = 0
+        self.chars = np.full((height, width), 32, dtype=np.uint32)
+        self.rgb = np.zeros((height, width, 3), dtype=np.uint8)
+        self.colored = np.zeros((height, width), dtype=bool)
+        self.depth = np.full((height, width), -np.inf, dtype=np.float32) if self.use_depth else None
+        # Broadcastable cell coordinate grids for building masks
+        self.xs = np.arange(width, dtype=np.int32)[None, :]
+        self.ys = np.arange(height, dtype=np.int32)[:, None]
+        self._col_index = np.broadcast_to(np.arange(width, dtype=np.int32), (height, width))
+        return True
+
+    def view(self, x0, y0, x1, y1):
+        """Sub-canvas sharing memory with this one (inclusive, clipped).
+
+        Drawing on the view uses local coordinates; ``x0``/``y0`` hold its
+        offset. Returns None when the window is fully outside.
+        """
+        x0 = max(0, int(x0))
+        y0 = max(0, int(y0))
+        x1 = min(self.width - 1, int(x1))
+        y1 = min(self.height - 1, int(y1))
+        if x0 > x1 or y0 > y1:
+            return None
+        sub = Canvas.__new__(Canvas)
+        sub.use_depth = self.use_depth
+        sub.width = x1 - x0 + 1
+        sub.height = y1 - y0 + 1
+        sub.x0 = x0
+        sub.y0 = y0
+        window = (slice(y0, y1 + 1), slice(x0, x1 + 1))
+        sub.chars = self.chars[window]
+        sub.rgb = self.rgb[window]
+        sub.colored = self.colored[window]
+        sub.depth = self.depth[window] if self.depth is not None else None
+        sub.xs = self.xs[:, :sub.width]
+        sub.ys = self.ys[:sub.height]
+        sub._col_index = self._col_index[:sub.height, :sub.width]
+        return sub
+
+    def clear(self, char=' '):
+        """Blank every cell (and reset depth) for a new frame"""
+        self.chars.fill(ord(char))
+        self.colored.fill(False)
+        if self.depth is not None:
+            self.depth.fill(-np.inf)
+
+    # ------------------------------------------------------------------
+    # Low level painting
+    # ------------------------------------------------------------------
+    def _char_value(self, char):
+        if isinstance(char, str):
+            return ord(char)
+        return char
+
+    def _color_value(self, color):
+        if isinstance(color, tuple):
+            return tuple(min(255, max(0, int(c))) for c in color)
+        color = np.asarray(color)
+        if color.dtype != np.uint8:
+            color = np.clip(color, 0, 255).astype(np.uint8)
+        return color
+
+    def _apply(self, index, char, color):
+        """Write ``char``/``color`` into ``chars[index]`` (any numpy index)"""
+        if char is not None:
+            self.chars[index] = self._char_value(char)
+        if color is None:
+            self.colored[index] = False
+        else:
+            self.rgb[index] = self._color_value(color)
+            self.colored[index] = True
+
+    def paint(self, mask, char, color=None):
+        """Paint every cell where the full-canvas boolean ``mask`` is set.
+
+        Per-cell ``char``/``color`` arrays may either match the canvas shape
+        or already be compressed to the selected cells.
+        """
+        if isinstance(char, np.ndarray) and char.shape == mask.shape:
+            char = char[mask]
+        if isinstance(color, np.ndarray) and color.shape[:2] == mask.shape:
+            color = color[mask]
+        self._apply(mask, char, color)
+
+    def put(self, x, y, char, color=None):
+        """Set a single cell, ignoring out-of-bounds coordinates"""
+        x = int(x)
+        y = int(y)
+        if 0 <= x < self.width and 0 <= y < self.height:
+            self.chars[y, x] = ord(char)
+            if color is None:
+                self.colored[y, x] = False
+            else:
+                r, g, b = color
+                self.rgb[y, x] = (
+                    min(255, max(0, int(r))),
+                    min(255, max(0, int(g))),
+                    min(255, max(0, int(b))),
+                )
+                self.colored[y, x] = True
+
+    def get(self, x, y):
+        """Character at a cell (space when out of bounds)"""
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return chr(self.chars[y, x])
+        return ' '
+
+    def text(self, x, y, text, color=None, skip_spaces=False):
+        """Write a horizontal run of text starting at ``(x, y)``"""
+        y = int(y)
+        x = int(x)
+        if not (0 <= y < self.height) or not text:
+            return
+        cps = codepoints(text)
+        start = max(0, -x)
+        end = min(len(text), self.width - x)
+        if start >= end:
+            return
+        cps = cps[start:end]
+        cols = np.arange(x + start, x + end)
+        if skip_spaces:
+            keep = cps != 32
+            cps = cps[keep]
+            cols = cols[keep]
+        if isinstance(color, np.ndarray) and color.ndim == 2:
+            color = color[start:end][keep] if skip_spaces else color[start:end]
+        self._apply((y, cols), cps, color)
+
+    def plot(self, xs, ys, char, color=None, z=None):
+        """Scatter points into the canvas.
+
+        ``xs``/``ys`` are float or int arrays (truncated toward zero like
+        ``int()``). ``char``/``color`` may be per point. With ``z`` given (and
+        a depth buffer) only the closest point per cell is kept and it must
+        also beat whatever is already in the depth buffer.
+        """
+        xs = np.asarray(xs)
+        ys = np.asarray(ys)
+        if xs.dtype.kind == 'f':
+            xs = np.trunc(xs)
+            ys = np.trunc(ys)
+            inside = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+            xs = xs.astype(np.int64)
+            ys = ys.astype(np.int64)
+        else:
+            inside = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+        per_point_char = isinstance(char, np.ndarray) and char.ndim > 0
+        per_point_color = isinstance(color, np.ndarray) and color.ndim == 2
+
+        sel = np.flatnonzero(inside)
+        if z is not None:
+            z = np.asarray(z, dtype=np.float32)
+            # Resolve depth within the batch: sort far->near, keep the last
+            # (nearest) occurrence of every cell; ties go to the earlier point.
+            flat = ys[sel] * self.width + xs[sel]
+            order = np.lexsort((-sel, z[sel], flat))
+            flat_sorted = flat[order]
+            last = np.ones(flat_sorted.size, dtype=bool)
+            last[:-1] = flat_sorted[1:] != flat_sorted[:-1]
+            sel = sel[order[last]]
+            if self.depth is not None:
+                cy = ys[sel]
+                cx = xs[sel]
+                closer = z[sel] > self.depth[cy, cx]
+                sel = sel[closer]
+                self.depth[ys[sel], xs[sel]] = z[sel]
+
+        if sel.size == 0:
+            return
+        index = (ys[sel], xs[sel])
+        self._apply(
+            index,
+            char[sel] if per_point_char else char,
+            color[sel] if per_point_color else color,
+        )
+
+    # ------------------------------------------------------------------
+    # Shapes
+    # ------------------------------------------------------------------
+    def fill(self, char=' ', color=None):
+        """Fill the whole canvas"""
+        self._apply(Ellipsis, char, color)
+
+    def rect(self, x0, y0, x1, y1, char, color=None):
+        """Filled rectangle with inclusive corners"""
+        if x0 > x1 or y0 > y1:
+            return
+        x0 = max(0, int(x0))
+        y0 = max(0, int(y0))
+        x1 = min(self.width - 1, int(x1))
+        y1 = min(self.height - 1, int(y1))
+        if x0 > x1 or y0 > y1:
+            return
+        self._apply((slice(y0, y1 + 1), slice(x0, x1 + 1)), char, color)
+
+    def line(self, x0, y0, x1, y1, char, color=None):
+        """Straight line between two cells (inclusive)"""
+        steps = int(max(abs(x1 - x0), abs(y1 - y0))) + 1
+        t = np.linspace(0.0, 1.0, steps)
+        xs = np.rint(x0 + (x1 - x0) * t).astype(np.int64)
+        ys = np.rint(y0 + (y1 - y0) * t).astype(np.int64)
+        self.plot(xs, ys, char, color)
+
+    def _box(self, x0, y0, x1, y1):
+        """Clipped integer bounding box; None when fully outside"""
+        bx0 = max(0, int(np.floor(x0)))
+        by0 = max(0, int(np.floor(y0)))
+        bx1 = min(self.width - 1, int(np.ceil(x1)))
+        by1 = min(self.height - 1, int(np.ceil(y1)))
+        if bx0 > bx1 or by0 > by1:
+            return None
+        return bx0, by0, bx1, by1
+
+    def _paint_box(self, box, mask, char, color):
+        bx0, by0, bx1, by1 = box
+        view = (slice(by0, by1 + 1), slice(bx0, bx1 + 1))
+        if char is not None:
+            self.chars[view][mask] = self._char_value(char)
+        if color is None:
+            self.colored[view][mask] = False
+        else:
+            self.rgb[view][mask] = self._color_value(color)
+            self.colored[view][mask] = True
+
+    def ellipse(self, cx, cy, rx, ry, char, color=None, thickness=None):
+        """Filled ellipse, or an outline ring of ``thickness`` (in radii units)"""
+        box = self._box(cx - rx, cy - ry, cx + rx, cy + ry)
+        if box is None or rx <= 0 or ry <= 0:
+            return
+        bx0, by0, bx1, by1 = box
+        dx = (self.xs[:, bx0:bx1 + 1] - cx) / rx
+        dy = (self.ys[by0:by1 + 1] - cy) / ry
+        d = np.sqrt(dx * dx + dy * dy)
+        if thickness is None:
+            mask = d <= 1.0
+        else:
+            mask = np.abs(d - 1.0) * min(rx, ry) <= thickness * 0.5
+        self._paint_box(box, mask, char, color)
+
+    def circle(self, cx, cy, radius, char, color=None, thickness=None, aspect=1.0):
+        """Circle of ``radius`` columns; ``aspect`` squashes it vertically"""
+        self.ellipse(cx, cy, radius, radius / aspect, char, color, thickness)
+
+    def polygon(self, points, char, color=None):
+        """Filled polygon (even-odd rule) sampled at cell centers"""
+        pts = np.asarray(points, dtype=np.float64)
+        if len(pts) < 3:
+            return
+        box = self._box(pts[:, 0].min(), pts[:, 1].min(), pts[:, 0].max(), pts[:, 1].max())
+        if box is None:
+            return
+        bx0, by0, bx1, by1 = box
+        px = self.xs[:, bx0:bx1 + 1].astype(np.float64)
+        py = self.ys[by0:by1 + 1].astype(np.float64)
+        inside = np.zeros((by1 - by0 + 1, bx1 - bx0 + 1), dtype=bool)
+        xj, yj = pts[-1]
+        for xi, yi in pts:
+            if yi != yj:
+                crosses = (yi > py) != (yj > py)
+                x_int = (xj - xi) * (py - yi) / (yj - yi) + xi
+                inside ^= crosses & (px < x_int)
+            xj, yj = xi, yi
+        self._paint_box(box, inside, char, color)
+
+    def gradient(self, x0, y0, x1, y1, start, end, vertical=False, char=None):
+        """Linear color gradient over an inclusive rectangle.
+
+        Only recolors cells unless ``char`` is given.
+        """
+        box = self._box(x0, y0, x1, y1)
+        if box is None:
+            return
+        bx0, by0, bx1, by1 = box
+        if vertical:
+            t = (self.ys[by0:by1 + 1] - y0) / max(1, y1 - y0)
+        else:
+            t = (self.xs[:, bx0:bx1 + 1] - x0) / max(1, x1 - x0)
+        t = np.clip(t, 0.0, 1.0)[..., None]
+        start = np.asarray(start, dtype=np.float32)
+        end = np.asarray(end, dtype=np.float32)
+        colors = start + (end - start) * t
+        view = (slice(by0, by1 + 1), slice(bx0, bx1 + 1))
+        self.rgb[view] = np.broadcast_to(colors, self.rgb[view].shape).astype(np.uint8)
+        self.colored[view] = True
+        if char is not None:
+            self.chars[view] = self._char_value(char)
+
+    def blit(self, src, x, y, transparent=True):
+        """Copy another canvas at ``(x, y)``.
+
+        With ``transparent`` set, blank uncolored source cells are skipped.
+        """
+        sx0 = max(0, -x)
+        sy0 = max(0, -y)
+        sx1 = min(src.width, self.width - x)
+        sy1 = min(src.height, self.height - y)
+        if sx0 >= sx1 or sy0 >= sy1:
+            return
+        src_view = (slice(sy0, sy1), slice(sx0, sx1))
+        dst_view = (slice(y + sy0, y + sy1), slice(x + sx0, x + sx1))
+        if transparent:
+            mask = src.colored[src_view] | (src.chars[src_view] != 32)
+            self.chars[dst_view][mask] = src.chars[src_view][mask]
+            self.rgb[dst_view][mask] = src.rgb[src_view][mask]
+            self.colored[dst_view][mask] = src.colored[src_view][mask]
+        else:
+            self.chars[dst_view] = src.chars[src_view]
+            self.rgb[dst_view] = src.rgb[src_view]
+            self.colored[dst_view] = src.colored[src_view]
+
+    # ------------------------------------------------------------------
+    # Output
+    # ------------------------------------------------------------------
+    def to_rows(self):
+        """Encode the canvas as rows of text for the runner.
+
+        A color escape is only emitted when a colored cell differs from the
+        previous colored cell of the row, so flat regions cost one escape.
+        Colors are compared and encoded after quantization through the
+        shared ``AnsiTable``.
+        The frame is cut into character runs in one ``str.split`` and joined
+        with the escapes, instead of concatenating strings per cell.
+        """
+        with profiler.section("encode"):
+            return self._encode_rows()
+
+    def _encode_rows(self):
+        height, width = self.height, self.width
+        if height == 0:
+            return []
+        if width == 0:
+            return [reset_color()] * height
+
+        table = ansi_table()
+        packed = table.pack(self.rgb)
+        colored = self.colored
+        # Color of the last colored cell strictly before each cell (-1: none)
+        last = np.where(colored, self._col_index, -1)
+        np.maximum.accumulate(last, axis=1, out=last)
+        prev = np.empty_like(last)
+        prev[:, 0] = -1
+        prev[:, 1:] = last[:, :-1]
+        prev_color = np.take_along_axis(packed, np.maximum(prev, 0), axis=1)
+        prev_color[prev < 0] = -1
+        emit = colored & (packed != prev_color)
+
+        # Every row gets a terminator column ('\n', preceded by a reset) so
+        # the frame is one flat stream that is split into rows at the end.
+        stride = width + 1
+        chars = np.empty((height, stride), dtype=np.uint32)
+        chars[:, :width] = self.chars
+        chars[:, width] = 10
+        marks = np.empty((height, stride), dtype=bool)
+        marks[:, :width] = emit
+        marks[:, width] = True
+
+        # Cut the stream in front of every mark with a NUL so str.split()
+        # hands back the character runs, then interleave them with escapes.
+        flat = np.flatnonzero(marks)
+        stream = np.insert(chars.ravel(), flat, 0)
+        runs = stream.tobytes().decode('utf-32-le').split('\0')
+
+        term = (flat % stride) == width
+        codes = packed.ravel()[np.where(term, 0, flat - flat // stride)]
+        codes[term] = table.reset_index
+        escapes = table.lookup(codes)
+
+        parts = [None] * (2 * flat.size + 1)
+        parts[0] = runs[0]
+        parts[1::2] = escapes.tolist()
+        parts[2::2] = runs[1:]
+        return ''.join(parts).split('\n')[:-1]
+
@@ -0,0 +1,142 @@
+import os
+
+import numpy as np
+
+from .utils import rgb_to_ansi, reset_color
+from . import profiler
+
+# Bits kept per channel. 6 bits (262,144 slots) is indistinguishable from
+# 24-bit color on a terminal; 7 is the cap so the table stays ~16 MB.
+DEFAULT_COLOR_BITS = 6
+MAX_COLOR_BITS = 7
+
+
+class AnsiTable:
+    """Flat table of pre-encoded color escapes indexed by packed RGB.
+
+    Colors are quantized to ``bits`` per channel and packed into one index
+    (``r << 2*bits | g << bits | b``). Slots are encoded lazily the first time
+    a color shows up, so a visual that only uses a few hundred colors only
+    ever formats a few hundred escapes. The slot after the last color holds
+    the reset sequence, which lets encoders treat "reset" as just another
+    index.
+
+    Escapes are stored as ``str`` rather than bytes because frames are
+    assembled as text before they are printed.
+    """
+
+    def __init__(self, bits=DEFAULT_COLOR_BITS):
+        self.bits = max(1, min(MAX_COLOR_BITS, int(bits)))
+        self.shift = 8 - self.bits
+        self.size = 1 << (3 * self.bits)
+        self.reset_index = self.size
+        self.escapes = np.empty(self.size + 1, dtype=object)
+        self.filled = np.zeros(self.size + 1, dtype=bool)
+        self.escapes[self.reset_index] = reset_color()
+        self.filled[self.reset_index] = True
+        # Representative 0..255 value of every quantized level
+        levels = (1 << self.bits) - 1
+        self.levels = np.arange(levels + 1) * 255 // levels
+        self.lookups = 0
+        self.misses = 0
+
+    def pack(self, rgb):
+        """Packed table index for an ``(..., 3)`` uint8 color array"""
+        q = (rgb >> self.shift).astype(np.int32)
+        return (q[..., 0] << (2 * self.bits)) | (q[..., 1] << self.bits) | q[..., 2]
+
+    def lookup(self, index):
+        """Escape strings (object array) for an array of packed indices"""
+        index = np.asarray(index)
+        missing = ~self.filled[index]
+        self.lookups += index.size
+        if missing.any():
+            new = np.unique(index[missing])
+            self.misses += new.size
+            self._encode(new)
+        return self.escapes[index]
+
+    def escape(self, r, g, b):
+        """Escape for a single color, through the table"""
+        s = self.shift
+        i = ((int(r) >> s) << (2 * self.bits)) | ((int(g) >> s) << self.bits) | (int(b) >> s)
+        self.lookups += 1
+        if not self.filled[i]:
+            self.misses += 1
+            self._encode(np.array([i]))
+        return self.escapes[i]
+
+    def _encode(self, index):
+        bits, mask = self.bits, (1 << self.bits) - 1
+        r = self.levels[index >> (2 * bits)].tolist()
+        g = self.levels[(index >> bits) & mask].tolist()
+        b = self.levels[index & mask].tolist()
+        self.escapes[index] = [rgb_to_ansi(*c) for c in zip(r, g, b)]
+        self.filled[index] = True
+
+    def entries(self):
+        """Number of escapes encoded so far"""
+        return int(self.filled.sum()) - 1
+
+    def hit_rate(self):
+        return 1.0 - self.misses / self.lookups if self.lookups else 1.0
+
+    def reset_stats(self):
+        self.lookups = 0
+        self.misses = 0
+
+
+# Which of (v, q, p, t) feeds r, g and b in each of the six hue sectors
+_HSV_SECTORS = np.array([
+    [0, 1, 2, 2, 3, 0],
+    [3, 0, 0, 1, 2, 2],
+    [2, 2, 3, 0, 0, 1],
+])
+
+
+def hsv_to_rgb(h, s, v):
+    """Vectorized HSV -> RGB as an ``(..., 3)`` uint8 array.
+
+    ``h`` wraps around 1.0 and ``s``/``v`` are clamped to 0..1; channels are
+    truncated like ``int(x * 255)``, the same as the per-cell helpers the
+    visuals used to carry.
+    """
+    h = np.asarray(h, dtype=np.float32) % 1.0
+    s = np.clip(s, 0.0, 1.0).astype(np.float32)
+    v = np.clip(v, 0.0, 1.0).astype(np.float32)
+    h6 = h * 6
+    i = h6.astype(np.intp)
+    f = h6 - i
+    i %= 6
+    p = v * (1 - s)
+    q = v * (1 - f * s)
+    t = v * (1 - (1 - f) * s)
+    stack = np.stack(np.broadcast_arrays(v, q, p, t))
+    rgb = np.empty(stack.shape[1:] + (3,), dtype=np.uint8)
+    for channel in range(3):
+        picked = np.take_along_axis(stack, _HSV_SECTORS[channel][i][None], 0)[0]
+        rgb[..., channel] = picked * 255
+    return rgb
+
+
+_shared_table = None
+
+
+def ansi_table():
+    """Process-wide AnsiTable (bit depth from ``VISUAL_COLOR_BITS``)"""
+    global _shared_table
+    if _shared_table is None:
+        try:
+            bits = int(os.getenv('VISUAL_COLOR_BITS', DEFAULT_COLOR_BITS))
+        except ValueError:
+            bits = DEFAULT_COLOR_BITS
+        _shared_table = AnsiTable(bits)
+        profiler.register_stat(
+            "ansi cache",
+            lambda t=_shared_table: (
+                f"{t.hit_rate() * 100:.1f}% hits, {t.entries()} escapes "
+                f"({t.bits} bits/channel)"
+            ),
+            _shared_table.reset_stats,
+        )
+    return _shared_table
@@ -0,0 +1,137 @@
+"""Distance fields over a ``CoordGrid`` for line-art visuals.
+
+Outline patterns (circles, polygons, star figures) and glows around points
+are drawn by turning the distance from a cell to the nearest primitive into
+an intensity. Instead of testing every cell against every primitive, each
+primitive is evaluated only on the cells within ``reach`` of it and folded
+into the field with a minimum; cells farther than ``reach`` from every
+primitive may stay ``inf``. The cost follows the area the primitives cover,
+not cells x primitives.
+
+Coordinates are the grid's ``dx``/``dy`` (aspect-scaled, relative to the
+shader origin). Distances are unsigned. ``circle_distance`` and
+``segment_distance`` evaluate one primitive on arbitrary coordinate arrays
+(e.g. the sample points of a ``core.polar.PolarTexture``).
+"""
+import math
+
+import numpy as np
+
+
+def empty(grid):
+    """Field with no primitives yet (every cell at ``inf``)"""
+    return np.full(grid.shape, np.inf)
+
+
+def window(grid, x0, x1, y0, y1):
+    """Cells whose coordinates fall in the box, as ``(rows, cols)`` slices.
+
+    Returns None when the box misses the grid.
+    """
+    col0 = max(0, math.ceil(x0 + grid.cx))
+    col1 = min(grid.width, math.floor(x1 + grid.cx) + 1)
+    row0 = max(0, math.ceil(y0 / grid.aspect + grid.cy))
+    row1 = min(grid.height, math.floor(y1 / grid.aspect + grid.cy) + 1)
+    if col0 >= col1 or row0 >= row1:
+        return None
+    return slice(row0, row1), slice(col0, col1)
+
+
+def circle_distance(x, y, center, radius):
+    """Distance from points ``(x, y)`` to one circle outline"""
+    dist = np.hypot(x - center[0], y - center[1])
+    dist -= radius
+    return np.abs(dist, out=dist)
+
+
+def segment_distance(x, y, start, end):
+    """Distance from points ``(x, y)`` to the segment ``start``-``end``"""
+    x1, y1 = start
+    ex, ey = end[0] - x1, end[1] - y1
+    length_sq = ex * ex + ey * ey
+    px = x - x1
+    py = y - y1
+    if length_sq <= 0:
+        return np.hypot(px, py)
+    along = np.clip((px * ex + py * ey) / length_sq, 0.0, 1.0)
+    return np.hypot(px - along * ex, py - along * ey)
+
+
+def circles(grid, centers, radii, reach, out=None):
+    """Distance to the nearest circle outline (``radii`` scalar or per circle)"""
+    if out is None:
+        out = empty(grid)
+    radii = np.broadcast_to(radii, (len(centers),))
+    for (x, y), radius in zip(centers, radii.tolist()):
+        extent = radius + reach
+        cells = window(grid, x - extent, x + extent, y - extent, y + extent)
+        if cells is None:
+            continue
+        rows, cols = cells
+        dist = circle_distance(grid.dx[:, cols], grid.dy[rows], (x, y), radius)
+        region = out[cells]
+        np.minimum(region, dist, out=region)
+    return out
+
+
+def points(grid, centers, reach, out=None):
+    """Distance to the nearest point.
+
+    All points are stamped at once: every point gets the same rectangle of
+    cells covering ``reach`` around it, and the distances are folded in
+    with ``np.minimum.at``, so thousands of points cost no Python loop.
+    """
+    if out is None:
+        out = empty(grid)
+    centers = np.asarray(centers, dtype=np.float64).reshape(-1, 2)
+    if not centers.size:
+        return out
+    cols = centers[:, 0] + grid.cx
+    rows = centers[:, 1] / grid.aspect + grid.cy
+    row_reach = reach / grid.aspect
+    # Stamp offsets from each point's top-left candidate cell
+    col_offsets = np.arange(int(2 * reach) + 2)
+    row_offsets = np.arange(int(2 * row_reach) + 2)
+    col = np.ceil(cols - reach).astype(np.intp)[:, None, None] + col_offsets[None, None, :]
+    row = np.ceil(rows - row_reach).astype(np.intp)[:, None, None] + row_offsets[None, :, None]
+    dist = np.hypot(
+        col - cols[:, None, None],
+        (row - rows[:, None, None]) * grid.aspect,
+    )
+    keep = (col >= 0) & (col < grid.width) & (row >= 0) & (row < grid.height)
+    keep &= dist <= reach
+    index = (row * grid.width + col)[keep]
+    np.minimum.at(out.ravel(), index, dist[keep])
+    return out
+
+
+def segments(grid, starts, ends, reach, out=None):
+    """Distance to the nearest line segment (``starts[i]`` to ``ends[i]``).
+
+    Zero-length segments are skipped.
+    """
+    if out is None:
+        out = empty(grid)
+    for (x1, y1), (x2, y2) in zip(starts, ends):
+        if x1 == x2 and y1 == y2:
+            continue
+        cells = window(
+            grid,
+            min(x1, x2) - reach, max(x1, x2) + reach,
+            min(y1, y2) - reach, max(y1, y2) + reach,
+        )
+        if cells is None:
+            continue
+        rows, cols = cells
+        dist = segment_distance(grid.dx[:, cols], grid.dy[rows], (x1, y1), (x2, y2))
+        region = out[cells]
+        np.minimum(region, dist, out=region)
+    return out
+
+
+def falloff(dist, width, power=1.0, peak=1.0):
+    """``peak * (1 - (dist / width) ** power)`` inside ``width``, else 0"""
+    inside = dist < width
+    value = np.zeros(dist.shape)
+    value[inside] = peak * (1.0 - (dist[inside] / width) ** power)
+    return value
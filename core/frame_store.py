@@ -0,0 +1,426 @@
+"""Compiled, memory-mapped frame assets.
+
+Text animations (e.g. Bad Apple's ``SPLIT``-separated ASCII frames) are
+compiled once into a file of uint8 intensities:
+
+    header (64 bytes): magic, version, keyframe interval, key, frame count,
+                       width, height
+    index: count + 1 uint64 record offsets
+    records: one per frame, either the raw height * width bytes (row-major)
+             or delta runs against the previous frame
+
+Consecutive frames of an animation mostly repeat each other, so a frame is
+stored as the byte ranges that changed (``uint32`` run count, run starts,
+run lengths, then the new bytes). Every ``interval``-th frame, and any frame
+whose delta would not be smaller, is stored raw; those keyframes bound how
+many deltas a random seek has to apply.
+
+``FrameStore`` memory-maps that file, so opening it takes milliseconds and
+the data lives in the OS page cache instead of the Python heap. ``store[i]``
+decodes from the nearest keyframe, or continues from the last decoded frame
+when playing forward. ``key`` is chosen by the caller (e.g. a checksum of
+the character ramp used to compute intensities) so a compiled file made
+with different settings is rebuilt.
+
+``TextFrameStream`` parses the text incrementally so playback can begin
+before the whole file has arrived. ``ShadedClip``/``ClipCache`` hold the
+clip pre-resized to display sizes so playback is a table lookup.
+"""
+import os
+import struct
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from .resample import resize_frames
+
+MAGIC = b"VFRM"
+VERSION = 2
+HEADER = struct.Struct("<4sHHIIII")
+HEADER_SIZE = 64
+KEYFRAME_INTERVAL = 32
+# Unchanged bytes between two changes that are still folded into one run
+# (cheaper than the 8 bytes of a new run)
+RUN_GAP = 8
+
+
+def parse_text_frames(text, separator="SPLIT"):
+    """Split a text animation into frames (lists of lines), skipping blanks"""
+    frames = []
+    for chunk in text.split(separator):
+        lines = chunk.strip("\n").splitlines()
+        if lines:
+            frames.append(lines)
+    return frames
+
+
+def frames_to_codepoints(frames, width, height):
+    """``(count, height, width)`` uint32 codepoints, space-padded/cropped"""
+    blank = " " * width
+    cells = []
+    for lines in frames:
+        lines = lines[:height]
+        cells.extend(line[:width].ljust(width) for line in lines)
+        cells.extend(blank for _ in range(height - len(lines)))
+    data = "".join(cells).encode("utf-32-le")
+    return np.frombuffer(data, dtype=np.uint32).reshape(len(frames), height, width)
+
+
+def intensity_table(intensity):
+    """uint8 level of every Latin-1 character (``int(intensity(char) * 255)``)"""
+    return np.array([int(intensity(chr(c)) * 255) for c in range(256)], dtype=np.uint8)
+
+
+def intensity_bytes(codes, intensity, table=None):
+    """Map codepoints to uint8 via ``int(intensity(char) * 255)``.
+
+    Latin-1 goes through a 256-entry table (pass ``table`` to reuse one);
+    anything above is rare enough to be looked up per distinct character.
+    """
+    if table is None:
+        table = intensity_table(intensity)
+    levels = table[np.minimum(codes, 255)]
+    wide = codes > 255
+    if wide.any():
+        unique, inverse = np.unique(codes[wide], return_inverse=True)
+        extra = np.array([int(intensity(chr(c)) * 255) for c in unique.tolist()], dtype=np.uint8)
+        levels[wide] = extra[inverse.ravel()]
+    return levels
+
+
+def delta_runs(previous, frame, gap=RUN_GAP):
+    """``(starts, lengths)`` of the flat byte ranges where ``frame`` differs"""
+    changed = np.flatnonzero(previous.ravel() != frame.ravel())
+    if not changed.size:
+        return np.zeros(0, dtype=np.uint32), np.zeros(0, dtype=np.uint32)
+    breaks = np.flatnonzero(np.diff(changed) > gap + 1)
+    starts = changed[np.concatenate(([0], breaks + 1))]
+    ends = changed[np.concatenate((breaks, [changed.size - 1]))] + 1
+    return starts.astype(np.uint32), (ends - starts).astype(np.uint32)
+
+
+def _run_positions(starts, lengths):
+    """Flat positions covered by the runs, in order"""
+    lengths = lengths.astype(np.intp)
+    shift = starts.astype(np.intp) - (np.cumsum(lengths) - lengths)
+    return np.arange(int(lengths.sum())) + np.repeat(shift, lengths)
+
+
+def encode_delta(previous, frame):
+    """Delta record turning ``previous`` into ``frame``"""
+    starts, lengths = delta_runs(previous, frame)
+    data = frame.ravel()[_run_positions(starts, lengths)]
+    return b"".join((
+        struct.pack("<I", starts.size), starts.tobytes(), lengths.tobytes(), data.tobytes()
+    ))
+
+
+def apply_delta(previous, record):
+    """New frame from ``previous`` and a delta record (uint8 array)"""
+    count = int(record[:4].view(np.uint32)[0])
+    starts = record[4:4 + 4 * count].view(np.uint32)
+    lengths = record[4 + 4 * count:4 + 8 * count].view(np.uint32)
+    frame = previous.copy()
+    frame.ravel()[_run_positions(starts, lengths)] = record[4 + 8 * count:]
+    return frame
+
+
+def write_frames(path, frames, key=0, interval=KEYFRAME_INTERVAL):
+    """Write a ``(count, height, width)`` uint8 array as a compiled asset"""
+    frames = np.ascontiguousarray(frames, dtype=np.uint8)
+    count, height, width = frames.shape
+    write_blocks(path, [frames], count, height, width, key, interval)
+
+
+def write_blocks(path, blocks, count, height, width, key=0, interval=KEYFRAME_INTERVAL):
+    """Write ``count`` frames given as ``(n, height, width)`` uint8 blocks.
+
+    Blocks are encoded as they come, so the frames never need to sit in one
+    array (``TextFrameStream.blocks`` hands its storage over this way).
+    """
+    interval = max(1, min(0xFFFF, interval))
+    offsets = np.empty(count + 1, dtype=np.uint64)
+    offset = HEADER_SIZE + offsets.nbytes
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as handle:
+        header = HEADER.pack(MAGIC, VERSION, interval, key & 0xFFFFFFFF, count, width, height)
+        handle.write(header.ljust(HEADER_SIZE, b"\0"))
+        handle.write(offsets.tobytes())
+        index = 0
+        previous = None
+        for block in blocks:
+            for frame in np.asarray(block, dtype=np.uint8):
+                if index >= count:
+                    break
+                record = frame.tobytes()
+                if index % interval:
+                    delta = encode_delta(previous, frame)
+                    # Raw records are recognised by their size
+                    if len(delta) < len(record):
+                        record = delta
+                offsets[index] = offset
+                handle.write(record)
+                offset += len(record)
+                previous = frame
+                index += 1
+        if index != count:
+            raise ValueError("se esperaban %d frames y llegaron %d" % (count, index))
+        offsets[count] = offset
+        handle.seek(HEADER_SIZE)
+        handle.write(offsets.tobytes())
+    os.replace(tmp_path, path)
+
+
+def compile_text(source_path, path, intensity, key=0, separator="SPLIT"):
+    """Compile a text animation file into ``path``; returns the FrameStore"""
+    with open(source_path, "r", encoding="utf-8", errors="ignore") as handle:
+        frames = parse_text_frames(handle.read(), separator)
+    if not frames:
+        raise ValueError("no encontré frames en el archivo")
+    height = max(len(lines) for lines in frames)
+    width = max(max((len(line) for line in lines), default=0) for lines in frames)
+    codes = frames_to_codepoints(frames, width, height)
+    write_frames(path, intensity_bytes(codes, intensity), key)
+    return FrameStore(path)
+
+
+class FrameStore:
+    """Read-only, memory-mapped view of a compiled frame asset"""
+
+    def __init__(self, path):
+        with open(path, "rb") as handle:
+            header = handle.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise ValueError("archivo compilado incompleto")
+        magic, version, interval, key, count, width, height = HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("formato de frames desconocido")
+        data = np.memmap(path, dtype=np.uint8, mode="r")
+        index_end = HEADER_SIZE + 8 * (count + 1)
+        if data.size < index_end:
+            raise ValueError("archivo compilado truncado")
+        offsets = data[HEADER_SIZE:index_end].view(np.uint64)
+        if int(offsets[-1]) > data.size:
+            raise ValueError("archivo compilado truncado")
+        self.path = path
+        self.key = key
+        self.width = width
+        self.height = height
+        self.interval = max(1, interval)
+        self.count = count
+        self.data = data
+        self.offsets = offsets.astype(np.intp)
+        # (index, frame) of the last decoded frame, so playing forward applies
+        # one delta per frame. Replaced as a whole, never mutated, so the
+        # ShadedClip thread and playback can share it.
+        self._last = None
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return np.stack([self[i] for i in range(*index.indices(self.count))])
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        keyframe = self.keyframe(index)
+        last = self._last
+        if last is not None and keyframe <= last[0] <= index:
+            current, frame = last
+        else:
+            current, frame = keyframe, self._record(keyframe, None)
+        while current < index:
+            current += 1
+            frame = self._record(current, frame)
+        self._last = (index, frame)
+        return frame
+
+    def keyframe(self, index):
+        """Index of the keyframe at or before ``index``"""
+        return index - index % self.interval
+
+    def _record(self, index, previous):
+        record = self.data[self.offsets[index]:self.offsets[index + 1]]
+        if record.size == self.width * self.height:
+            return record.reshape(self.height, self.width)
+        return apply_delta(previous, record)
+
+    @staticmethod
+    def is_current(path, source_path, key=0):
+        """True when ``path`` is a valid asset, newer than its source, for ``key``"""
+        try:
+            if os.path.getmtime(path) < os.path.getmtime(source_path):
+                return False
+            with open(path, "rb") as handle:
+                header = handle.read(HEADER.size)
+            magic, version, _, stored_key, *_ = HEADER.unpack(header)
+        except (OSError, struct.error):
+            return False
+        return magic == MAGIC and version == VERSION and stored_key == (key & 0xFFFFFFFF)
+
+
+class TextFrameStream:
+    """Frames of a text animation, parsed incrementally as bytes arrive.
+
+    ``feed()`` takes raw chunks (from a download or a file read), finds the
+    separator boundaries in what has arrived so far and converts every
+    completed frame to uint8 intensities right away, so ``len()`` grows and
+    ``stream[i]`` is usable while the rest is still loading. Only the
+    unfinished tail is kept as bytes; frames are stored in fixed-size
+    blocks, so memory is the size of the compiled clip.
+
+    The frame size is taken from the first frame; later frames are padded
+    or cropped to it. ``max_width``/``max_height`` record the largest frame
+    seen so callers can recompile exactly when sizes turn out to vary.
+    """
+
+    def __init__(self, intensity, separator="SPLIT", block=64):
+        self.intensity = intensity
+        self.table = intensity_table(intensity)
+        self.separator = separator.encode("utf-8")
+        self.block = block
+        self.width = 0
+        self.height = 0
+        self.max_width = 0
+        self.max_height = 0
+        self.complete = False
+        self._pending = bytearray()
+        self._blocks = []
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return np.stack([self[i] for i in range(*index.indices(self._count))])
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        return self._blocks[index // self.block][index % self.block]
+
+    def feed(self, data):
+        """Add raw bytes; parses every frame completed by them"""
+        self._pending += data
+        cut = self._pending.rfind(self.separator)
+        if cut < 0:
+            return
+        done = bytes(self._pending[:cut])
+        del self._pending[:cut + len(self.separator)]
+        self._add_chunks(done.split(self.separator))
+
+    def finish(self):
+        """Parse whatever follows the last separator and mark the stream done"""
+        self._add_chunks([bytes(self._pending)])
+        self._pending = bytearray()
+        self.complete = True
+
+    def blocks(self):
+        """The parsed frames as ``(n, height, width)`` views, in order (no copy)"""
+        for start, block in zip(range(0, self._count, self.block), self._blocks):
+            yield block[:self._count - start]
+
+    def _add_chunks(self, chunks):
+        frames = []
+        for chunk in chunks:
+            lines = chunk.decode("utf-8", errors="ignore").strip("\n").splitlines()
+            if lines:
+                frames.append(lines)
+        if not frames:
+            return
+        if not self.width:
+            self.height = len(frames[0])
+            self.width = max(len(line) for line in frames[0]) or 1
+        for lines in frames:
+            self.max_height = max(self.max_height, len(lines))
+            self.max_width = max(self.max_width, max((len(line) for line in lines), default=0))
+        codes = frames_to_codepoints(frames, self.width, self.height)
+        levels = intensity_bytes(codes, self.intensity, self.table)
+        for frame in levels:
+            slot = self._count % self.block
+            if slot == 0:
+                self._blocks.append(np.zeros((self.block, self.height, self.width), dtype=np.uint8))
+            self._blocks[-1][slot] = frame
+            self._count += 1
+
+
+class ShadedClip:
+    """A whole clip resized to one display size and reduced to shade codes.
+
+    ``shade(intensity)`` maps float32 intensities (0..1) to uint8 codes that
+    the visual turns into characters/colors with lookup tables. Frames are
+    converted in batches on a background thread, in playback order;
+    ``frame(i)`` returns the cached codes once they are ready and converts
+    that single frame on the spot until then.
+    """
+
+    def __init__(self, store, width, height, shade, batch=64):
+        self.store = store
+        self.width = width
+        self.height = height
+        self.shade = shade
+        self.batch = batch
+        self.codes = np.empty((len(store), height, width), dtype=np.uint8)
+        self.ready = 0
+        self._cancelled = False
+        self._thread = threading.Thread(target=self._fill, daemon=True)
+        self._thread.start()
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes
+
+    def _convert(self, start, end):
+        intensity = resize_frames(self.store[start:end], self.width, self.height)
+        intensity *= np.float32(1 / 255)
+        return self.shade(intensity)
+
+    def _fill(self):
+        for start in range(0, len(self.store), self.batch):
+            if self._cancelled:
+                return
+            end = min(len(self.store), start + self.batch)
+            self.codes[start:end] = self._convert(start, end)
+            self.ready = end
+
+    def frame(self, index):
+        if index < self.ready:
+            return self.codes[index]
+        return self._convert(index, index + 1)[0]
+
+    def cancel(self):
+        self._cancelled = True
+
+
+class ClipCache:
+    """Least-recently-used ShadedClips keyed by display size, within a byte budget.
+
+    The most recently used clip is always kept, even if it alone exceeds the
+    budget; older ones are cancelled and dropped as new sizes come in.
+    """
+
+    def __init__(self, budget_bytes):
+        self.budget = budget_bytes
+        self._clips = OrderedDict()
+
+    def get(self, key, build):
+        clip = self._clips.get(key)
+        if clip is not None:
+            self._clips.move_to_end(key)
+            return clip
+        clip = self._clips[key] = build()
+        total = sum(c.nbytes for c in self._clips.values())
+        while total > self.budget and len(self._clips) > 1:
+            _, old = self._clips.popitem(last=False)
+            old.cancel()
+            total -= old.nbytes
+        return clip
+
+    def clear(self):
+        for clip in self._clips.values():
+            clip.cancel()
+        self._clips.clear()
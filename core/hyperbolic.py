@@ -0,0 +1,65 @@
+"""Poincaré disk coordinates for hyperbolic-geometry visuals.
+
+``PoincareDisk`` maps the cells of one terminal size onto the unit disk
+once and keeps, for the cells inside it, the quantities hyperbolic patterns
+are built from: disk coordinates, Euclidean and hyperbolic radius, angle
+and the conformal factor. Everything is stored as flat arrays over those
+cells only, so nothing is spent on the corners of the screen. Patterns made
+of many similar layers (horocycles, geodesics, tiles) evaluate all of them
+at once: the helpers take arrays of layer parameters and return one
+``(N, cells)`` stack, so adding layers adds no Python-level work per cell.
+"""
+import math
+
+import numpy as np
+
+TAU = 2.0 * math.pi
+
+
+class PoincareDisk:
+    """Unit disk centered on cell ``(cx, cy)`` with ``radius`` cells per unit.
+
+    ``index`` holds the flat (row-major) indices of the cells inside the
+    disk and ``xs``/``ys`` their cell coordinates; every other per-cell
+    array is aligned with it. Cells at ``r >= r_max`` are treated as lying
+    on ``r_max`` wherever a quantity blows up at the boundary
+    (``conformal``, ``distance``).
+    """
+
+    def __init__(self, width, height, cx, cy, radius, r_max=0.99):
+        self.shape = (height, width)
+        x = (np.arange(width, dtype=np.float64)[None, :] - cx) / radius
+        y = (np.arange(height, dtype=np.float64)[:, None] - cy) / radius
+        r = np.hypot(x, y)
+        self.inside = r < 1.0
+        self.index = np.flatnonzero(self.inside)
+        self.ys, self.xs = np.divmod(self.index, width)
+        self.x = np.broadcast_to(x, self.shape)[self.inside]
+        self.y = np.broadcast_to(y, self.shape)[self.inside]
+        self.r = r[self.inside]
+        self.theta = np.arctan2(self.y, self.x)
+        clipped = np.minimum(self.r, r_max)
+        # Metric scale ds_hyperbolic = conformal * ds_euclidean / 2
+        self.conformal = 2.0 / (1.0 - clipped ** 2)
+        # Hyperbolic distance from the origin
+        self.distance = 2.0 * np.arctanh(clipped)
+
+    def mask(self, selected):
+        """Full-grid boolean mask of the disk cells where ``selected`` is set"""
+        mask = np.zeros(self.shape, dtype=bool)
+        mask.ravel()[self.index[selected]] = True
+        return mask
+
+    def euclidean_to(self, px, py):
+        """Euclidean distance from every cell to each point, ``(N, cells)``"""
+        px = np.asarray(px, dtype=np.float64)[:, None]
+        py = np.asarray(py, dtype=np.float64)[:, None]
+        return np.hypot(self.x - px, self.y - py)
+
+    def angle_to(self, angles):
+        """Wrapped angular distance (0..π) from every cell to each angle, ``(N, cells)``"""
+        angles = np.asarray(angles, dtype=np.float64)[:, None]
+        diff = self.theta - angles
+        diff -= TAU * np.rint(diff * (1.0 / TAU))
+        return np.abs(diff, out=diff)
+
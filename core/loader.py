@@ -36,7 +36,8 @@ class VisualLoader:
             for name, obj in inspect.getmembers(module):
                 if (inspect.isclass(obj) and 
                     issubclass(obj, VisualBase) and 
-                    obj != VisualBase):
+                    obj != VisualBase and
+                    not inspect.isabstract(obj)):
                     
                     visual_instance = obj()
                     meta = visual_instance.get_metadata()
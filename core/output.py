@@ -0,0 +1,325 @@
+"""Writing frames to the terminal.
+
+A visual normally returns its frame as a list of rows, which the runner
+repaints from the top-left corner. A visual that knows what changed since
+its previous frame can return a ``Patch`` instead: cursor-addressed updates
+for just those cells, plus a way to produce the full rows. ``FrameWriter``
+sends the updates only when the terminal still shows the frame the patch
+was made against; after another visual, a cleared screen or a size change
+it falls back to the full rows, so a visual never has to know what is on
+screen.
+
+``CanvasDiff`` makes patches from successive states of a ``Canvas``. When
+content moves vertically (rain, scrolling text) it can scroll the terminal
+with a scroll region and rewrite only the newly exposed or changed rows.
+"""
+import sys
+
+import numpy as np
+
+from .color import ansi_table
+from .utils import reset_color
+from . import profiler
+
+# Unchanged cells between two changed ones that are rewritten rather than
+# skipped with a cursor move (which costs ~8 bytes)
+CELL_GAP = 6
+# Cells a detected scroll has to save before it is used (the scroll itself
+# costs ~20 bytes)
+SCROLL_MARGIN = 4
+
+
+def cursor_to(x, y):
+    """Escape moving the cursor to column ``x``, row ``y`` (0-based)"""
+    return f"\033[{y + 1};{x + 1}H"
+
+
+def scroll_region(top, bottom, lines):
+    """Escapes scrolling rows ``top:bottom`` by ``lines`` (down when positive).
+
+    Sets the scroll region (DECSTBM), scrolls it with SD/SU, which bring in
+    blank rows, and restores the full-screen region. Colors are reset first
+    so the new rows are blank in the default colors.
+    """
+    move = f"\033[{lines}T" if lines > 0 else f"\033[{-lines}S"
+    return f"\033[0m\033[{top + 1};{bottom}r{move}\033[r"
+
+
+class Patch:
+    """A frame expressed as updates against the visual's previous frame.
+
+    ``updates`` is the escape string that turns the previous frame into this
+    one; ``rows`` is the full frame as rows, or a callable producing them
+    (called at most once, before the visual renders its next frame).
+    ``base`` is the token of the patch this one applies to (None for a
+    first frame). A Patch iterates like its rows, so code that expects a
+    list of rows (``--debug``) keeps working.
+    """
+
+    def __init__(self, width, height, updates, rows, base=None):
+        self.width = width
+        self.height = height
+        self.updates = updates
+        self.base = base
+        self.token = object()
+        self._rows = rows
+
+    def rows(self):
+        if callable(self._rows):
+            self._rows = self._rows()
+        return self._rows
+
+    def __iter__(self):
+        return iter(self.rows())
+
+    def __len__(self):
+        return len(self.rows())
+
+    def __getitem__(self, index):
+        return self.rows()[index]
+
+
+class FrameWriter:
+    """Sends frames (rows or Patches) plus a status line to a stream"""
+
+    def __init__(self, stream=None):
+        self.stream = stream if stream is not None else sys.stdout
+        self.bytes_written = 0
+        self.frames_written = 0
+        # Token of the Patch currently on screen (None: unknown/full frame)
+        self._shown = None
+
+    def invalidate(self):
+        """Forget what is on screen (after clearing it or printing over it)"""
+        self._shown = None
+
+    def render(self, frame, status=None):
+        """Escape string that displays ``frame`` (and the status line)"""
+        with profiler.section("output"):
+            if isinstance(frame, Patch) and frame.base is not None and frame.base is self._shown:
+                out = frame.updates
+                if status is not None:
+                    out += cursor_to(0, frame.height) + status
+            else:
+                rows = list(frame.rows() if isinstance(frame, Patch) else frame)
+                if status is not None:
+                    rows.append(status)
+                out = "\033[H" + "\n".join(rows)
+            self._shown = frame.token if isinstance(frame, Patch) else None
+            return out
+
+    def write(self, frame, status=None):
+        out = self.render(frame, status)
+        self.stream.write(out)
+        self.stream.flush()
+        self.bytes_written += len(out.encode("utf-8"))
+        self.frames_written += 1
+
+
+class CanvasDiff:
+    """Turns successive states of one Canvas into Patches.
+
+    Each ``patch()`` compares the canvas with its state at the previous call
+    and encodes the cells that look different: a new character, or a new
+    color on a non-blank cell. A cell's color is the one the full-row
+    encoding would leave it with (the last colored cell at or before it in
+    the row), so patches and full repaints show the same thing. Nearby
+    changes on a row are merged into one run so the cursor is moved once.
+
+    Visuals that know which cells they touched can pass them as ``cells``
+    so the work is proportional to those cells instead of the screen. That
+    mode takes each cell's own color (uncolored cells reset), which matches
+    the full encoding as long as every non-blank cell is colored.
+    """
+
+    def __init__(self, canvas, gap=CELL_GAP, scroll=0):
+        self.canvas = canvas
+        self.gap = gap
+        self.scroll = scroll
+        self.reset()
+
+    def reset(self):
+        """Make the next patch a full frame"""
+        self._chars = None
+        self._colors = None
+        self._token = None
+
+    def _effective_colors(self, table):
+        canvas = self.canvas
+        packed = table.pack(canvas.rgb)
+        last = np.where(canvas.colored, canvas.xs, -1)
+        np.maximum.accumulate(last, axis=1, out=last)
+        colors = np.take_along_axis(packed, np.maximum(last, 0), axis=1)
+        colors[last < 0] = table.reset_index
+        return colors
+
+    def _own_colors(self, table, cells=None):
+        canvas = self.canvas
+        if cells is None:
+            return np.where(canvas.colored, table.pack(canvas.rgb), table.reset_index)
+        packed = table.pack(canvas.rgb.reshape(-1, 3)[cells])
+        return np.where(canvas.colored.ravel()[cells], packed, table.reset_index)
+
+    @staticmethod
+    def _differs(chars, colors, old_chars, old_colors):
+        diff = chars != old_chars
+        diff |= (colors != old_colors) & (chars != 32)
+        return diff
+
+    def _detect_shift(self, chars, colors, reset_index):
+        """Whole-screen shift that leaves the fewest cells to rewrite, or None.
+
+        Shifts are only tried when at least a row's worth of cells changed
+        in place; below that a scroll can't save what trying it costs.
+        """
+        height, width = chars.shape
+        best = int(self._differs(chars, colors, self._chars, self._colors).sum()) - SCROLL_MARGIN
+        if best < width:
+            return None
+        shift = None
+        for lines in range(-self.scroll, self.scroll + 1):
+            if lines == 0 or abs(lines) >= height:
+                continue
+            # Rows the scroll moves against what they came from, plus the
+            # exposed rows against blanks; no shifted copy is built
+            if lines > 0:
+                moved, source, exposed = slice(lines, None), slice(None, -lines), slice(None, lines)
+            else:
+                moved, source, exposed = slice(None, lines), slice(-lines, None), slice(lines, None)
+            count = int(self._differs(
+                chars[moved], colors[moved], self._chars[source], self._colors[source]
+            ).sum())
+            count += int(self._differs(chars[exposed], colors[exposed], 32, reset_index).sum())
+            if count < best:
+                best, shift = count, (0, height, lines)
+        return shift
+
+    def _scroll_saved(self, shift, reset_index):
+        """Apply ``scroll_region(*shift)`` to the saved state, in place"""
+        top, bottom, lines = shift
+        for saved, blank in ((self._chars, 32), (self._colors, reset_index)):
+            region = saved[top:bottom]
+            if lines > 0:
+                region[lines:] = region[:-lines]
+                region[:lines] = blank
+            else:
+                region[:lines] = region[-lines:]
+                region[lines:] = blank
+
+    def _sparse_changes(self, table, cells):
+        """How many of ``cells`` differ from the saved state"""
+        now_colors = self._own_colors(table, cells)
+        return int(self._differs(
+            self.canvas.chars.ravel()[cells], now_colors,
+            self._chars.ravel()[cells], self._colors.ravel()[cells],
+        ).sum())
+
+    def patch(self, changed=None, cells=None, shift=None):
+        """Patch for the canvas' current state.
+
+        ``changed`` optionally limits the comparison to a boolean mask of
+        cells the caller may have touched; ``cells`` (flat indices) does the
+        same in the sparse mode described above. ``shift`` is a hint that
+        rows ``top:bottom`` moved by ``lines`` (down when positive) since the
+        last patch: the terminal is scrolled and only what still differs
+        afterwards is rewritten, so ``changed``/``cells`` must then also
+        cover the cells the scroll itself changes (where moved content
+        lands). With ``scroll`` set and no hint, whole-screen shifts of up to
+        that many rows are detected instead, which compares the whole screen
+        whenever enough cells changed to make a scroll worth trying.
+        """
+        canvas = self.canvas
+        with profiler.section("encode"):
+            table = ansi_table()
+            chars = canvas.chars
+            base = self._token
+            own = cells is not None
+            colors = None
+            prefix = ""
+            if self._chars is None or self._chars.shape != chars.shape:
+                self._chars = chars.copy()
+                self._colors = self._own_colors(table) if own else self._effective_colors(table)
+                patch = Patch(canvas.width, canvas.height, "", canvas.to_rows)
+                self._token = patch.token
+                return patch
+
+            if cells is not None:
+                cells = np.unique(cells)
+            if shift is None and self.scroll and (
+                cells is None or self._sparse_changes(table, cells) >= canvas.width
+            ):
+                colors = self._own_colors(table) if own else self._effective_colors(table)
+                shift = self._detect_shift(chars, colors, table.reset_index)
+                if shift:
+                    # A detected shift may have moved anything: compare the
+                    # whole screen
+                    cells = changed = None
+            if shift:
+                self._scroll_saved(shift, table.reset_index)
+                prefix = scroll_region(*shift)
+
+            if cells is None:
+                if colors is None:
+                    colors = self._own_colors(table) if own else self._effective_colors(table)
+                diff = self._differs(chars, colors, self._chars, self._colors)
+                if changed is not None:
+                    diff &= changed
+                flat_colors = colors.ravel()
+                updates = self._encode(
+                    np.flatnonzero(diff), chars, lambda span: flat_colors[span], table
+                )
+                self._chars = chars.copy()
+                self._colors = colors
+            else:
+                now_chars = chars.ravel()[cells]
+                now_colors = self._own_colors(table, cells)
+                old_chars = self._chars.ravel()
+                old_colors = self._colors.ravel()
+                diff = self._differs(now_chars, now_colors, old_chars[cells], old_colors[cells])
+                updates = self._encode(
+                    cells[diff], chars, lambda span: self._own_colors(table, span), table
+                )
+                old_chars[cells] = now_chars
+                old_colors[cells] = now_colors
+        patch = Patch(canvas.width, canvas.height, prefix + updates, canvas.to_rows, base)
+        self._token = patch.token
+        return patch
+
+    def _encode(self, cells, chars, colors_at, table):
+        """Escapes rewriting the sorted flat ``cells`` (colors via ``colors_at``)"""
+        width = self.canvas.width
+        if not cells.size:
+            return ""
+        # Runs break at row ends and at gaps wider than self.gap
+        rows = cells // width
+        step = np.diff(cells)
+        breaks = np.flatnonzero((step > self.gap + 1) | (np.diff(rows) != 0))
+        starts = cells[np.concatenate(([0], breaks + 1))]
+        ends = cells[np.concatenate((breaks, [cells.size - 1]))] + 1
+        lengths = ends - starts
+        shift = starts - (np.cumsum(lengths) - lengths)
+        span = np.arange(int(lengths.sum())) + np.repeat(shift, lengths)
+
+        flat_colors = colors_at(span)
+        run_start = np.zeros(span.size, dtype=bool)
+        run_start[np.cumsum(lengths)[:-1]] = True
+        run_start[0] = True
+        recolor = np.empty(span.size, dtype=bool)
+        recolor[0] = True
+        recolor[1:] = flat_colors[1:] != flat_colors[:-1]
+        marks = run_start | recolor
+
+        # Same run splitting as Canvas.to_rows: NUL in front of every mark
+        flat = np.flatnonzero(marks)
+        stream = np.insert(chars.ravel()[span], flat, 0)
+        pieces = stream.tobytes().decode("utf-32-le").split("\0")
+        prefixes = table.lookup(flat_colors[flat]).tolist()
+        ys, xs = np.divmod(starts, width)
+        moves = iter([cursor_to(x, y) for x, y in zip(xs.tolist(), ys.tolist())])
+        for i, is_start in enumerate(run_start[flat].tolist()):
+            if is_start:
+                prefixes[i] = next(moves) + prefixes[i]
+        parts = [None] * (2 * flat.size)
+        parts[0::2] = prefixes
+        parts[1::2] = pieces[1:]
+        return pieces[0] + "".join(parts) + reset_color()
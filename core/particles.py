@@ -0,0 +1,119 @@
+import numpy as np
+
+from . import profiler
+
+
+class ParticleSystem:
+    """Struct-of-arrays particle pool.
+
+    Every channel is a NumPy array and alive particles are always packed in
+    slots ``[0, count)``. The built-in channels are ``x``, ``y``, ``vx``,
+    ``vy``, ``age``, ``lifetime`` and ``color`` (``(N, 3)`` uint8); visuals
+    add their own float channels by name (``channels=('intensity',)``).
+
+    Reading ``ps.x`` (or any channel) returns a writable view of the alive
+    particles, so per-frame work is O(alive) and there are no per-particle
+    objects. Dead particles are swap-removed: the survivors at the end of
+    the pool are moved into the holes, so alive order is not preserved.
+    """
+
+    BUILTIN = ('x', 'y', 'vx', 'vy', 'age', 'lifetime')
+
+    def __init__(self, capacity=256, channels=()):
+        self.count = 0
+        self.capacity = max(1, int(capacity))
+        self._names = self.BUILTIN + tuple(channels)
+        self._data = {name: np.zeros(self.capacity) for name in self._names}
+        self._data['color'] = np.zeros((self.capacity, 3), dtype=np.uint8)
+
+    def __len__(self):
+        return self.count
+
+    def __getattr__(self, name):
+        data = self.__dict__.get('_data')
+        if data is None or name not in data:
+            raise AttributeError(name)
+        return data[name][:self.count]
+
+    def _reserve(self, extra):
+        needed = self.count + extra
+        if needed <= self.capacity:
+            return
+        capacity = max(needed, self.capacity * 2)
+        for name, array in self._data.items():
+            grown = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+            grown[:self.count] = array[:self.count]
+            self._data[name] = grown
+        self.capacity = capacity
+
+    def spawn(self, n=1, x=0.0, y=0.0, vx=0.0, vy=0.0, lifetime=np.inf, color=(255, 255, 255), **channels):
+        """Add ``n`` particles; every value may be a scalar or a length-n array"""
+        n = int(n)
+        if n <= 0:
+            return
+        self._reserve(n)
+        start, end = self.count, self.count + n
+        values = dict(x=x, y=y, vx=vx, vy=vy, age=0.0, lifetime=lifetime, color=color)
+        values.update(channels)
+        for name, array in self._data.items():
+            array[start:end] = values.get(name, 0)
+        self.count = end
+
+    def step(self, dt=1.0):
+        """Integrate positions, age everything by ``dt`` and drop the expired"""
+        with profiler.section("particles"):
+            n = self.count
+            data = self._data
+            data['x'][:n] += data['vx'][:n] * dt
+            data['y'][:n] += data['vy'][:n] * dt
+            data['age'][:n] += dt
+            self.kill(data['age'][:n] >= data['lifetime'][:n])
+
+    def kill(self, dead):
+        """Swap-remove the alive particles selected by the boolean mask"""
+        dead = np.asarray(dead, dtype=bool)
+        n_dead = int(dead.sum())
+        if n_dead == 0:
+            return
+        keep = self.count - n_dead
+        # Holes below the new count are filled by survivors from above it
+        holes = np.flatnonzero(dead[:keep])
+        movers = keep + np.flatnonzero(~dead[keep:])
+        if holes.size:
+            for array in self._data.values():
+                array[holes] = array[movers]
+        self.count = keep
+
+    def limit(self, max_count):
+        """Drop the oldest particles beyond ``max_count``"""
+        extra = self.count - max_count
+        if extra <= 0:
+            return
+        age = self.age
+        oldest = np.argpartition(-age, extra - 1)[:extra]
+        dead = np.zeros(self.count, dtype=bool)
+        dead[oldest] = True
+        self.kill(dead)
+
+    def clear(self):
+        self.count = 0
+
+    def rasterize(self, canvas, char, color=None, mask=None, z=None):
+        """Plot alive particles into a Canvas.
+
+        ``char``/``color`` may be per particle; ``color`` defaults to the
+        color channel. ``mask`` selects a subset, ``z`` (larger wins) decides
+        which particle shows when several land on one cell.
+        """
+        if color is None:
+            color = self.color
+        xs, ys = self.x, self.y
+        if mask is not None:
+            xs, ys = xs[mask], ys[mask]
+            if isinstance(char, np.ndarray) and char.ndim:
+                char = char[mask]
+            if isinstance(color, np.ndarray) and color.ndim == 2:
+                color = color[mask]
+            if z is not None:
+                z = z[mask]
+        canvas.plot(xs, ys, char, color, z=z)
@@ -0,0 +1,52 @@
+import time
+from contextlib import contextmanager
+
+# Accumulated wall time per section name: [total_seconds, calls]
+_sections = {}
+_enabled = False
+# Extra lines for the report: name -> (describe(), reset())
+_stats = {}
+
+
+def enable(on=True):
+    """Turn section timing on/off (off by default, so sections cost ~nothing)"""
+    global _enabled
+    _enabled = on
+
+
+def reset():
+    """Forget all accumulated timings and counters"""
+    _sections.clear()
+    for _, reset_stat in _stats.values():
+        if reset_stat:
+            reset_stat()
+
+
+def register_stat(name, describe, reset_stat=None):
+    """Add a line to the report (e.g. cache hit rates); describe() -> str"""
+    _stats[name] = (describe, reset_stat)
+
+
+@contextmanager
+def section(name):
+    """Time a block under ``name`` when profiling is enabled"""
+    if not _enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        entry = _sections.setdefault(name, [0.0, 0])
+        entry[0] += time.perf_counter() - start
+        entry[1] += 1
+
+
+def report(frames):
+    """Lines with the per-frame cost of every recorded section"""
+    lines = []
+    for name, (total, calls) in sorted(_sections.items(), key=lambda item: -item[1][0]):
+        lines.append(f"  {name:<16} {total * 1000 / max(1, frames):8.2f} ms/frame  ({calls} calls)")
+    for name, (describe, _) in _stats.items():
+        lines.append(f"  {name:<16} {describe()}")
+    return lines
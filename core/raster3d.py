@@ -0,0 +1,89 @@
+"""Point-cloud camera, perspective projection and depth-resolved drawing.
+
+3D visuals keep their geometry as ``(N, 3)`` float arrays. A ``Camera``
+holds the frame's rotation as one 3x3 matrix (built once per frame from a
+few angles, see ``rotation_matrix``) and a perspective projection onto
+terminal cells; ``Camera.draw`` projects a whole cloud and hands it to
+``Canvas.plot`` with the rotated ``z`` as depth, so every cell keeps the
+point with the largest ``z`` and char/color can be given per point.
+"""
+import math
+
+import numpy as np
+
+
+def axis_rotation(axis, angle):
+    """3x3 right-handed rotation about ``'x'``, ``'y'`` or ``'z'``"""
+    c, s = math.cos(angle), math.sin(angle)
+    if axis == 'x':
+        return np.array([[1, 0, 0], [0, c, -s], [0, s, c]])
+    if axis == 'y':
+        return np.array([[c, 0, s], [0, 1, 0], [-s, 0, c]])
+    return np.array([[c, -s, 0], [s, c, 0], [0, 0, 1]])
+
+
+def rotation_matrix(*steps):
+    """Compose ``(axis, angle)`` steps, applied in the order given.
+
+    ``rotation_matrix(('x', a), ('y', b))`` rotates about X first, then Y.
+    """
+    matrix = np.eye(3)
+    for axis, angle in steps:
+        matrix = axis_rotation(axis, angle) @ matrix
+    return matrix
+
+
+class Camera:
+    """Rotation plus perspective projection onto terminal cells.
+
+    A point is rotated by ``rotation`` (times ``scale``), then projected with
+    ``factor = focal / (distance + z)`` to
+    ``(cx + x * factor * aspect_x, cy + y * factor * aspect_y)``; a negative
+    ``aspect_y`` makes +y point up. Points with ``distance + z < near`` are
+    behind the camera and dropped. ``center`` is the cell the origin lands
+    on; set it (like ``orient``) each frame.
+    """
+
+    def __init__(self, distance, focal=None, aspect_x=1.0, aspect_y=1.0, near=1.0):
+        self.distance = distance
+        self.focal = distance if focal is None else focal
+        self.aspect_x = aspect_x
+        self.aspect_y = aspect_y
+        self.near = near
+        self.rotation = np.eye(3)
+        self.center = (0.0, 0.0)
+
+    def orient(self, rotation, scale=1.0):
+        """Set the frame's rotation matrix (and uniform scale)"""
+        self.rotation = rotation * scale
+
+    def transform(self, points):
+        """Rotated ``(N, 3)`` points"""
+        return points @ self.rotation.T
+
+    def project(self, points, rotated=False):
+        """Screen ``xs``, ``ys`` and view ``z`` of ``(N, 3)`` points.
+
+        Points behind the camera get ``xs = -1`` so drawing skips them.
+        """
+        if not rotated:
+            points = self.transform(points)
+        x, y, z = points[:, 0], points[:, 1], points[:, 2]
+        depth = z + self.distance
+        front = depth >= self.near
+        factor = self.focal / np.where(front, depth, 1.0)
+        cx, cy = self.center
+        xs = np.where(front, cx + x * factor * self.aspect_x, -1.0)
+        ys = cy + y * factor * self.aspect_y
+        return xs, ys, z
+
+    def draw(self, canvas, points, char, color=None, rotated=False):
+        """Project and plot points, resolving depth (largest ``z`` wins).
+
+        With a depth-buffered canvas, points also have to beat what earlier
+        draws left in the buffer, so several clouds can be layered. Returns
+        the view ``z`` of every point.
+        """
+        xs, ys, z = self.project(points, rotated)
+        canvas.plot(xs, ys, char, color, z=z)
+        return z
@@ -0,0 +1,83 @@
+import numpy as np
+
+
+class BilinearSampler:
+    """Bilinear resampling of a fixed-size field onto another grid size.
+
+    Source and destination are matched by cell centers, so a field sampled
+    at its own size comes back unchanged (that case returns the input
+    without copying). With ``wrap`` the edges interpolate across the
+    opposite side, which is what toroidal simulations want; otherwise they
+    are clamped. Indices and weights are computed once per size pair.
+    """
+
+    def __init__(self, src_width, src_height, dst_width, dst_height, wrap=False):
+        self.src_shape = (src_height, src_width)
+        self.dst_shape = (dst_height, dst_width)
+        self.identity = self.src_shape == self.dst_shape
+        self._x0, self._x1, self._fx = self._axis(src_width, dst_width, wrap)
+        self._y0, self._y1, self._fy = self._axis(src_height, dst_height, wrap)
+        self._fx = self._fx[None, :]
+        self._fy = self._fy[:, None]
+        self._y0 = self._y0[:, None]
+        self._y1 = self._y1[:, None]
+
+    @staticmethod
+    def _axis(src, dst, wrap):
+        pos = (np.arange(dst, dtype=np.float64) + 0.5) * (src / max(dst, 1)) - 0.5
+        i0 = np.floor(pos).astype(np.intp)
+        frac = (pos - i0).astype(np.float32)
+        i1 = i0 + 1
+        if wrap:
+            i0 %= src
+            i1 %= src
+        else:
+            np.clip(i0, 0, src - 1, out=i0)
+            np.clip(i1, 0, src - 1, out=i1)
+        return i0, i1, frac
+
+    def __call__(self, field):
+        """``field`` (``src_shape``) sampled at ``dst_shape`` (float32)"""
+        if self.identity:
+            return field
+        top = field[self._y0, self._x0]
+        top += (field[self._y0, self._x1] - top) * self._fx
+        bottom = field[self._y1, self._x0]
+        bottom += (field[self._y1, self._x1] - bottom) * self._fx
+        bottom -= top
+        bottom *= self._fy
+        top += bottom
+        return top
+
+
+def _corner_axis(src, dst):
+    """Indices/weights for corner-aligned sampling (first and last cells map exactly)"""
+    scale = (src - 1) / max(1, dst - 1)
+    pos = np.arange(dst, dtype=np.float64) * scale
+    i0 = pos.astype(np.intp)
+    i1 = np.minimum(src - 1, i0 + 1)
+    return i0, i1, (pos - i0).astype(np.float32)
+
+
+def resize_frames(frames, width, height):
+    """Bilinearly resize a ``(count, H, W)`` stack to ``(count, height, width)``.
+
+    Uses corner-aligned sampling (source cell ``x * (W - 1) / (width - 1)``)
+    and returns float32 in the input's units.
+    """
+    frames = np.asarray(frames)
+    src_height, src_width = frames.shape[-2:]
+    x0, x1, fx = _corner_axis(src_width, width)
+    y0, y1, fy = _corner_axis(src_height, height)
+    fy = fy[:, None]
+    top = frames[..., y0, :].astype(np.float32)
+    bottom = frames[..., y1, :].astype(np.float32)
+    bottom -= top
+    bottom *= fy
+    top += bottom
+    left = top[..., x0]
+    right = top[..., x1]
+    right -= left
+    right *= fx
+    left += right
+    return left
@@ -0,0 +1,74 @@
+"""Per-visual random streams.
+
+Every visual gets its own generator (``VisualBase.rng``) instead of sharing
+the global ``random`` module, so seeding one visual can't change what
+another draws and a given visual renders the same way in every process.
+Streams are seeded from ``zlib.crc32`` of the visual's name combined with
+``VISUAL_SEED`` (default 0); set ``VISUAL_SEED`` to get a different, still
+reproducible, run.
+
+``VisualRandom`` is a ``random.Random``, so scalar calls (``random()``,
+``uniform()``, ``choice()``...) keep their C speed and familiar API. A
+NumPy generator on the same seed hands out whole batches (``batch()``,
+``integers()``, ``normal()``) and ``mask()`` builds "each cell with
+probability p" arrays without a Python call per cell.
+"""
+import os
+import random
+import zlib
+
+import numpy as np
+
+# Below this probability mask() places hits directly instead of drawing a
+# uniform per cell
+SPARSE_P = 0.05
+
+
+def base_seed():
+    """Process-wide seed offset from ``VISUAL_SEED`` (0 when unset/invalid)"""
+    try:
+        return int(os.getenv('VISUAL_SEED', 0))
+    except ValueError:
+        return 0
+
+
+class VisualRandom(random.Random):
+    """Isolated, seedable random stream with batched NumPy draws"""
+
+    def __init__(self, seed=0):
+        super().__init__(seed)
+        self.gen = np.random.default_rng(seed)
+
+    def batch(self, size, low=0.0, high=1.0):
+        """Array of uniform floats in [low, high)"""
+        return self.gen.uniform(low, high, size)
+
+    def integers(self, low, high, size):
+        """Array of integers in [low, high) (``high`` excluded, like NumPy)"""
+        return self.gen.integers(low, high, size)
+
+    def normal(self, mu, sigma, size):
+        return self.gen.normal(mu, sigma, size)
+
+    def mask(self, shape, p):
+        """Boolean array where each cell is set with probability ``p``.
+
+        For small ``p`` only the expected number of hits is drawn (a
+        binomial count scattered over random cells) instead of one uniform
+        per cell; the rare repeated cell makes the rate very slightly lower.
+        """
+        if p >= SPARSE_P:
+            return self.gen.random(shape) < p
+        mask = np.zeros(shape, dtype=bool)
+        if p > 0 and mask.size:
+            hits = self.gen.binomial(mask.size, p)
+            mask.flat[self.gen.integers(0, mask.size, hits)] = True
+        return mask
+
+
+def stream(name=None, seed=None):
+    """Stream for a visual: ``seed`` if given, else derived from ``name``"""
+    if seed is None:
+        seed = zlib.crc32((name or '').encode('utf-8'))
+    # One integer mixing both, usable by random.Random and NumPy alike
+    return VisualRandom((seed * 1000003 + base_seed()) & 0xFFFFFFFFFFFFFFFF)
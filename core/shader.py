@@ -0,0 +1,123 @@
+from abc import abstractmethod
+
+import numpy as np
+
+from .visual_base import VisualBase
+from .canvas import Canvas, codepoints
+from . import profiler
+
+
+class CoordGrid:
+    """Per-cell coordinate arrays for one terminal size.
+
+    ``x``/``y`` are raw cell coordinates shaped ``(1, W)`` and ``(H, 1)`` so
+    they broadcast against each other. ``dx``/``dy`` are relative to the
+    shader origin with ``dy`` scaled by the cell aspect, ``r`` and ``theta``
+    are the matching polar coordinates as full ``(H, W)`` arrays.
+    """
+
+    def __init__(self, width, height, cx, cy, aspect=1.0):
+        self.width = width
+        self.height = height
+        self.shape = (height, width)
+        self.cx = cx
+        self.cy = cy
+        self.aspect = aspect
+        self.x = np.arange(width, dtype=np.float64)[None, :]
+        self.y = np.arange(height, dtype=np.float64)[:, None]
+        self.dx = self.x - cx
+        self.dy = (self.y - cy) * aspect
+        self.r = np.hypot(self.dx, self.dy)
+        self.theta = np.arctan2(self.dy, self.dx)
+        self._cache = {}
+
+    def cached(self, key, build):
+        """Memoize a derived array (``build(grid)``) for the life of the grid"""
+        value = self._cache.get(key)
+        if value is None:
+            value = build(self)
+            self._cache[key] = value
+        return value
+
+
+class ShaderVisual(VisualBase):
+    """Base class for visuals that are a closed-form function of x, y, r, θ, t.
+
+    Subclasses implement ``shade(grid, t)`` over NumPy arrays and return
+    ``(intensity, rgb)`` or ``(intensity, rgb, colored)``:
+
+    - ``intensity``: array mapped onto ``char_ramp`` as
+      ``int(intensity * (len(char_ramp) - 1))``, clamped to the ramp; with
+      ``ramp_levels`` set (ascending, one per character after the first), a
+      cell gets the character after the last level it exceeds instead
+    - ``rgb``: ``(r, g, b)`` arrays (anything broadcastable to the grid),
+      truncated like ``int()`` and clamped to 0..255
+    - ``colored``: optional boolean mask of cells that get a color escape
+
+    The coordinate grid is built once per terminal size. Override
+    ``origin()`` or set ``aspect`` to change how ``dx``/``dy``/``r``/``theta``
+    are measured. ``overlay()`` can draw glyphs that don't come from the
+    ramp (sprites, rings) on top of the shaded canvas.
+    """
+
+    char_ramp = " ·:;+=xX$&"
+    ramp_levels = None
+    aspect = 1.0
+
+    @property
+    def _shader_state(self):
+        # Lazily created so subclasses don't have to call super().__init__()
+        state = self.__dict__.get('_shader')
+        if state is None:
+            state = self.__dict__['_shader'] = {
+                'grid': None,
+                'canvas': Canvas(),
+                'ramp': codepoints(self.char_ramp),
+            }
+        return state
+
+    def origin(self, width, height):
+        """Cell the polar coordinates are measured from"""
+        return width / 2.0, height / 2.0
+
+    def grid(self, width, height):
+        """Coordinate grid for this size (rebuilt only when the size changes)"""
+        state = self._shader_state
+        grid = state['grid']
+        if grid is None or grid.shape != (height, width):
+            cx, cy = self.origin(width, height)
+            grid = state['grid'] = CoordGrid(width, height, cx, cy, self.aspect)
+        return grid
+
+    @abstractmethod
+    def shade(self, grid, t):
+        """Return (intensity, rgb) or (intensity, rgb, colored) arrays"""
+        pass
+
+    def overlay(self, canvas, grid, t):
+        """Draw on top of the shaded cells (default: nothing)"""
+        pass
+
+    def generate_frame(self, width, height, time_offset):
+        grid = self.grid(width, height)
+        state = self._shader_state
+        canvas = state['canvas']
+        canvas.resize(width, height)
+
+        with profiler.section("shade"):
+            result = self.shade(grid, time_offset)
+        intensity, rgb = result[0], result[1]
+        colored = result[2] if len(result) > 2 else True
+
+        ramp = state['ramp']
+        if self.ramp_levels is not None:
+            idx = np.searchsorted(self.ramp_levels, intensity, side='left')
+        else:
+            idx = (np.asarray(intensity) * (len(ramp) - 1)).astype(np.intp)
+            np.clip(idx, 0, len(ramp) - 1, out=idx)
+        canvas.chars[...] = ramp[idx]
+        for channel in range(3):
+            canvas.rgb[..., channel] = np.clip(rgb[channel], 0, 255)
+        canvas.colored[...] = colored
+        self.overlay(canvas, grid, time_offset)
+        return canvas.to_rows()
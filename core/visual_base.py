@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
 
+from .rng import stream as random_stream
+
 class VisualBase(ABC):
     """Base class for all visual effects"""
     
@@ -12,12 +14,24 @@ class VisualBase(ABC):
         # If absent or empty, consumers should not display it
         "ai_creator": None,
     }
+
+    # Fixed seed for this visual's random stream (None: derived from the name)
+    rng_seed = None
     
     @abstractmethod
     def generate_frame(self, width, height, time_offset):
         """Generate a single frame of the visual effect"""
         pass
     
+    @property
+    def rng(self):
+        """This visual's private random stream (see core.rng)"""
+        # Lazily created so subclasses don't have to call super().__init__()
+        stream = self.__dict__.get('_rng')
+        if stream is None:
+            stream = self.__dict__['_rng'] = random_stream(self.metadata.get("name"), self.rng_seed)
+        return stream
+
     def get_metadata(self):
         """Get visual metadata"""
         return self.metadata
@@ -10,11 +10,12 @@ import tty
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from core.loader import VisualLoader
+from core import profiler
+from core.output import FrameWriter
 from core.utils import (
     get_terminal_size,
     hide_cursor,
     show_cursor,
-    move_cursor_home,
     rgb_to_ansi,
     reset_color,
     clear_screen,
@@ -33,6 +34,8 @@ class VisualRunner:
         self.last_enter_time = 0.0
         self.double_tap_window = 0.5  # seconds
         self._orig_term_settings = None
+        # Sends full frames, or only the changed cells for visuals that return patches
+        self.writer = FrameWriter()
         
     def run(self):
         try:
@@ -83,21 +86,14 @@ class VisualRunner:
                 if not self.single_visual and self.frame_count > 0 and self.frame_count % self.pattern_duration == 0:
                     # Clear screen for smooth transition
                     clear_screen()
+                    self.writer.invalidate()
                     self.current_visual_index = (self.current_visual_index + 1) % len(visuals)
                     current_visual = visuals[self.current_visual_index]
                 
-                # Move cursor to top without clearing
-                move_cursor_home()
-                
                 # Generate frame
                 try:
                     pattern = current_visual.generate_frame(width, height, time_offset)
                     
-                    # Build frame buffer
-                    frame_buffer = []
-                    for row in pattern:
-                        frame_buffer.append(row)
-                    
                     # Status info with right alignment
                     meta = current_visual.get_metadata()
                     ai = meta.get('ai_creator')
@@ -116,13 +112,13 @@ class VisualRunner:
                     padding = max(0, width - left_visible - right_visible)
                     
                     status = left_text + " " * padding + right_text
-                    frame_buffer.append(status)
                     
-                    # Display entire frame
-                    print('\n'.join(frame_buffer), end="", flush=True)
+                    # Display the frame (only changed cells when it is a patch)
+                    self.writer.write(pattern, status)
                     
                 except Exception as e:
                     print(f"❌ Error in visual {meta['name']}: {e}")
+                    self.writer.invalidate()
                     self.current_visual_index = (self.current_visual_index + 1) % len(visuals)
 
                 # Handle quick double-Enter to skip to the next visual
@@ -173,6 +169,7 @@ class VisualRunner:
 
     def _skip_to_next_visual(self, visuals):
         clear_screen()
+        self.writer.invalidate()
         self.current_visual_index = (self.current_visual_index + 1) % len(visuals)
         self.frame_count = 0
 
@@ -198,6 +195,51 @@ class VisualRunner:
             except termios.error:
                 pass
 
+def _parse_frame_arg(arg, flag, default):
+    """Value of --flag=N (default when absent); None if it is not an integer"""
+    if '=' not in arg:
+        return default
+    try:
+        return int(arg.split('=', 1)[1])
+    except ValueError:
+        print(f"❌ Invalid {flag} value. Use an integer, e.g., {flag}=12")
+        return None
+
+def _find_visual(visual_name):
+    """Load all visuals and return the named one (prints the list if missing)"""
+    visuals_dir = os.path.join(os.path.dirname(__file__), 'visuals')
+    loader = VisualLoader(visuals_dir)
+    all_visuals = loader.get_all_visuals()
+    if visual_name not in all_visuals:
+        print(f"❌ Visual '{visual_name}' not found!")
+        print("Available visuals:")
+        for name in all_visuals.keys():
+            print(f"  • {name}")
+        return None
+    return all_visuals[visual_name]
+
+def profile_visual(visual, frames, width, height):
+    """Render frames off-screen and print where the time went"""
+    # Warm-up frame so one-time setup (caches, grids) isn't counted
+    writer = FrameWriter()
+    writer.render(visual.generate_frame(width, height, 0.0))
+    profiler.reset()
+    profiler.enable()
+    output_bytes = 0
+    start = time.perf_counter()
+    for frame_index in range(frames):
+        frame = visual.generate_frame(width, height, frame_index * 0.08)
+        output_bytes += len(writer.render(frame).encode('utf-8'))
+    elapsed = time.perf_counter() - start
+    profiler.enable(False)
+
+    name = visual.get_metadata().get('name', type(visual).__name__)
+    print(f"{name} @ {width}x{height}, {frames} frames")
+    print(f"  {'total':<16} {elapsed * 1000 / frames:8.2f} ms/frame  ({frames / elapsed:.1f} FPS)")
+    for line in profiler.report(frames):
+        print(line)
+    print(f"  {'output bytes':<16} {output_bytes / frames:8.0f} per frame")
+
 def main():
     """Entry point for the visual system"""
     if len(sys.argv) > 1:
@@ -221,15 +263,9 @@ def main():
             # Examples:
             #   ./run_visuals --debug "Bouncing SmartUp"      -> frame 0
             #   ./run_visuals --debug=12 "Bouncing SmartUp"    -> frame 12
-            arg = sys.argv[1]
-            if '=' in arg:
-                try:
-                    frame_index = int(arg.split('=', 1)[1])
-                except ValueError:
-                    print("❌ Invalid --debug value. Use an integer, e.g., --debug=12")
-                    return
-            else:
-                frame_index = 0
+            frame_index = _parse_frame_arg(sys.argv[1], '--debug', 0)
+            if frame_index is None:
+                return
 
             if len(sys.argv) < 3:
                 print("❌ Please specify a visual name after --debug")
@@ -237,17 +273,9 @@ def main():
                 return
 
             visual_name = sys.argv[2]
-            visuals_dir = os.path.join(os.path.dirname(__file__), 'visuals')
-            loader = VisualLoader(visuals_dir)
-            all_visuals = loader.get_all_visuals()
-            if visual_name not in all_visuals:
-                print(f"❌ Visual '{visual_name}' not found!")
-                print("Available visuals:")
-                for name in all_visuals.keys():
-                    print(f"  • {name}")
+            visual = _find_visual(visual_name)
+            if visual is None:
                 return
-
-            visual = all_visuals[visual_name]
             width, height = get_terminal_size()
             height -= 1
             time_offset = frame_index * 0.08
@@ -257,6 +285,33 @@ def main():
             except Exception as e:
                 print(f"❌ Error in visual {visual.get_metadata().get('name', visual_name)}: {e}")
             return
+        elif sys.argv[1].startswith('--profile'):
+            # Profile: render N frames off-screen and print per-section timings
+            # Usage: main.py --profile[=N] <visual name> [WIDTHxHEIGHT]
+            frames = _parse_frame_arg(sys.argv[1], '--profile', 100)
+            if frames is None:
+                return
+
+            if len(sys.argv) < 3:
+                print("❌ Please specify a visual name after --profile")
+                print("Use --list to see available visuals")
+                return
+
+            visual = _find_visual(sys.argv[2])
+            if visual is None:
+                return
+
+            if len(sys.argv) > 3:
+                try:
+                    width, height = (int(v) for v in sys.argv[3].lower().split('x'))
+                except ValueError:
+                    print("❌ Invalid size. Use WIDTHxHEIGHT, e.g., 200x60")
+                    return
+            else:
+                width, height = get_terminal_size()
+                height -= 1
+            profile_visual(visual, max(1, frames), width, height)
+            return
         elif sys.argv[1] == '--help':
             print("Office Visual System")
             print("Usage:")
@@ -264,6 +319,7 @@ def main():
             print("  python main.py --list             - List available visuals")
             print("  python main.py --single <name>    - Run single visual continuously")
             print("  python main.py --debug[=N] <name> - Print a single frame N (default 0)")
+            print("  python main.py --profile[=N] <name> [WxH] - Time N frames off-screen (default 100)")
             print("  python main.py --help             - Show this help")
             return
     
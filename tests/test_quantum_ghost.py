@@ -0,0 +1,17 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from visuals.quantum_ghost import QuantumGhostVisual
+
+
+def test_shrinking_width_keeps_rendering():
+    visual = QuantumGhostVisual()
+    for _ in range(30):
+        visual.generate_frame(120, 40, 0.0)
+    assert any(col >= 60 for col in visual.matrix_drops)
+
+    rows = list(visual.generate_frame(60, 40, 0.08))
+    assert len(rows) == 40
+    assert all(col < 60 for col in visual.matrix_drops)
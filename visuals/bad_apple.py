@@ -2,12 +2,25 @@ import os
 import sys
 import threading
 import urllib.request
-from typing import List
+import zlib
+
+import numpy as np
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from core.visual_base import VisualBase
-from core.utils import rgb_to_ansi, reset_color
+from core.utils import reset_color
+from core.canvas import Canvas, codepoints
+from core.output import CanvasDiff
+from core.frame_store import (
+    ClipCache,
+    FrameStore,
+    ShadedClip,
+    TextFrameStream,
+    compile_text,
+    write_blocks,
+)
+from core.resample import resize_frames
 
 
 class BadAppleVisual(VisualBase):
@@ -28,16 +41,34 @@ class BadAppleVisual(VisualBase):
         asset_dir = os.path.join(os.path.dirname(__file__), "assets", "badapple")
         os.makedirs(asset_dir, exist_ok=True)
         self.data_path = os.path.join(asset_dir, "badapple.txt")
-        self.frames: List[List[bytearray]] | None = None
+        # Compiled uint8 intensities, memory-mapped (see core.frame_store)
+        self.compiled_path = os.path.join(asset_dir, "badapple.frames")
+        # A TextFrameStream while the file downloads/parses (playable as soon
+        # as it has frames), then the compiled FrameStore
+        self.frames: FrameStore | TextFrameStream | None = None
+        # VISUAL_BADAPPLE_URL points the download elsewhere (e.g. a file://
+        # or local http stand-in)
+        self.data_url = os.getenv("VISUAL_BADAPPLE_URL") or self.DATA_URL
         self.source_width = 100
         self.source_height = 30
         self.playback_fps = 16.0
         self.status_message = "Preparando Bad Apple..."
         self.load_error: str | None = None
-        self._download_thread: threading.Thread | None = None
+        self._load_thread: threading.Thread | None = None
+        self._playback_origin: float | None = None
         self._intensity_cache: dict[str, float] = {}
         self.contrast_power = 1.06
         self.char_threshold = 0.028
+        self.canvas = Canvas()
+        # Frames go out as the cells that changed since the previous one
+        self.diff = CanvasDiff(self.canvas)
+        self._build_shade_tables()
+        # Clip pre-resized per display size (VISUAL_BADAPPLE_CACHE_MB, default 256)
+        try:
+            budget_mb = float(os.getenv("VISUAL_BADAPPLE_CACHE_MB", 256))
+        except ValueError:
+            budget_mb = 256.0
+        self.clips = ClipCache(int(budget_mb * 1024 * 1024))
 
     def generate_frame(self, width, height, time_offset):
         self._ensure_frames()
@@ -50,7 +81,7 @@ class BadAppleVisual(VisualBase):
             ]
             return self._render_message(width, height, message)
 
-        if self.frames is None:
+        if self.frames is None or not len(self.frames):
             message = [
                 self.status_message or "Descargando Bad Apple...",
                 "Fuente: skanehira/badapple.vim (MIT)",
@@ -62,34 +93,65 @@ class BadAppleVisual(VisualBase):
                 width, height, ["Amplía la terminal", "para disfrutar Bad Apple"]
             )
 
-        frame_index = int(time_offset * self.playback_fps)
-        frame_index %= len(self.frames)
-        frame_data = self.frames[frame_index]
-        return self._render_frame(frame_data, width, height)
+        # Play from frame 0 when frames first become available
+        if self._playback_origin is None:
+            self._playback_origin = time_offset
+        frame_index = int((time_offset - self._playback_origin) * self.playback_fps)
+        if isinstance(self.frames, FrameStore):
+            frame_index %= len(self.frames)
+        else:
+            # Still loading: hold the newest frame until more arrive
+            frame_index = min(frame_index, len(self.frames) - 1)
+        return self._render_frame(frame_index, width, height)
 
     def _ensure_frames(self):
-        if self.frames or self.load_error:
+        if self.frames is not None or self.load_error or self._load_thread is not None:
             return
 
-        if os.path.exists(self.data_path):
+        key = self._compiled_key()
+        have_text = os.path.exists(self.data_path)
+        if os.path.exists(self.compiled_path) and (
+            not have_text or FrameStore.is_current(self.compiled_path, self.data_path, key)
+        ):
             try:
-                self.frames = self._load_frames_from_file(self.data_path)
-                self.status_message = None
-            except Exception as exc:
-                self.load_error = f"Archivo corrupto: {exc}"
-            return
+                self._use_store(FrameStore(self.compiled_path))
+                return
+            except Exception:
+                # Unreadable (e.g. an older format): recompile it from the
+                # text, or download the text again when there is none
+                pass
 
-        if self._download_thread is None:
+        if have_text:
+            self.status_message = "Cargando frames de Bad Apple..."
+            target = self._parse_local
+        else:
             self.status_message = "Descargando Bad Apple ASCII (~6 MB)..."
-            self._download_thread = threading.Thread(
-                target=self._download_dataset, daemon=True
-            )
-            self._download_thread.start()
+            target = self._download_dataset
+        self._load_thread = threading.Thread(target=target, daemon=True)
+        self._load_thread.start()
+
+    def _new_stream(self):
+        stream = TextFrameStream(self._char_intensity)
+        self.frames = stream
+        return stream
+
+    def _parse_local(self):
+        try:
+            stream = self._new_stream()
+            with open(self.data_path, "rb") as handle:
+                for chunk in iter(lambda: handle.read(65536), b""):
+                    stream.feed(chunk)
+            self._finish_stream(stream)
+        except Exception as exc:
+            self.load_error = f"Archivo corrupto: {exc}"
+        finally:
+            self._load_thread = None
 
     def _download_dataset(self):
         tmp_path = self.data_path + ".tmp"
         try:
-            with urllib.request.urlopen(self.DATA_URL) as response, open(
+            stream = self._new_stream()
+            with urllib.request.urlopen(self.data_url) as response, open(
                 tmp_path, "wb"
             ) as output:
                 total = int(response.headers.get("Content-Length", "0") or "0")
@@ -99,6 +161,7 @@ class BadAppleVisual(VisualBase):
                     if not chunk:
                         break
                     output.write(chunk)
+                    stream.feed(chunk)
                     downloaded += len(chunk)
                     if total:
                         pct = int(downloaded / total * 100)
@@ -112,6 +175,7 @@ class BadAppleVisual(VisualBase):
                         )
             os.replace(tmp_path, self.data_path)
             self.status_message = "Descarga completa, cargando frames..."
+            self._finish_stream(stream)
         except Exception as exc:
             self.load_error = f"Descarga falló: {exc}"
             self.status_message = self.load_error
@@ -120,49 +184,65 @@ class BadAppleVisual(VisualBase):
             except OSError:
                 pass
         finally:
-            self._download_thread = None
-
-    def _load_frames_from_file(self, path):
-        with open(path, "r", encoding="utf-8", errors="ignore") as handle:
-            data = handle.read()
-
-        chunks = data.split("SPLIT")
-        raw_frames = []
-        max_height = 0
-        max_width = 0
-        for chunk in chunks:
-            stripped = chunk.strip("\n")
-            if not stripped:
-                continue
-            lines = stripped.splitlines()
-            if not lines:
-                continue
-            raw_frames.append(lines)
-            max_height = max(max_height, len(lines))
-            max_width = max(
-                max_width,
-                max((len(line) for line in lines), default=0),
-            )
+            self._load_thread = None
 
-        if not raw_frames:
-            raise ValueError("no encontré frames en el archivo")
+    def _compiled_key(self):
+        # Intensities depend on the ramp; a different ramp forces a recompile
+        return zlib.crc32(self.DENSITY_RAMP.encode("utf-8"))
 
-        self.source_height = max_height
-        self.source_width = max_width
-        processed_frames: List[List[bytearray]] = []
-        for lines in raw_frames:
-            matrix = []
-            for y in range(self.source_height):
-                line = lines[y] if y < len(lines) else ""
-                row = bytearray(self.source_width)
-                limit = min(len(line), self.source_width)
-                for x in range(limit):
-                    row[x] = int(self._char_intensity(line[x]) * 255)
-                matrix.append(row)
-            processed_frames.append(matrix)
-        return processed_frames
-
-    def _render_frame(self, frame_data, width, height):
+    def _finish_stream(self, stream):
+        """Compile the fully parsed stream and switch playback to the mmap"""
+        stream.finish()
+        if not len(stream):
+            raise ValueError("no encontré frames en el archivo")
+        key = self._compiled_key()
+        if (stream.max_width, stream.max_height) == (stream.width, stream.height):
+            write_blocks(
+                self.compiled_path, stream.blocks(), len(stream), stream.height, stream.width, key
+            )
+            store = FrameStore(self.compiled_path)
+        else:
+            # Frames vary in size: recompile from the file with exact bounds
+            store = compile_text(self.data_path, self.compiled_path, self._char_intensity, key)
+        self._use_store(store)
+
+    def _use_store(self, store):
+        self.source_height = store.height
+        self.source_width = store.width
+        self.frames = store
+        self.status_message = None
+
+    def _build_shade_tables(self):
+        """Character/gray tables indexed by shade code (adjusted intensity * 255)"""
+        adjusted = np.arange(256) / 255.0
+        ramp_max = len(self.DENSITY_RAMP) - 1
+        ramp_index = np.minimum(ramp_max, (adjusted * ramp_max).astype(np.intp))
+        self.shade_chars = codepoints(self.DENSITY_RAMP)[ramp_index]
+        self.shade_levels = (20 + 235 * adjusted).astype(np.uint8)
+        self.shade_blank = adjusted <= self.char_threshold
+        self.shade_chars[self.shade_blank] = ord(" ")
+
+    def _shade_codes(self, intensity):
+        """uint8 shade codes for an array of 0..1 intensities"""
+        adjusted = np.clip(intensity, 0.0, 1.0) ** np.float32(self.contrast_power)
+        return (adjusted * 255 + 0.5).astype(np.uint8)
+
+    def _frame_codes(self, frame_index, target_w, target_h):
+        if not isinstance(self.frames, FrameStore):
+            # Streaming: convert just this frame
+            frame = self.frames[frame_index][None]
+            intensity = resize_frames(frame, target_w, target_h)
+            intensity *= np.float32(1 / 255)
+            return self._shade_codes(intensity)[0]
+        clip = self.clips.get(
+            (target_w, target_h),
+            lambda: ShadedClip(self.frames, target_w, target_h, self._shade_codes),
+        )
+        return clip.frame(frame_index)
+
+    def _render_frame(self, frame_index, width, height):
+        self.source_width = self.frames.width
+        self.source_height = self.frames.height
         if self.source_width == 0 or self.source_height == 0:
             return self._render_message(width, height, ["Sin datos de Bad Apple"])
 
@@ -172,61 +252,18 @@ class BadAppleVisual(VisualBase):
         target_w = max(1, min(width, int(self.source_width * scale)))
         target_h = max(1, min(height, int(self.source_height * scale)))
         pad_left = max(0, (width - target_w) // 2)
-        pad_right = max(0, width - pad_left - target_w)
         pad_top = max(0, (height - target_h) // 2)
-        pad_bottom = max(0, height - pad_top - target_h)
-
-        scale_x = (self.source_width - 1) / max(1, target_w - 1)
-        scale_y = (self.source_height - 1) / max(1, target_h - 1)
 
-        inv_255 = 1.0 / 255.0
-        pattern = []
-        blank_line = " " * width
-        for _ in range(pad_top):
-            pattern.append(blank_line + reset_color())
-
-        for ty in range(target_h):
-            src_y = ty * scale_y
-            y0 = int(src_y)
-            y1 = min(self.source_height - 1, y0 + 1)
-            wy = src_y - y0
-            top_row = frame_data[y0]
-            bottom_row = frame_data[y1]
-            row_chars = []
-            for tx in range(target_w):
-                src_x = tx * scale_x
-                x0 = int(src_x)
-                x1 = min(self.source_width - 1, x0 + 1)
-                wx = src_x - x0
-                i00 = top_row[x0]
-                i10 = top_row[x1]
-                i01 = bottom_row[x0]
-                i11 = bottom_row[x1]
-                top = i00 * (1 - wx) + i10 * wx
-                bottom = i01 * (1 - wx) + i11 * wx
-                intensity = (top * (1 - wy) + bottom * wy) * inv_255
-                row_chars.append(self._shade_from_intensity(intensity))
-
-            row = " " * pad_left + "".join(row_chars) + reset_color()
-            if pad_right:
-                row += " " * pad_right
-            pattern.append(row)
-
-        for _ in range(pad_bottom):
-            pattern.append(blank_line + reset_color())
-
-        return pattern
+        codes = self._frame_codes(frame_index, target_w, target_h)
 
-    def _shade_from_intensity(self, intensity):
-        value = max(0.0, min(1.0, intensity))
-        adjusted = value ** self.contrast_power
-        if adjusted <= self.char_threshold:
-            return reset_color() + " "
-        ramp_index = min(len(self.DENSITY_RAMP) - 1, int(adjusted * (len(self.DENSITY_RAMP) - 1)))
-        char = self.DENSITY_RAMP[ramp_index]
-        level = int(20 + 235 * adjusted)
-        color = rgb_to_ansi(level, level, level)
-        return color + char
+        canvas = self.canvas
+        canvas.resize(width, height)
+        canvas.clear()
+        area = (slice(pad_top, pad_top + target_h), slice(pad_left, pad_left + target_w))
+        canvas.chars[area] = self.shade_chars[codes]
+        canvas.rgb[area] = self.shade_levels[codes][..., None]
+        canvas.colored[area] = ~self.shade_blank[codes]
+        return self.diff.patch()
 
     def _char_intensity(self, char):
         cached = self._intensity_cache.get(char)
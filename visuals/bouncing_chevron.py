@@ -1,12 +1,13 @@
 import math
 import sys
 import os
-import random
 from collections import deque
+import numpy as np
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from core.visual_base import VisualBase
-from core.utils import rgb_to_ansi, reset_color
+from core.canvas import Canvas
+from core.particles import ParticleSystem
 
 class BouncingChevronVisual(VisualBase):
     """Bouncing double chevron with changing purple gradients - DVD logo style"""
@@ -46,11 +47,14 @@ class BouncingChevronVisual(VisualBase):
         self.trail_growth_period = 12
         self.trail_max_thickness = 6  # max edge thickness for ghosts
         self.color_cycle = 0.0
-        self.trail_particles = []
+        self.trail_particles = ParticleSystem(capacity=1400, channels=('intensity', 'color_offset'))
         # Ribbon trail of past positions (center points)
         self.history = deque(maxlen=30)
         self.last_bounce = 0
-        
+        self.canvas = Canvas()
+        # Edge cells of one triangle per edge thickness: (rows, cols)
+        self._edge_cache = {}
+
     def get_purple_gradient(self, cycle_time, intensity=1.0):
         """Generate different shades of purple based on cycle time"""
         # Create smooth cycling through different purple gradients
@@ -76,62 +80,93 @@ class BouncingChevronVisual(VisualBase):
             b = int((220 + tertiary_cycle * 35) * intensity)
         
         return min(255, r), min(255, g), min(255, b)
+
+    def get_purple_gradient_array(self, cycle_time, intensity=1.0):
+        """Vectorized get_purple_gradient: returns an (N, 3) array of colors"""
+        cycle_time = np.asarray(cycle_time, dtype=np.float64)
+        base_cycle = np.sin(cycle_time * 0.3) * 0.5 + 0.5
+        secondary_cycle = np.cos(cycle_time * 0.7) * 0.5 + 0.5
+        tertiary_cycle = np.sin(cycle_time * 0.5 + 1.5) * 0.5 + 0.5
+
+        low = base_cycle < 0.33
+        mid = base_cycle < 0.66
+        r = np.where(low, 120 + base_cycle * 135,
+            np.where(mid, 80 + secondary_cycle * 175, 140 + tertiary_cycle * 115))
+        g = np.where(low, 50 + base_cycle * 100,
+            np.where(mid, 30 + secondary_cycle * 120, 20 + tertiary_cycle * 80))
+        b = np.where(low, 200 + base_cycle * 55,
+            np.where(mid, 180 + secondary_cycle * 75, 220 + tertiary_cycle * 35))
+        rgb = np.stack((r, g, b), axis=-1) * np.asarray(intensity, dtype=np.float64)[..., None]
+        return np.minimum(rgb.astype(np.int32), 255)
     
-    def add_trail_particle(self, x, y, intensity):
-        """Add sparkle trail particles"""
+    def add_trail_particles(self, xs, ys, intensity):
+        """Add sparkle trail particles (one candidate per position)"""
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
         # Higher chance to strengthen trails
-        if random.random() < 0.6:  # 60% chance
-            self.trail_particles.append({
-                'x': x + random.uniform(-1, 1),
-                'y': y + random.uniform(-0.5, 0.5),
-                'age': 0,
-                'max_age': random.randint(18, 38),
-                'intensity': min(1.0, intensity * random.uniform(0.6, 1.1)),
-                'color_offset': random.uniform(0, 2 * math.pi)
-            })
+        keep = self.rng.mask(xs.size, 0.6)  # 60% chance
+        n = int(keep.sum())
+        if n == 0:
+            return
+        self.trail_particles.spawn(
+            n,
+            x=xs[keep] + self.rng.batch(n, -1, 1),
+            y=ys[keep] + self.rng.batch(n, -0.5, 0.5),
+            # Lives while age <= max_age, max_age in [18, 38]
+            lifetime=self.rng.integers(18, 39, n) + 1,
+            intensity=np.minimum(1.0, intensity * self.rng.batch(n, 0.6, 1.1)),
+            color_offset=self.rng.batch(n, 0, 2 * math.pi),
+        )
+
+    def _edge_cells(self, edge_thickness):
+        """Row/column offsets of the slanted edges of one triangle (no base line)"""
+        cells = self._edge_cache.get(edge_thickness)
+        if cells is None:
+            h = self.tri_height
+            w = self.tri_width
+            rows, cols = [], []
+            # Skip bottom row edges to avoid horizontal base line
+            for r in range(h - 1):
+                blocks = 1 + 2 * int(r * self.slope_scale)
+                pad = (w - blocks) // 2
+                left_col = pad
+                right_col = pad + blocks - 1
+                # Thinner tip: single column at the apex
+                local_thickness = 1 if r == 0 else edge_thickness
+                for tcol in range(local_thickness):
+                    for c in (left_col + tcol, right_col - tcol):
+                        # Keep within this row's triangle span
+                        if pad <= c <= pad + blocks - 1:
+                            rows.append(r)
+                            cols.append(c)
+            cells = (np.array(rows, dtype=np.int32), np.array(cols, dtype=np.int32))
+            self._edge_cache[edge_thickness] = cells
+        return cells
 
-    def _draw_triangle_up(self, frame_buffer, color_buffer, top_left_x, top_left_y, main_intensity, color_cycle, ghost_level=0, overwrite=False, edge_thickness=1):
+    def _draw_triangle_up(self, canvas, top_left_x, top_left_y, main_intensity, color_cycle, ghost_level=0, overwrite=False, edge_thickness=1):
         """Draw a single upward outline triangle (no base line).
         - Only draw slanted edges, omit bottom row to avoid base.
         - ghost_level: 0 main, 1 mid, 2 faint (affects char choice)
         - overwrite: if True, draw even if a cell is occupied (to keep logo above trail)
         - edge_thickness: thickness of each slanted edge in columns
         """
-        h = self.tri_height
-        w = self.tri_width
-        for r in range(h):
-            blocks = 1 + 2 * int(r * self.slope_scale)
-            pad = (w - blocks) // 2
-            # Skip bottom row edges to avoid horizontal base line
-            if r == h - 1:
-                continue
-            # Edge columns in this row
-            left_col = pad
-            right_col = pad + blocks - 1
-            # Thinner tip: single column at the apex
-            local_thickness = 1 if r == 0 else edge_thickness
-            for tcol in range(local_thickness):
-                for c in (left_col + tcol, right_col - tcol):
-                    # Keep within this row's triangle span
-                    if c < pad or c > pad + blocks - 1:
-                        continue
-                    draw_x = top_left_x + c
-                    draw_y = top_left_y + r
-                    if draw_y < 0 or draw_x < 0:
-                        continue
-                    if draw_y >= len(frame_buffer) or draw_x >= len(frame_buffer[0]):
-                        continue
-                    if not overwrite and frame_buffer[draw_y][draw_x] != ' ':
-                        continue
-                    # Character based on ghost level
-                    ch = '█' if ghost_level == 0 else ('▓' if ghost_level == 1 else '▒')
-                    # Color
-                    r8, g8, b8 = self.get_purple_gradient(color_cycle + (r * 0.08 + c * 0.06), main_intensity)
-                    frame_buffer[draw_y][draw_x] = ch
-                    color_buffer[draw_y][draw_x] = rgb_to_ansi(r8, g8, b8)
-                    # Edge sparkles
-                    if random.random() < (0.12 if ghost_level == 0 else 0.05):
-                        self.add_trail_particle(draw_x, draw_y, main_intensity * (0.9 if ghost_level == 0 else 0.5))
+        rows, cols = self._edge_cells(edge_thickness)
+        draw_x = top_left_x + cols
+        draw_y = top_left_y + rows
+        keep = (draw_x >= 0) & (draw_x < canvas.width) & (draw_y >= 0) & (draw_y < canvas.height)
+        if not overwrite:
+            keep[keep] = canvas.chars[draw_y[keep], draw_x[keep]] == ord(' ')
+        if not keep.any():
+            return
+        rows, cols, draw_x, draw_y = rows[keep], cols[keep], draw_x[keep], draw_y[keep]
+        # Character based on ghost level
+        ch = '█' if ghost_level == 0 else ('▓' if ghost_level == 1 else '▒')
+        colors = self.get_purple_gradient_array(color_cycle + (rows * 0.08 + cols * 0.06), main_intensity)
+        canvas.plot(draw_x, draw_y, ch, colors)
+        # Edge sparkles
+        sparkle = self.rng.mask(draw_x.size, 0.12 if ghost_level == 0 else 0.05)
+        if sparkle.any():
+            self.add_trail_particles(draw_x[sparkle], draw_y[sparkle], main_intensity * (0.9 if ghost_level == 0 else 0.5))
 
     def generate_frame(self, width, height, time_offset):
         # Debug frame counting / freezing
@@ -159,25 +194,21 @@ class BouncingChevronVisual(VisualBase):
                 # Bounce burst of particles
                 cx = int(self.x + self.chevron_width // 2)
                 cy = int(self.y + self.chevron_height // 2)
-                for _ in range(18):
-                    self.add_trail_particle(cx, cy, 1.0)
+                self.add_trail_particles(np.full(18, cx), np.full(18, cy), 1.0)
         
         # Update color cycle
         self.color_cycle += 0.1
         
         # Update trail particles (unless frozen)
         if not freeze:
-            for particle in self.trail_particles[:]:
-                particle['age'] += 1
-                if particle['age'] > particle['max_age']:
-                    self.trail_particles.remove(particle)
+            self.trail_particles.step()
             # Cap particles to avoid buildup
-            if len(self.trail_particles) > 1200:
-                del self.trail_particles[:len(self.trail_particles) - 1200]
+            self.trail_particles.limit(1200)
 
         # Create frame buffer
-        frame_buffer = [[' ' for _ in range(width)] for _ in range(height)]
-        color_buffer = [['' for _ in range(width)] for _ in range(height)]
+        canvas = self.canvas
+        canvas.resize(width, height)
+        canvas.clear()
 
         # Update ribbon trail history (use chevron center)
         center_x = self.x + self.chevron_width / 2
@@ -185,20 +216,14 @@ class BouncingChevronVisual(VisualBase):
         self.history.append((center_x, center_y))
 
         # Draw trail particles
-        for particle in self.trail_particles:
-            px, py = int(particle['x']), int(particle['y'])
-            if 0 <= px < width and 0 <= py < height:
-                fade = max(0.1, 1.0 - particle['age'] / particle['max_age'])
-                intensity = particle['intensity'] * fade
-                
-                if intensity > 0.1:
-                    r, g, b = self.get_purple_gradient(
-                        self.color_cycle + particle['color_offset'], 
-                        intensity * 0.9
-                    )
-                    char = '✦' if intensity > 0.6 else '·' if intensity > 0.3 else '.'
-                    frame_buffer[py][px] = char
-                    color_buffer[py][px] = rgb_to_ansi(r, g, b)
+        particles = self.trail_particles
+        if len(particles):
+            fade = np.maximum(0.1, 1.0 - particles.age / (particles.lifetime - 1))
+            intensity = particles.intensity * fade
+            colors = self.get_purple_gradient_array(self.color_cycle + particles.color_offset, intensity * 0.9)
+            chars = np.where(intensity > 0.6, ord('✦'), np.where(intensity > 0.3, ord('·'), ord('.'))).astype(np.uint32)
+            # Newest particles on top
+            particles.rasterize(canvas, chars, colors, mask=intensity > 0.1, z=-particles.age)
         # Draw ribbon ghost chevrons from history (thicker, visible trail)
         # Draw older positions first (fainter), skip every 2 for spacing
         if len(self.history) > 3:
@@ -214,22 +239,22 @@ class BouncingChevronVisual(VisualBase):
                 # Trail edge thickness grows every N frames, capped (based on frame index)
                 ghost_thickness = 1 + min(self.trail_max_thickness - 1, frame_index_est // self.trail_growth_period)
                 # Upper triangle
-                self._draw_triangle_up(frame_buffer, color_buffer, top_left_x, top_left_y, intensity, self.color_cycle - age_factor * 0.6, ghost_level=2, edge_thickness=ghost_thickness, overwrite=True)
+                self._draw_triangle_up(canvas, top_left_x, top_left_y, intensity, self.color_cycle - age_factor * 0.6, ghost_level=2, edge_thickness=ghost_thickness, overwrite=True)
                 # Lower triangle (stacked)
                 second_y_hist = top_left_y + self.tri_height - self.overlap
-                self._draw_triangle_up(frame_buffer, color_buffer, top_left_x, second_y_hist, intensity * 0.95, self.color_cycle - age_factor * 0.6, ghost_level=2, edge_thickness=ghost_thickness, overwrite=True)
+                self._draw_triangle_up(canvas, top_left_x, second_y_hist, intensity * 0.95, self.color_cycle - age_factor * 0.6, ghost_level=2, edge_thickness=ghost_thickness, overwrite=True)
 
         # Draw main double up-chevron (draw last, overwrite trail/ghost)
         chevron_x = int(self.x)
         chevron_y = int(self.y)
         self._draw_triangle_up(
-            frame_buffer, color_buffer, chevron_x, chevron_y,
+            canvas, chevron_x, chevron_y,
             1.0, self.color_cycle, ghost_level=0, overwrite=True, edge_thickness=2
         )
         # Second chevron slightly intruding upwards into the first
         second_y = chevron_y + self.tri_height - self.overlap
         self._draw_triangle_up(
-            frame_buffer, color_buffer, chevron_x, second_y,
+            canvas, chevron_x, second_y,
             0.95, self.color_cycle + 0.3, ghost_level=0, overwrite=True, edge_thickness=2
         )
 
@@ -239,49 +264,34 @@ class BouncingChevronVisual(VisualBase):
 
         # Add subtle glow effect around chevron
         glow_radius = 4
-        for dy in range(-glow_radius, glow_radius + 1):
-            for dx in range(-glow_radius, glow_radius + 1):
-                glow_x = chevron_x + self.chevron_width // 2 + dx
-                glow_y = chevron_y + self.chevron_height // 2 + dy
-                
-                if (0 <= glow_x < width and 0 <= glow_y < height and 
-                    frame_buffer[glow_y][glow_x] == ' '):
-                    
-                    distance = math.sqrt(dx*dx + dy*dy)
-                    if distance <= glow_radius:
-                        glow_intensity = max(0, (glow_radius - distance) / glow_radius) * 0.3
-                        
-                        if glow_intensity > 0.05:
-                            r, g, b = self.get_purple_gradient(self.color_cycle, glow_intensity)
-                            frame_buffer[glow_y][glow_x] = '░'
-                            color_buffer[glow_y][glow_x] = rgb_to_ansi(r, g, b)
-        
+        glow_cx = chevron_x + self.chevron_width // 2
+        glow_cy = chevron_y + self.chevron_height // 2
+        area = canvas.view(glow_cx - glow_radius, glow_cy - glow_radius,
+                           glow_cx + glow_radius, glow_cy + glow_radius)
+        if area is not None:
+            dx = area.xs + area.x0 - glow_cx
+            dy = area.ys + area.y0 - glow_cy
+            distance = np.sqrt(dx * dx + dy * dy)
+            glow_intensity = np.maximum(0, (glow_radius - distance) / glow_radius) * 0.3
+            glow = (area.chars == ord(' ')) & (distance <= glow_radius) & (glow_intensity > 0.05)
+            colors = self.get_purple_gradient_array(self.color_cycle, glow_intensity[glow])
+            area.paint(glow, '░', colors)
+
         # Add some sparkles around the screen for ambiance
         sparkle_count = 12
         for i in range(sparkle_count):
             sparkle_x = int((math.sin(time_offset * 0.5 + i * 0.8) * 0.4 + 0.5) * width)
             sparkle_y = int((math.cos(time_offset * 0.3 + i * 1.2) * 0.4 + 0.5) * height)
-            
-            if (0 <= sparkle_x < width and 0 <= sparkle_y < height and 
-                frame_buffer[sparkle_y][sparkle_x] == ' '):
-                
+
+            if (0 <= sparkle_x < width and 0 <= sparkle_y < height and
+                canvas.get(sparkle_x, sparkle_y) == ' '):
+
                 sparkle_intensity = (math.sin(time_offset * 2 + i) * 0.3 + 0.7) * 0.55
                 if sparkle_intensity > 0.2:
-                    r, g, b = self.get_purple_gradient(
-                        self.color_cycle + i * 0.7, 
+                    color = self.get_purple_gradient(
+                        self.color_cycle + i * 0.7,
                         sparkle_intensity
                     )
-                    frame_buffer[sparkle_y][sparkle_x] = '✦'
-                    color_buffer[sparkle_y][sparkle_x] = rgb_to_ansi(r, g, b)
-        
-        # Convert to pattern format
-        pattern = []
-        for y in range(height):
-            row = ""
-            for x in range(width):
-                char = frame_buffer[y][x]
-                color = color_buffer[y][x]
-                row += color + char
-            pattern.append(row + reset_color())
-        
-        return pattern
+                    canvas.put(sparkle_x, sparkle_y, '✦', color)
+
+        return canvas.to_rows()
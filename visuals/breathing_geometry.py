@@ -1,14 +1,20 @@
-import math
 import sys
 import os
+import numpy as np
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from core.visual_base import VisualBase
-from core.utils import rgb_to_ansi, reset_color
+from core.shader import ShaderVisual
+from core.polar import PolarLookup, PolarTexture
+from core import distance, fastmath
 
 
-class BreathingGeometryVisual(VisualBase):
-    """Massive sacred geometry filling the screen"""
+class BreathingGeometryVisual(ShaderVisual):
+    """Massive sacred geometry filling the screen.
+
+    Each frame builds the pattern's circles and segments once, then turns
+    them into a distance field (``core.distance``) in which every primitive
+    only touches the cells near it.
+    """
 
     metadata = {
         "name": "Breathing Geometry",
@@ -18,151 +24,93 @@ class BreathingGeometryVisual(VisualBase):
         "ai_creator": "Claude Opus 4.5"
     }
 
-    def __init__(self):
-        # Sin lookup for speed - 128 entries for smoother curves
-        self.sin_lut = [math.sin(i * 6.28318 / 128) for i in range(128)]
-        self.cos_lut = [math.cos(i * 6.28318 / 128) for i in range(128)]
-
-        # Characters - bold and defined
-        self.chars = " ·∙○●◉◈█"
+    # Characters - bold and defined
+    char_ramp = " ·∙○●◉◈█"
+    # Character selection - sharper thresholds
+    ramp_levels = (0.08, 0.15, 0.25, 0.4, 0.55, 0.7, 0.85)
+    aspect = 2.0
 
-    def _fast_sin(self, x):
-        return self.sin_lut[int((x % 6.28318) * 20.37) & 127]
+    # Polar texture of the cube, shared by every instance (built on first frame)
+    _metatron_texture = None
 
-    def _fast_cos(self, x):
-        return self.cos_lut[int((x % 6.28318) * 20.37) & 127]
+    def __init__(self):
+        self.chars = self.char_ramp
 
-    def _flower_of_life(self, x, y, t, scale):
+    def _flower_of_life(self, grid, t, scale):
         """Full flower of life - 3 rings of circles"""
-        intensity = 0
-
-        breath = 1.0 + 0.12 * self._fast_sin(t * 0.4)
+        breath = 1.0 + 0.12 * fastmath.sin(t * 0.4)
         base_radius = 0.12 * scale * breath
 
         # Thicker lines
         line_width = base_radius * 0.12
 
         # Build circles: center + 3 rings
-        circles = [(0, 0, base_radius)]
+        circles = [(0, 0)]
 
         # First ring - 6 circles
         for i in range(6):
             a = i * 1.047 + t * 0.08
-            circles.append((
-                base_radius * 2 * self._fast_cos(a),
-                base_radius * 2 * self._fast_sin(a),
-                base_radius
-            ))
+            circles.append((base_radius * 2 * fastmath.cos(a), base_radius * 2 * fastmath.sin(a)))
 
         # Second ring - 12 circles (between first ring)
         for i in range(12):
             a = i * 0.5236 + t * 0.06
             r = base_radius * 3.46  # sqrt(12) roughly
-            circles.append((
-                r * self._fast_cos(a),
-                r * self._fast_sin(a),
-                base_radius
-            ))
+            circles.append((r * fastmath.cos(a), r * fastmath.sin(a)))
 
         # Third ring - 18 circles (outer)
         for i in range(18):
             a = i * 0.349 + t * 0.04
             r = base_radius * 4
-            circles.append((
-                r * self._fast_cos(a),
-                r * self._fast_sin(a),
-                base_radius
-            ))
-
-        for cx, cy, rad in circles:
-            dist_to_center = math.sqrt((x - cx) ** 2 + (y - cy) ** 2)
-            dist_to_edge = abs(dist_to_center - rad)
-
-            if dist_to_edge < line_width:
-                edge_int = 1.0 - (dist_to_edge / line_width) ** 0.4
-                intensity = max(intensity, edge_int)
+            circles.append((r * fastmath.cos(a), r * fastmath.sin(a)))
 
-        return intensity
-
-    def _hexagram(self, x, y, t, scale):
-        """Massive Star of David with inner patterns"""
-        intensity = 0
-
-        rot = t * 0.15
-        size = scale * 0.55 * (1.0 + 0.08 * self._fast_sin(t * 0.3))
-        line_width = scale * 0.02
+        dist = distance.circles(grid, circles, base_radius, line_width)
+        return distance.falloff(dist, line_width, 0.4)
 
-        # Main hexagram - two triangles
+    @staticmethod
+    def _star_edges(rot, size):
+        """Edges of a hexagram (two triangles) as (starts, ends)"""
+        starts, ends = [], []
         for tri in range(2):
             tri_rot = rot + tri * 0.523
 
             for i in range(3):
                 a1 = tri_rot + i * 2.094
                 a2 = tri_rot + (i + 1) * 2.094
+                starts.append((size * fastmath.cos(a1), size * fastmath.sin(a1)))
+                ends.append((size * fastmath.cos(a2), size * fastmath.sin(a2)))
+        return starts, ends
 
-                x1, y1 = size * self._fast_cos(a1), size * self._fast_sin(a1)
-                x2, y2 = size * self._fast_cos(a2), size * self._fast_sin(a2)
-
-                dx, dy = x2 - x1, y2 - y1
-                length_sq = dx * dx + dy * dy
-                if length_sq > 0:
-                    t_param = max(0, min(1, ((x - x1) * dx + (y - y1) * dy) / length_sq))
-                    px, py = x1 + t_param * dx, y1 + t_param * dy
-                    dist = math.sqrt((x - px) ** 2 + (y - py) ** 2)
+    def _hexagram(self, grid, t, scale):
+        """Massive Star of David with inner patterns"""
+        rot = t * 0.15
+        size = scale * 0.55 * (1.0 + 0.08 * fastmath.sin(t * 0.3))
+        line_width = scale * 0.02
 
-                    if dist < line_width:
-                        intensity = max(intensity, 1.0 - dist / line_width)
+        # Main hexagram - two triangles
+        starts, ends = self._star_edges(rot, size)
+        dist = distance.segments(grid, starts, ends, line_width)
+        intensity = distance.falloff(dist, line_width)
 
         # Inner hexagram (smaller, counter-rotating)
-        size2 = size * 0.5
-        rot2 = -rot * 1.5
-        for tri in range(2):
-            tri_rot = rot2 + tri * 0.523
-
-            for i in range(3):
-                a1 = tri_rot + i * 2.094
-                a2 = tri_rot + (i + 1) * 2.094
-
-                x1, y1 = size2 * self._fast_cos(a1), size2 * self._fast_sin(a1)
-                x2, y2 = size2 * self._fast_cos(a2), size2 * self._fast_sin(a2)
-
-                dx, dy = x2 - x1, y2 - y1
-                length_sq = dx * dx + dy * dy
-                if length_sq > 0:
-                    t_param = max(0, min(1, ((x - x1) * dx + (y - y1) * dy) / length_sq))
-                    px, py = x1 + t_param * dx, y1 + t_param * dy
-                    dist = math.sqrt((x - px) ** 2 + (y - py) ** 2)
-
-                    if dist < line_width * 0.8:
-                        intensity = max(intensity, 0.85 * (1.0 - dist / (line_width * 0.8)))
+        starts, ends = self._star_edges(-rot * 1.5, size * 0.5)
+        dist = distance.segments(grid, starts, ends, line_width * 0.8)
+        np.maximum(intensity, distance.falloff(dist, line_width * 0.8, peak=0.85), out=intensity)
 
         # Central hexagon
         hex_r = size * 0.22
-        for i in range(6):
-            a1 = rot + i * 1.047
-            a2 = rot + (i + 1) * 1.047
-            x1, y1 = hex_r * self._fast_cos(a1), hex_r * self._fast_sin(a1)
-            x2, y2 = hex_r * self._fast_cos(a2), hex_r * self._fast_sin(a2)
-
-            dx, dy = x2 - x1, y2 - y1
-            length_sq = dx * dx + dy * dy
-            if length_sq > 0:
-                t_param = max(0, min(1, ((x - x1) * dx + (y - y1) * dy) / length_sq))
-                px, py = x1 + t_param * dx, y1 + t_param * dy
-                dist = math.sqrt((x - px) ** 2 + (y - py) ** 2)
-
-                if dist < line_width * 0.7:
-                    intensity = max(intensity, 0.9 * (1.0 - dist / (line_width * 0.7)))
+        hexagon = [
+            (hex_r * fastmath.cos(rot + i * 1.047), hex_r * fastmath.sin(rot + i * 1.047))
+            for i in range(7)
+        ]
+        dist = distance.segments(grid, hexagon[:-1], hexagon[1:], line_width * 0.7)
+        np.maximum(intensity, distance.falloff(dist, line_width * 0.7, peak=0.9), out=intensity)
 
         return intensity
 
-    def _metatron(self, x, y, t, scale):
-        """Full Metatron's Cube - all 13 circles connected"""
-        intensity = 0
-
-        rot = t * 0.1
-        line_width = scale * 0.018
-
+    @staticmethod
+    def _metatron_shapes(rot, scale):
+        """Vertices and connecting lines of Metatron's Cube"""
         # 13 vertices of Metatron's Cube
         vertices = [(0, 0)]  # Center
 
@@ -170,22 +118,13 @@ class BreathingGeometryVisual(VisualBase):
         inner_r = scale * 0.2
         for i in range(6):
             a = rot + i * 1.047
-            vertices.append((inner_r * self._fast_cos(a), inner_r * self._fast_sin(a)))
+            vertices.append((inner_r * fastmath.cos(a), inner_r * fastmath.sin(a)))
 
         # Outer hexagon (6 points, offset by 30 degrees)
         outer_r = scale * 0.45
         for i in range(6):
             a = rot + i * 1.047 + 0.523
-            vertices.append((outer_r * self._fast_cos(a), outer_r * self._fast_sin(a)))
-
-        # Draw circles at each vertex
-        circle_r = inner_r * 0.6
-        for vx, vy in vertices:
-            dist_to_center = math.sqrt((x - vx) ** 2 + (y - vy) ** 2)
-            dist_to_edge = abs(dist_to_center - circle_r)
-            if dist_to_edge < line_width:
-                c_int = 1.0 - (dist_to_edge / line_width) ** 0.5
-                intensity = max(intensity, c_int * 0.7)
+            vertices.append((outer_r * fastmath.cos(a), outer_r * fastmath.sin(a)))
 
         # Connect ALL vertices (the key characteristic)
         all_lines = []
@@ -208,40 +147,55 @@ class BreathingGeometryVisual(VisualBase):
             all_lines.append((vertices[1 + i], vertices[7 + (i + 1) % 6]))
             all_lines.append((vertices[1 + i], vertices[7 + (i + 5) % 6]))
 
+        return vertices, all_lines
+
+    @classmethod
+    def _metatron_pattern(cls, rho, phi):
+        """Metatron's Cube at scale 1, unrotated, over polar sample points"""
+        x = rho * np.cos(phi)
+        y = rho * np.sin(phi)
+        line_width = 0.018
+        vertices, all_lines = cls._metatron_shapes(0.0, 1.0)
+
+        # Draw circles at each vertex
+        circle_r = 0.2 * 0.6
+        dist = np.full(np.broadcast(x, y).shape, np.inf)
+        for vertex in vertices:
+            np.minimum(dist, distance.circle_distance(x, y, vertex, circle_r), out=dist)
+        intensity = distance.falloff(dist, line_width, 0.5, peak=0.7)
+
         # Draw all lines
-        for (x1, y1), (x2, y2) in all_lines:
-            dx, dy = x2 - x1, y2 - y1
-            length_sq = dx * dx + dy * dy
-            if length_sq > 0.0001:
-                t_param = max(0, min(1, ((x - x1) * dx + (y - y1) * dy) / length_sq))
-                px, py = x1 + t_param * dx, y1 + t_param * dy
-                dist = math.sqrt((x - px) ** 2 + (y - py) ** 2)
-
-                if dist < line_width:
-                    line_int = 1.0 - (dist / line_width) ** 0.6
-                    intensity = max(intensity, line_int * 0.85)
+        dist[...] = np.inf
+        for start, end in all_lines:
+            np.minimum(dist, distance.segment_distance(x, y, start, end), out=dist)
+        np.maximum(intensity, distance.falloff(dist, line_width, 0.6, peak=0.85), out=intensity)
 
         # Bright vertices
-        for vx, vy in vertices:
-            dist = math.sqrt((x - vx) ** 2 + (y - vy) ** 2)
-            if dist < line_width * 2.5:
-                v_int = 1.0 - dist / (line_width * 2.5)
-                intensity = max(intensity, v_int)
+        dist[...] = np.inf
+        for vertex in vertices:
+            np.minimum(dist, distance.circle_distance(x, y, vertex, 0.0), out=dist)
+        np.maximum(intensity, distance.falloff(dist, line_width * 2.5), out=intensity)
 
         return intensity
 
-    def _sri_yantra(self, x, y, t, scale):
-        """Sri Yantra - 9 interlocking triangles"""
-        intensity = 0
+    def _metatron(self, grid, t, scale):
+        """Full Metatron's Cube - all 13 circles connected
 
+        The cube only rotates, so it is drawn once into a polar texture (in
+        units of ``scale``, one 60 degree sector) and sampled every frame.
+        """
+        lookup = grid.cached('metatron', lambda g: PolarLookup.of_grid(g, unit=scale))
+        return self._metatron_texture.sample(lookup, rotate=t * 0.1)
+
+    def _sri_yantra(self, grid, t, scale):
+        """Sri Yantra - 9 interlocking triangles"""
         rot = t * 0.08
         line_width = scale * 0.015
 
         # Outer circle
         outer_r = scale * 0.5
-        dist_to_circle = abs(math.sqrt(x * x + y * y) - outer_r)
-        if dist_to_circle < line_width:
-            intensity = max(intensity, 0.6 * (1.0 - dist_to_circle / line_width))
+        dist = distance.circles(grid, [(0, 0)], outer_r, line_width)
+        intensity = distance.falloff(dist, line_width, peak=0.6)
 
         # 9 triangles (4 pointing up, 5 pointing down) at different scales
         triangles = [
@@ -256,42 +210,28 @@ class BreathingGeometryVisual(VisualBase):
             (0.12, 0.22, False),
         ]
 
+        dist = distance.empty(grid)
         for tri_scale, y_offset, pointing_up in triangles:
             size = scale * tri_scale
             base_rot = rot if pointing_up else rot + 3.14159
+            shift = -y_offset * scale if pointing_up else y_offset * scale
 
-            for i in range(3):
-                a1 = base_rot + i * 2.094 - 1.57
-                a2 = base_rot + (i + 1) * 2.094 - 1.57
-
-                x1 = size * self._fast_cos(a1)
-                y1 = size * self._fast_sin(a1) + (y_offset * scale if not pointing_up else -y_offset * scale)
-                x2 = size * self._fast_cos(a2)
-                y2 = size * self._fast_sin(a2) + (y_offset * scale if not pointing_up else -y_offset * scale)
-
-                dx, dy = x2 - x1, y2 - y1
-                length_sq = dx * dx + dy * dy
-                if length_sq > 0:
-                    t_param = max(0, min(1, ((x - x1) * dx + (y - y1) * dy) / length_sq))
-                    px, py = x1 + t_param * dx, y1 + t_param * dy
-                    dist = math.sqrt((x - px) ** 2 + (y - py) ** 2)
-
-                    if dist < line_width:
-                        intensity = max(intensity, 1.0 - dist / line_width)
+            corners = []
+            for i in range(4):
+                a = base_rot + i * 2.094 - 1.57
+                corners.append((size * fastmath.cos(a), size * fastmath.sin(a) + shift))
+            distance.segments(grid, corners[:-1], corners[1:], line_width, out=dist)
+        np.maximum(intensity, distance.falloff(dist, line_width), out=intensity)
 
         # Central bindu (dot)
-        bindu_dist = math.sqrt(x * x + y * y)
-        if bindu_dist < line_width * 3:
-            intensity = max(intensity, 1.0 - bindu_dist / (line_width * 3))
+        dist = distance.points(grid, [(0, 0)], line_width * 3)
+        np.maximum(intensity, distance.falloff(dist, line_width * 3), out=intensity)
 
         return intensity
 
-    def _torus(self, x, y, t, scale):
+    def _torus(self, grid, t, scale):
         """Torus/donut shape with grid lines"""
-        intensity = 0
-
-        r = math.sqrt(x * x + y * y)
-        angle = math.atan2(y, x)
+        intensity = np.zeros(grid.shape)
 
         # Torus parameters
         R = scale * 0.35  # Major radius
@@ -304,120 +244,74 @@ class BreathingGeometryVisual(VisualBase):
             phase_angle = phase * 0.785 + t * 0.3
 
             # Torus center for this slice
-            cx = R * self._fast_cos(phase_angle)
-            cy = R * self._fast_sin(phase_angle) * 0.4  # Flatten for perspective
-
-            dist_to_tube = abs(math.sqrt((x - cx) ** 2 + (y - cy) ** 2) - tube_r)
-            if dist_to_tube < line_width:
-                ring_int = 1.0 - dist_to_tube / line_width
-                # Fade based on phase for 3D effect
-                depth = 0.5 + 0.5 * self._fast_cos(phase_angle)
-                intensity = max(intensity, ring_int * depth * 0.8)
-
-        # Radial grid lines
+            cx = R * fastmath.cos(phase_angle)
+            cy = R * fastmath.sin(phase_angle) * 0.4  # Flatten for perspective
+
+            # Fade based on phase for 3D effect
+            depth = 0.5 + 0.5 * fastmath.cos(phase_angle)
+            dist = distance.circles(grid, [(cx, cy)], tube_r, line_width)
+            np.maximum(intensity, distance.falloff(dist, line_width, peak=depth * 0.8), out=intensity)
+
+        # Radial grid lines, only within the tube's band
+        band = (R - tube_r < grid.r) & (grid.r < R + tube_r)
+        angle = grid.theta[band]
+        lines = np.zeros(angle.shape)
         num_lines = 12
         for i in range(num_lines):
             line_angle = i * 6.28318 / num_lines + t * 0.2
 
             # Check if point is near this radial line
-            angle_diff = abs(((angle - line_angle + 3.14159) % 6.28318) - 3.14159)
-            if angle_diff < 0.05 and R - tube_r < r < R + tube_r:
-                line_int = (1.0 - angle_diff / 0.05) * 0.6
-                intensity = max(intensity, line_int)
+            angle_diff = np.abs(((angle - line_angle + 3.14159) % 6.28318) - 3.14159)
+            np.maximum(lines, distance.falloff(angle_diff, 0.05, peak=0.6), out=lines)
+        intensity[band] = np.maximum(intensity[band], lines)
 
         return intensity
 
-    def generate_frame(self, width, height, time_offset):
-        t = time_offset
-        cx, cy = width * 0.5, height * 0.5
-        aspect = 2.0
+    def shade(self, grid, t):
+        if BreathingGeometryVisual._metatron_texture is None:
+            # Built when the visual starts rather than when the cube first shows up
+            BreathingGeometryVisual._metatron_texture = PolarTexture(
+                self._metatron_pattern, extent=0.62, radial_bins=320, angular_bins=320,
+                folds=6, bilinear=True,
+            )
 
         # MUCH BIGGER - use 85% of screen
-        scale = min(width, height * aspect) * 0.85
+        scale = min(grid.width, grid.height * self.aspect) * 0.85
 
         # Cycle through 5 patterns
         cycle = 15.0
         pattern = int((t / cycle) % 5)
 
-        output = []
-
-        for y_pos in range(height):
-            row = ""
-
-            for x_pos in range(width):
-                x = (x_pos - cx)
-                y = (y_pos - cy) * aspect
-
-                intensity = 0
-
-                if pattern == 0:
-                    intensity = self._flower_of_life(x, y, t, scale)
-                elif pattern == 1:
-                    intensity = self._hexagram(x, y, t, scale)
-                elif pattern == 2:
-                    intensity = self._metatron(x, y, t, scale)
-                elif pattern == 3:
-                    intensity = self._sri_yantra(x, y, t, scale)
-                else:
-                    intensity = self._torus(x, y, t, scale)
-
-                if intensity > 0.08:
-                    # Character selection - sharper thresholds
-                    if intensity > 0.85:
-                        char = '█'
-                    elif intensity > 0.7:
-                        char = '◈'
-                    elif intensity > 0.55:
-                        char = '◉'
-                    elif intensity > 0.4:
-                        char = '●'
-                    elif intensity > 0.25:
-                        char = '○'
-                    elif intensity > 0.15:
-                        char = '∙'
-                    else:
-                        char = '·'
-
-                    # Rich color palette
-                    r_dist = math.sqrt(x * x + y * y)
-                    angle = math.atan2(y, x)
-
-                    # Different color schemes per pattern
-                    if pattern == 0:  # Flower - golden/white
-                        hue = angle * 0.5 + t * 0.2
-                        cr = int((220 + 35 * self._fast_sin(hue)) * intensity)
-                        cg = int((180 + 50 * self._fast_sin(hue + 1)) * intensity)
-                        cb = int((100 + 80 * self._fast_sin(hue + 2)) * intensity)
-                    elif pattern == 1:  # Hexagram - purple/blue
-                        hue = r_dist * 0.015 + t * 0.25
-                        cr = int((160 + 80 * self._fast_sin(hue)) * intensity)
-                        cg = int((80 + 100 * self._fast_sin(hue + 2)) * intensity)
-                        cb = int((220 + 35 * self._fast_sin(hue + 4)) * intensity)
-                    elif pattern == 2:  # Metatron - cyan/white
-                        hue = angle + r_dist * 0.01 + t * 0.3
-                        cr = int((140 + 80 * self._fast_sin(hue)) * intensity)
-                        cg = int((200 + 55 * self._fast_sin(hue + 1.5)) * intensity)
-                        cb = int((230 + 25 * self._fast_sin(hue + 3)) * intensity)
-                    elif pattern == 3:  # Sri Yantra - red/orange/gold
-                        hue = r_dist * 0.02 + t * 0.15
-                        cr = int((230 + 25 * self._fast_sin(hue)) * intensity)
-                        cg = int((120 + 80 * self._fast_sin(hue + 1.5)) * intensity)
-                        cb = int((50 + 60 * self._fast_sin(hue + 3)) * intensity)
-                    else:  # Torus - rainbow
-                        hue = angle + r_dist * 0.02 + t * 0.4
-                        cr = int((180 + 75 * self._fast_sin(hue)) * intensity)
-                        cg = int((180 + 75 * self._fast_sin(hue + 2.1)) * intensity)
-                        cb = int((180 + 75 * self._fast_sin(hue + 4.2)) * intensity)
-
-                    color = rgb_to_ansi(
-                        max(0, min(255, cr)),
-                        max(0, min(255, cg)),
-                        max(0, min(255, cb))
-                    )
-                    row += color + char
-                else:
-                    row += ' '
-
-            output.append(row + reset_color())
-
-        return output
+        if pattern == 0:
+            intensity = self._flower_of_life(grid, t, scale)
+        elif pattern == 1:
+            intensity = self._hexagram(grid, t, scale)
+        elif pattern == 2:
+            intensity = self._metatron(grid, t, scale)
+        elif pattern == 3:
+            intensity = self._sri_yantra(grid, t, scale)
+        else:
+            intensity = self._torus(grid, t, scale)
+
+        # Rich color palette
+        r_dist = grid.r
+        angle = grid.theta
+
+        # Different color schemes per pattern
+        if pattern == 0:  # Flower - golden/white
+            hue = angle * 0.5 + t * 0.2
+            rgb = (220 + 35 * np.sin(hue), 180 + 50 * np.sin(hue + 1), 100 + 80 * np.sin(hue + 2))
+        elif pattern == 1:  # Hexagram - purple/blue
+            hue = r_dist * 0.015 + t * 0.25
+            rgb = (160 + 80 * np.sin(hue), 80 + 100 * np.sin(hue + 2), 220 + 35 * np.sin(hue + 4))
+        elif pattern == 2:  # Metatron - cyan/white
+            hue = angle + r_dist * 0.01 + t * 0.3
+            rgb = (140 + 80 * np.sin(hue), 200 + 55 * np.sin(hue + 1.5), 230 + 25 * np.sin(hue + 3))
+        elif pattern == 3:  # Sri Yantra - red/orange/gold
+            hue = r_dist * 0.02 + t * 0.15
+            rgb = (230 + 25 * np.sin(hue), 120 + 80 * np.sin(hue + 1.5), 50 + 60 * np.sin(hue + 3))
+        else:  # Torus - rainbow
+            hue = angle + r_dist * 0.02 + t * 0.4
+            rgb = (180 + 75 * np.sin(hue), 180 + 75 * np.sin(hue + 2.1), 180 + 75 * np.sin(hue + 4.2))
+
+        return intensity, tuple(channel * intensity for channel in rgb), intensity > 0.08
@@ -1,11 +1,11 @@
 import math
 import sys
 import os
-import random
+import numpy as np
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from core.visual_base import VisualBase
-from core.utils import rgb_to_ansi, reset_color
+from core.canvas import Canvas, codepoints
 
 
 class DJSetVisual(VisualBase):
@@ -32,7 +32,7 @@ class DJSetVisual(VisualBase):
         self.faders = [0.3, 0.7, 0.5, 0.6]  # 0-1
         self.crossfader = 0.5               # 0 left, 1 right
         self.knobs = [0.2, 0.5, 0.8, 0.4, 0.65, 0.35, 0.55, 0.25]  # 8 knobs top
-        self.vu_phases = [random.random() * 6.283 for _ in range(self.channel_count)]
+        self.vu_phases = [self.rng.random() * 6.283 for _ in range(self.channel_count)]
         self.master_vu_phase = 0.0
         # Deck screens, pads, LEDs
         self.left_wave_phase = 0.0
@@ -40,46 +40,27 @@ class DJSetVisual(VisualBase):
         self.pad_phase = 0.0
         self.sparkle_phase = 0.0
         self.logo_pulse = 0.0
-
-    def _draw_char(self, fb, cb, x, y, width, height, char, color):
-        if 0 <= x < width and 0 <= y < height:
-            fb[y][x] = char
-            cb[y][x] = color
+        self.canvas = Canvas()
+        self.groove_chars = codepoints('·░▒')
 
     def _disc_color(self, radius_norm, angle):
-        # Subtle cyan/blue ring gradient
+        # Subtle cyan/blue ring gradient (radius_norm is an array of cells)
         hue_shift = (math.sin(angle * 6) * 0.5 + 0.5) * 40
-        r = int(30 + 20 * (1 - radius_norm))
-        g = int(120 + 80 * (1 - radius_norm))
-        b = int(200 + hue_shift)
-        return rgb_to_ansi(r, g, min(255, b))
+        r = (30 + 20 * (1 - radius_norm)).astype(np.int32)
+        g = (120 + 80 * (1 - radius_norm)).astype(np.int32)
+        b = np.full_like(r, min(255, int(200 + hue_shift)))
+        return np.stack([r, g, b], axis=-1)
 
     def _accent_color(self, t):
         # Magenta accent that pulses with time
         r = int(180 + 50 * math.sin(t))
         g = int(40 + 20 * math.sin(t * 0.5 + 1.7))
         b = int(220 + 35 * math.sin(t * 0.8 + 0.3))
-        return rgb_to_ansi(min(255, r), max(0, g), min(255, b))
+        return (min(255, r), max(0, g), min(255, b))
 
     def _panel_color(self):
         # Dark gray panel
-        return rgb_to_ansi(80, 90, 110)
-
-    def _draw_rect(self, fb, cb, x0, y0, x1, y1, char, color):
-        if x0 > x1 or y0 > y1:
-            return
-        width = len(fb[0])
-        height = len(fb)
-        x0 = max(0, x0)
-        y0 = max(0, y0)
-        x1 = min(width - 1, x1)
-        y1 = min(height - 1, y1)
-        for y in range(y0, y1 + 1):
-            row_fb = fb[y]
-            row_cb = cb[y]
-            for x in range(x0, x1 + 1):
-                row_fb[x] = char
-                row_cb[x] = color
+        return (80, 90, 110)
 
     def _vu_color(self, level_norm):
         # green -> yellow -> red based on level
@@ -98,7 +79,7 @@ class DJSetVisual(VisualBase):
             r = 255
             g = int(240 - 150 * frac)
             b = int(40 + 40 * frac)
-        return rgb_to_ansi(r, g, b)
+        return (r, g, b)
 
     def _clamp(self, value, lo=0.0, hi=1.0):
         return max(lo, min(hi, value))
@@ -129,8 +110,9 @@ class DJSetVisual(VisualBase):
         self.master_vu_phase += 0.1
 
         # Frame buffers
-        fb = [[' ' for _ in range(width)] for _ in range(height)]
-        cb = [['' for _ in range(width)] for _ in range(height)]
+        canvas = self.canvas
+        canvas.resize(width, height)
+        canvas.clear()
 
         # Layout
         cx_left = int(width * 0.22)
@@ -148,11 +130,11 @@ class DJSetVisual(VisualBase):
         panel_color = self._panel_color()
 
         # Draw deck panels (left/right) and subtle background texture
-        deck_color = rgb_to_ansi(60, 65, 80)
-        for y in range(1, height - 1, 4):
-            for x in range(0, width):
-                if random.random() < 0.04:
-                    self._draw_char(fb, cb, x, y, width, height, '·', deck_color)
+        deck_color = (60, 65, 80)
+        texture_rows = canvas.chars[1:height - 1:4]
+        texture = np.zeros((height, width), dtype=bool)
+        texture[1:height - 1:4] = self.rng.mask(texture_rows.shape, 0.04)
+        canvas.paint(texture, '·', deck_color)
 
         deck_pad = 6
         left_panel_x0 = max(0, cx_left - platter_r - deck_pad)
@@ -163,55 +145,57 @@ class DJSetVisual(VisualBase):
         right_panel_x1 = min(width - 1, cx_right + platter_r + deck_pad)
         right_panel_y0 = left_panel_y0
         right_panel_y1 = left_panel_y1
-        self._draw_rect(fb, cb, left_panel_x0, left_panel_y0, left_panel_x1, left_panel_y1, '▒', rgb_to_ansi(45, 50, 65))
-        self._draw_rect(fb, cb, right_panel_x0, right_panel_y0, right_panel_x1, right_panel_y1, '▒', rgb_to_ansi(45, 50, 65))
+        canvas.rect(left_panel_x0, left_panel_y0, left_panel_x1, left_panel_y1, '▒', (45, 50, 65))
+        canvas.rect(right_panel_x0, right_panel_y0, right_panel_x1, right_panel_y1, '▒', (45, 50, 65))
 
         # Draw mixer panel block
-        self._draw_rect(fb, cb, mixer_x0, mixer_y0, mixer_x1, mixer_y1, '░', panel_color)
+        canvas.rect(mixer_x0, mixer_y0, mixer_x1, mixer_y1, '░', panel_color)
         # Screws on panels
-        screw_color = rgb_to_ansi(160, 170, 190)
+        screw_color = (160, 170, 190)
         for (x0, y0, x1, y1) in [
             (left_panel_x0, left_panel_y0, left_panel_x1, left_panel_y1),
             (right_panel_x0, right_panel_y0, right_panel_x1, right_panel_y1),
             (mixer_x0, mixer_y0, mixer_x1, mixer_y1)
         ]:
             for (sx, sy) in [(x0 + 1, y0 + 1), (x1 - 1, y0 + 1), (x0 + 1, y1 - 1), (x1 - 1, y1 - 1)]:
-                self._draw_char(fb, cb, sx, sy, width, height, '•', screw_color)
+                canvas.put(sx, sy, '•', screw_color)
 
         # Helper to draw a platter
         def draw_platter(center_x, center_y, angle):
-            for y in range(center_y - platter_r, center_y + platter_r + 1):
-                for x in range(center_x - platter_r, center_x + platter_r + 1):
-                    dx = x - center_x
-                    dy = y - center_y
-                    rr = math.sqrt(dx * dx + dy * dy)
-                    if rr <= platter_r + 0.2:
-                        rn = rr / platter_r
-                        # ring structure
-                        if rr <= label_r:
-                            # inner label with slight pulse
-                            pulse = (math.sin(angle * 2 + rr) * 0.5 + 0.5) * 25
-                            color = rgb_to_ansi(220 + int(pulse), 220 + int(pulse), 230)
-                            char = '●'
-                        elif rr <= platter_r * 0.65:
-                            color = self._disc_color(rn, angle)
-                            # grooves
-                            grooves = int(((rr - label_r) * 2 + math.sin(angle * 3 + rr * 0.4)) % 3)
-                            char = ['·', '░', '▒'][grooves]
-                        elif rr <= platter_r * 0.95:
-                            color = self._disc_color(rn, angle)
-                            char = '▓'
-                        else:
-                            # rim
-                            rim_gloss = int(20 + 30 * (1 - rn))
-                            color = rgb_to_ansi(200 + rim_gloss, 200 + rim_gloss, 230)
-                            char = '█'
-                        self._draw_char(fb, cb, x, y, width, height, char, color)
+            disc = canvas.view(center_x - platter_r, center_y - platter_r,
+                               center_x + platter_r, center_y + platter_r)
+            if disc is None:
+                return
+            dx = disc.xs + disc.x0 - center_x
+            dy = disc.ys + disc.y0 - center_y
+            rr = np.sqrt(dx * dx + dy * dy)
+            rn = rr / platter_r
+            # ring structure
+            label = rr <= label_r
+            grooved = ~label & (rr <= platter_r * 0.65)
+            solid = ~label & ~grooved & (rr <= platter_r * 0.95)
+            rim = ~label & ~grooved & ~solid & (rr <= platter_r + 0.2)
+
+            # inner label with slight pulse
+            pulse = ((np.sin(angle * 2 + rr) * 0.5 + 0.5) * 25).astype(np.int32)
+            label_rgb = np.stack([220 + pulse, 220 + pulse, np.full_like(pulse, 230)], axis=-1)
+            disc.paint(label, '●', label_rgb)
+
+            disc_rgb = self._disc_color(rn, angle)
+            # grooves
+            grooves = np.mod((rr - label_r) * 2 + np.sin(angle * 3 + rr * 0.4), 3).astype(np.int32)
+            disc.paint(grooved, self.groove_chars[grooves], disc_rgb)
+            disc.paint(solid, '▓', disc_rgb)
+
+            # rim
+            rim_gloss = (20 + 30 * (1 - rn)).astype(np.int32)
+            rim_rgb = np.stack([200 + rim_gloss, 200 + rim_gloss, np.full_like(rim_gloss, 230)], axis=-1)
+            disc.paint(rim, '█', rim_rgb)
 
             # rotating marker on label
             mx = int(center_x + math.cos(angle) * (label_r - 1))
             my = int(center_y + math.sin(angle) * (label_r - 1))
-            self._draw_char(fb, cb, mx, my, width, height, '◆', self._accent_color(time_offset * 2 + angle))
+            canvas.put(mx, my, '◆', self._accent_color(time_offset * 2 + angle))
 
             # strobe dots around rim
             for k in range(18):
@@ -220,9 +204,9 @@ class DJSetVisual(VisualBase):
                 ry = int(center_y + math.sin(a) * (platter_r - 1))
                 blink = (k + int(time_offset * 5)) % 4
                 if blink == 0:
-                    self._draw_char(fb, cb, rx, ry, width, height, '•', rgb_to_ansi(255, 200, 120))
+                    canvas.put(rx, ry, '•', (255, 200, 120))
                 elif blink == 1:
-                    self._draw_char(fb, cb, rx, ry, width, height, '·', rgb_to_ansi(200, 120, 60))
+                    canvas.put(rx, ry, '·', (200, 120, 60))
 
         # Draw both platters
         draw_platter(cx_left, cy, self.left_angle)
@@ -234,19 +218,15 @@ class DJSetVisual(VisualBase):
             y0 = top_y
             x1 = x0 + width_chars - 1
             y1 = y0 + height_chars - 1
-            border_color = rgb_to_ansi(30, 200, 220)
-            self._draw_rect(fb, cb, x0, y0, x1, y1, ' ', rgb_to_ansi(15, 25, 35))
+            border_color = (30, 200, 220)
+            canvas.rect(x0, y0, x1, y1, ' ', (15, 25, 35))
             # border
-            for x in range(x0, x1 + 1):
-                self._draw_char(fb, cb, x, y0, width, height, '─', border_color)
-                self._draw_char(fb, cb, x, y1, width, height, '─', border_color)
-            for y in range(y0, y1 + 1):
-                self._draw_char(fb, cb, x0, y, width, height, '│', border_color)
-                self._draw_char(fb, cb, x1, y, width, height, '│', border_color)
+            canvas.rect(x0, y0, x1, y0, '─', border_color)
+            canvas.rect(x0, y1, x1, y1, '─', border_color)
+            canvas.rect(x0, y0, x0, y1, '│', border_color)
+            canvas.rect(x1, y0, x1, y1, '│', border_color)
             # title
-            title = " SMARTUP DJ "
-            for i, ch in enumerate(title):
-                self._draw_char(fb, cb, x0 + 2 + i, y0, width, height, ch, rgb_to_ansi(120, 240, 255))
+            canvas.text(x0 + 2, y0, " SMARTUP DJ ", (120, 240, 255))
             # waveform rows
             wave_y = y0 + 1
             bars_row = y0 + height_chars - 2
@@ -257,18 +237,17 @@ class DJSetVisual(VisualBase):
                 amp = 0.5 * math.sin(dx) + 0.3 * math.sin(2.2 * dx + 0.7) + 0.2 * math.sin(3.7 * dx + 1.3)
                 amp = (amp * 0.5 + 0.5)
                 bar_h = int(amp * max(1, height_chars - 3))
-                for iy in range(bar_h):
-                    self._draw_char(fb, cb, px, bars_row - iy, width, height, '▌', color_base)
+                if bar_h > 0:
+                    canvas.rect(px, bars_row - bar_h + 1, px, bars_row, '▌', color_base)
             # progress bar
             prog = (math.sin(phase * 0.5) * 0.5 + 0.5)
             prog_end = int(x0 + 1 + prog * (width_chars - 3))
-            for px in range(x0 + 1, prog_end + 1):
-                self._draw_char(fb, cb, px, y1, width, height, '█', rgb_to_ansi(120, 220, 255))
+            canvas.rect(x0 + 1, y1, prog_end, y1, '█', (120, 220, 255))
 
         screen_h = 5
         screen_w = max(18, int(platter_r * 1.4))
-        draw_deck_screen(cx_left, max(1, cy - platter_r - 6), screen_w, screen_h, self.left_wave_phase, rgb_to_ansi(120, 255, 200))
-        draw_deck_screen(cx_right, max(1, cy - platter_r - 6), screen_w, screen_h, self.right_wave_phase, rgb_to_ansi(255, 160, 220))
+        draw_deck_screen(cx_left, max(1, cy - platter_r - 6), screen_w, screen_h, self.left_wave_phase, (120, 255, 200))
+        draw_deck_screen(cx_right, max(1, cy - platter_r - 6), screen_w, screen_h, self.right_wave_phase, (255, 160, 220))
 
         # Performance pads (4x2 per deck)
         def draw_pads(origin_x, origin_y):
@@ -282,37 +261,34 @@ class DJSetVisual(VisualBase):
                     py = origin_y + r * 2
                     idx = r * cols + c
                     pulse = (math.sin(self.pad_phase + idx * 0.7) * 0.5 + 0.5)
-                    color = rgb_to_ansi(150 + int(105 * pulse), int(80 + 140 * (1 - pulse)), 220)
-                    self._draw_char(fb, cb, px, py, width, height, '■', color)
-                    self._draw_char(fb, cb, px + 1, py, width, height, '■', color)
+                    color = (150 + int(105 * pulse), int(80 + 140 * (1 - pulse)), 220)
+                    canvas.rect(px, py, px + 1, py, '■', color)
 
         pads_y = min(height - 4, cy + platter_r + 1)
         draw_pads(cx_left - 8, pads_y)
         draw_pads(cx_right - 8, pads_y)
 
         # Pitch sliders (vertical) near deck sides
-        rail_color = rgb_to_ansi(180, 190, 210)
+        rail_color = (180, 190, 210)
         left_pitch_x = min(width - 2, cx_left + platter_r + 3)
         right_pitch_x = max(1, cx_right - platter_r - 3)
         pitch_top = max(2, cy - platter_r)
         pitch_bot = min(height - 3, cy + platter_r)
         pitch_h = max(6, pitch_bot - pitch_top)
-        for y in range(pitch_top, pitch_bot + 1):
-            self._draw_char(fb, cb, left_pitch_x, y, width, height, '│', rail_color)
-            self._draw_char(fb, cb, right_pitch_x, y, width, height, '│', rail_color)
+        canvas.rect(left_pitch_x, pitch_top, left_pitch_x, pitch_bot, '│', rail_color)
+        canvas.rect(right_pitch_x, pitch_top, right_pitch_x, pitch_bot, '│', rail_color)
         left_slider_y = int(pitch_bot - self.left_pitch * pitch_h)
         right_slider_y = int(pitch_bot - self.right_pitch * pitch_h)
-        for dx in (-1, 0, 1):
-            self._draw_char(fb, cb, left_pitch_x + dx, left_slider_y, width, height, '█', self._accent_color(time_offset * 0.7))
-            self._draw_char(fb, cb, right_pitch_x + dx, right_slider_y, width, height, '█', self._accent_color(time_offset * 0.9))
+        canvas.rect(left_pitch_x - 1, left_slider_y, left_pitch_x + 1, left_slider_y, '█', self._accent_color(time_offset * 0.7))
+        canvas.rect(right_pitch_x - 1, right_slider_y, right_pitch_x + 1, right_slider_y, '█', self._accent_color(time_offset * 0.9))
 
         # Play/Cue buttons
-        play_color = rgb_to_ansi(120, 255, 120)
-        cue_color = rgb_to_ansi(255, 140, 120)
+        play_color = (120, 255, 120)
+        cue_color = (255, 140, 120)
         for deck_cx in (cx_left, cx_right):
             by = min(height - 5, cy + platter_r + 3)
-            self._draw_char(fb, cb, deck_cx - 3, by, width, height, '►', play_color)
-            self._draw_char(fb, cb, deck_cx + 3, by, width, height, '■', cue_color)
+            canvas.put(deck_cx - 3, by, '►', play_color)
+            canvas.put(deck_cx + 3, by, '■', cue_color)
 
         # Draw mixer controls (4 channels)
         lane_w = (mixer_x1 - mixer_x0) // 4
@@ -325,12 +301,10 @@ class DJSetVisual(VisualBase):
         # Channel faders (vertical) and VU meters next to them
         for i, fx in enumerate(lane_xs):
             # rails
-            for y in range(fader_top, fader_bot + 1):
-                self._draw_char(fb, cb, fx, y, width, height, '│', rail_color)
+            canvas.rect(fx, fader_top, fx, fader_bot, '│', rail_color)
             # slider
             slider_y = int(fader_bot - self.faders[i] * fader_height)
-            for dx in (-1, 0, 1):
-                self._draw_char(fb, cb, fx + dx, slider_y, width, height, '█', knob_color)
+            canvas.rect(fx - 1, slider_y, fx + 1, slider_y, '█', knob_color)
             # VU to the left of each fader
             vu_x = fx - lane_w // 3
             level = self._clamp(0.25 + 0.6 * self.faders[i] + 0.15 * math.sin(self.vu_phases[i]))
@@ -338,25 +312,23 @@ class DJSetVisual(VisualBase):
             for yidx in range(fader_height + 1):
                 y = fader_bot - yidx
                 if yidx <= lit:
-                    self._draw_char(fb, cb, vu_x, y, width, height, '█', self._vu_color(yidx / (fader_height + 0.001)))
+                    canvas.put(vu_x, y, '█', self._vu_color(yidx / (fader_height + 0.001)))
                 else:
-                    self._draw_char(fb, cb, vu_x, y, width, height, '░', rgb_to_ansi(70, 80, 95))
+                    canvas.put(vu_x, y, '░', (70, 80, 95))
 
         # Crossfader (horizontal) near bottom
         cross_y = mixer_y1 - 3
         cross_x0 = mixer_x0 + 3
         cross_x1 = mixer_x1 - 4
-        for x in range(cross_x0, cross_x1 + 1):
-            self._draw_char(fb, cb, x, cross_y, width, height, '─', rail_color)
+        canvas.rect(cross_x0, cross_y, cross_x1, cross_y, '─', rail_color)
         slider_x = int(cross_x0 + self.crossfader * (cross_x1 - cross_x0))
-        for dy in (-1, 0, 1):
-            self._draw_char(fb, cb, slider_x, cross_y + dy, width, height, '█', knob_color)
+        canvas.rect(slider_x, cross_y - 1, slider_x, cross_y + 1, '█', knob_color)
         # Crossfader curve indicator
         curve_y = cross_y - 2
         for off in range(-6, 7):
             x = int((cross_x0 + cross_x1) / 2) + off
             y = curve_y - int(2.0 * math.sin(off / 6.0 * math.pi))
-            self._draw_char(fb, cb, x, y, width, height, '·', rgb_to_ansi(140, 150, 170))
+            canvas.put(x, y, '·', (140, 150, 170))
 
         # Two rows of knobs at mixer top
         knobs_per_row = 4
@@ -368,13 +340,13 @@ class DJSetVisual(VisualBase):
                 for dx in (-1, 0, 1):
                     for dy in (-1, 0, 1):
                         if abs(dx) + abs(dy) <= 2 and not (dx == 0 and dy == 0):
-                            self._draw_char(fb, cb, kx + dx, knob_y + dy, width, height, '•', rail_color)
+                            canvas.put(kx + dx, knob_y + dy, '•', rail_color)
                 # indicator
                 idx = row_idx * knobs_per_row + i
                 ang = -math.pi * 0.75 + self.knobs[idx] * (1.5 * math.pi)
                 ix = int(kx + math.cos(ang) * 2)
                 iy = int(knob_y + math.sin(ang) * 1)
-                self._draw_char(fb, cb, ix, iy, width, height, '◆', knob_color)
+                canvas.put(ix, iy, '◆', knob_color)
 
         # Master VU meters (L/R) near crossfader
         master_left_x = mixer_x0 + 2
@@ -388,38 +360,27 @@ class DJSetVisual(VisualBase):
             for yidx in range(vu_h + 1):
                 y = vu_bot - yidx
                 if yidx <= lit:
-                    self._draw_char(fb, cb, mx, y, width, height, '█', self._vu_color(yidx / (vu_h + 0.001)))
+                    canvas.put(mx, y, '█', self._vu_color(yidx / (vu_h + 0.001)))
                 else:
-                    self._draw_char(fb, cb, mx, y, width, height, '░', rgb_to_ansi(70, 80, 95))
+                    canvas.put(mx, y, '░', (70, 80, 95))
 
         # Center OLED-like label under top knobs
         oled_y0 = mixer_y0 + 7
         oled_y1 = oled_y0 + 2
         oled_x0 = mixer_x0 + 6
         oled_x1 = mixer_x1 - 6
-        self._draw_rect(fb, cb, oled_x0, oled_y0, oled_x1, oled_y1, ' ', rgb_to_ansi(10, 15, 22))
+        canvas.rect(oled_x0, oled_y0, oled_x1, oled_y1, ' ', (10, 15, 22))
         text = " DiesiOslo • SMARTUP "
         tx = oled_x0 + max(0, (oled_x1 - oled_x0 + 1 - len(text)) // 2)
         pulse = (math.sin(self.logo_pulse) * 0.5 + 0.5)
-        text_color = rgb_to_ansi(120 + int(80 * pulse), 220, 255)
-        for i, ch in enumerate(text):
-            self._draw_char(fb, cb, tx + i, oled_y0 + 1, width, height, ch, text_color)
+        text_color = (120 + int(80 * pulse), 220, 255)
+        canvas.text(tx, oled_y0 + 1, text, text_color)
 
         # LED ambiance along top and sides
-        for x in range(0, width, 3):
-            c = rgb_to_ansi(60, 120 + int(100 * (math.sin(x * 0.2 + time_offset) * 0.5 + 0.5)), 255)
-            self._draw_char(fb, cb, x, 1, width, height, '•', c)
-            self._draw_char(fb, cb, x + 1 if x + 1 < width else x, height - 3, width, height, '•', rgb_to_ansi(255, 120, 220))
-        
-
-        # Convert buffers to rows
-        pattern = []
-        for y in range(height):
-            row = ""
-            for x in range(width):
-                row += cb[y][x] + fb[y][x]
-            pattern.append(row + reset_color())
-
-        return pattern
-
+        led_x = np.arange(0, width, 3)
+        led_g = (120 + 100 * (np.sin(led_x * 0.2 + time_offset) * 0.5 + 0.5)).astype(np.int32)
+        led_rgb = np.stack([np.full_like(led_g, 60), led_g, np.full_like(led_g, 255)], axis=-1)
+        canvas.plot(led_x, np.ones_like(led_x), '•', led_rgb)
+        canvas.plot(np.minimum(led_x + 1, width - 1), np.full_like(led_x, height - 3), '•', (255, 120, 220))
 
+        return canvas.to_rows()
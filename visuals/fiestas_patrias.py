@@ -1,11 +1,12 @@
 import math
-import random
 import sys
 import os
+import numpy as np
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from core.visual_base import VisualBase
-from core.utils import rgb_to_ansi, reset_color
+from core.canvas import Canvas
+from core.particles import ParticleSystem
 
 class FiestasPatriasVisual(VisualBase):
     """Celebración de Fiestas Patrias Chilenas con fuegos artificiales, empanadas y elementos festivos"""
@@ -19,95 +20,116 @@ class FiestasPatriasVisual(VisualBase):
 
     def __init__(self):
         # Colores patrios chilenos
-        self.blue = rgb_to_ansi(0, 56, 147)     # Azul chileno
-        self.red = rgb_to_ansi(217, 16, 35)     # Rojo chileno
-        self.white = rgb_to_ansi(255, 255, 255) # Blanco
-        self.gold = rgb_to_ansi(255, 215, 0)    # Dorado para fuegos artificiales
-        self.orange = rgb_to_ansi(255, 165, 0)  # Naranja para empanadas
-        self.green = rgb_to_ansi(34, 139, 34)   # Verde para decoración
-        self.yellow = rgb_to_ansi(255, 255, 0)  # Amarillo brillante
-
-        # Inicializar fuegos artificiales
-        self.fireworks = []
+        self.blue = (0, 56, 147)     # Azul chileno
+        self.red = (217, 16, 35)     # Rojo chileno
+        self.white = (255, 255, 255) # Blanco
+        self.gold = (255, 215, 0)    # Dorado para fuegos artificiales
+        self.orange = (255, 165, 0)  # Naranja para empanadas
+        self.green = (34, 139, 34)   # Verde para decoración
+        self.yellow = (255, 255, 0)  # Amarillo brillante
+        self.canvas = Canvas()
+
+        # Inicializar fuegos artificiales: una partícula por cohete (x, y
+        # relativos), con su nacimiento, tamaño y tipo como canales
+        self.firework_types = ['burst', 'cascade', 'spiral']
+        self.fireworks = ParticleSystem(capacity=64, channels=('birth_time', 'size', 'kind'))
         self.empanadas = []
         self.dancers = []
 
         # Crear algunas empanadas flotantes
         for _ in range(8):
             self.empanadas.append({
-                'x': random.uniform(0, 1),
-                'y': random.uniform(0.3, 0.8),
-                'phase': random.uniform(0, 2 * math.pi),
-                'speed': random.uniform(0.1, 0.3)
+                'x': self.rng.uniform(0, 1),
+                'y': self.rng.uniform(0.3, 0.8),
+                'phase': self.rng.uniform(0, 2 * math.pi),
+                'speed': self.rng.uniform(0.1, 0.3)
             })
 
         # Crear bailarines de cueca
         for _ in range(4):
             self.dancers.append({
-                'x': random.uniform(0.2, 0.8),
-                'y': random.uniform(0.7, 0.9),
-                'phase': random.uniform(0, 2 * math.pi),
-                'speed': random.uniform(1, 2)
+                'x': self.rng.uniform(0.2, 0.8),
+                'y': self.rng.uniform(0.7, 0.9),
+                'phase': self.rng.uniform(0, 2 * math.pi),
+                'speed': self.rng.uniform(1, 2)
             })
 
     def create_firework(self, time_offset):
         """Crear fuegos artificiales aleatorios"""
-        if random.random() < 0.25:  # 25% chance cada frame - más fuegos artificiales
-            self.fireworks.append({
-                'x': random.uniform(0.1, 0.9),
-                'y': random.uniform(0.1, 0.5),
-                'birth_time': time_offset,
-                'color': random.choice([self.red, self.blue, self.white]),
-                'size': random.uniform(3, 8),
-                'type': random.choice(['burst', 'cascade', 'spiral'])
-            })
+        if self.rng.random() < 0.25:  # 25% chance cada frame - más fuegos artificiales
+            self.fireworks.spawn(
+                x=self.rng.uniform(0.1, 0.9),
+                y=self.rng.uniform(0.1, 0.5),
+                birth_time=time_offset,
+                color=self.rng.choice([self.red, self.blue, self.white]),
+                size=self.rng.uniform(3, 8),
+                kind=self.rng.randrange(len(self.firework_types)),
+            )
 
     def draw_empanada(self, x, y):
         """Dibuja una empanada en posición específica"""
         return "🥟"  # Si no funciona unicode, usar "◐"
 
-    def draw_firework(self, fw, width, height, time_offset):
-        """Dibuja un fuego artificial"""
-        age = time_offset - fw['birth_time']
-        if age > 3:  # Los fuegos artificiales duran 3 segundos
-            return []
-
-        pixels = []
-        cx = int(fw['x'] * width)
-        cy = int(fw['y'] * height)
-
-        if fw['type'] == 'burst':
-            # Explosión circular
-            radius = int(fw['size'] * age)
-            for angle in range(0, 360, 30):
-                rad = math.radians(angle)
-                x = cx + int(radius * math.cos(rad))
-                y = cy + int(radius * math.sin(rad))
-                if 0 <= x < width and 0 <= y < height:
-                    intensity = max(0, 1 - age/3)  # Fade out
-                    pixels.append((x, y, fw['color'], "✦" if intensity > 0.5 else "·"))
-
-        elif fw['type'] == 'cascade':
-            # Cascada hacia abajo
-            for i in range(int(fw['size'])):
-                x = cx + random.randint(-3, 3)
-                y = cy + int(age * 5) + i
-                if 0 <= x < width and 0 <= y < height:
-                    pixels.append((x, y, fw['color'], "✦" if age < 1 else "·"))
-
-        elif fw['type'] == 'spiral':
-            # Espiral
-            for i in range(int(fw['size'] * 4)):
-                angle = i * 0.5 + time_offset * 3
-                r = i * age
-                x = cx + int(r * math.cos(angle))
-                y = cy + int(r * math.sin(angle))
-                if 0 <= x < width and 0 <= y < height:
-                    pixels.append((x, y, fw['color'], "★"))
-
-        return pixels
-
-    def draw_chilean_flag(self, canvas, colors, width, height):
+    def draw_fireworks(self, canvas, time_offset):
+        """Dibuja todos los fuegos artificiales de una vez"""
+        fw = self.fireworks
+        if not len(fw):
+            return
+        width, height = canvas.width, canvas.height
+        age = time_offset - fw.birth_time
+        cx = (fw.x * width).astype(np.int64)
+        cy = (fw.y * height).astype(np.int64)
+        # Más nuevos encima
+        kind = fw.kind.astype(np.int64)
+        xs, ys, chars, colors, depth = [], [], [], [], []
+
+        def add(sel, x, y, char):
+            # sel: cohetes; x/y: (cohetes, puntos); char por punto o fijo
+            valid = np.isfinite(x)
+            xs.append(x[valid])
+            ys.append(y[valid])
+            chars.append(np.broadcast_to(char, x.shape)[valid])
+            colors.append(np.broadcast_to(fw.color[sel][:, None, :], x.shape + (3,))[valid])
+            depth.append(np.broadcast_to(fw.birth_time[sel][:, None], x.shape)[valid])
+
+        # Explosión circular
+        sel = kind == 0
+        if sel.any():
+            radius = (fw.size[sel] * age[sel]).astype(np.int64)[:, None]
+            rad = np.radians(np.arange(0, 360, 30))[None, :]
+            x = cx[sel][:, None] + (radius * np.cos(rad)).astype(np.int64)
+            y = cy[sel][:, None] + (radius * np.sin(rad)).astype(np.int64)
+            intensity = np.maximum(0, 1 - age[sel] / 3)[:, None]  # Fade out
+            char = np.where(intensity > 0.5, ord("✦"), ord("·")).astype(np.uint32)
+            add(sel, x.astype(float), y.astype(float), np.broadcast_to(char, x.shape))
+
+        # Cascada hacia abajo
+        sel = kind == 1
+        if sel.any():
+            i = np.arange(8)[None, :]
+            count = fw.size[sel].astype(np.int64)[:, None]
+            x = cx[sel][:, None] + self.rng.integers(-3, 4, (int(sel.sum()), 8))
+            y = cy[sel][:, None] + (age[sel] * 5).astype(np.int64)[:, None] + i
+            x = np.where(i < count, x, np.nan)
+            char = np.where(age[sel] < 1, ord("✦"), ord("·")).astype(np.uint32)[:, None]
+            add(sel, x, y.astype(float), np.broadcast_to(char, x.shape))
+
+        # Espiral
+        sel = kind == 2
+        if sel.any():
+            i = np.arange(32)[None, :]
+            count = (fw.size[sel] * 4).astype(np.int64)[:, None]
+            angle = i * 0.5 + time_offset * 3
+            r = i * age[sel][:, None]
+            x = cx[sel][:, None] + (r * np.cos(angle)).astype(np.int64)
+            y = cy[sel][:, None] + (r * np.sin(angle)).astype(np.int64)
+            x = np.where(i < count, x, np.nan)
+            add(sel, x, y.astype(float), np.uint32(ord("★")))
+
+        canvas.plot(np.concatenate(xs), np.concatenate(ys), np.concatenate(chars),
+                    np.concatenate(colors), z=np.concatenate(depth))
+
+    def draw_chilean_flag(self, canvas, width, height):
         """Dibuja una bandera chilena ASCII en la esquina superior derecha"""
         # ASCII art de bandera chilena más detallada
         flag_lines = [
@@ -130,50 +152,37 @@ class FiestasPatriasVisual(VisualBase):
         if start_x > 0:
             for i, line in enumerate(flag_lines):
                 fy = start_y + i
-                if fy < height:
-                    for j, char in enumerate(line):
-                        fx = start_x + j
-                        if fx < width:
-                            canvas[fy][fx] = char
-                            # Colorear según el carácter
-                            if char == '█':
-                                colors[fy][fx] = self.blue
-                            elif char == '★':
-                                colors[fy][fx] = self.white
-                            elif char == '░':
-                                colors[fy][fx] = self.white
-                            elif char == '▓':
-                                colors[fy][fx] = self.red
-                            else:
-                                colors[fy][fx] = self.white
+                for j, char in enumerate(line):
+                    # Colorear según el carácter
+                    if char == '█':
+                        color = self.blue
+                    elif char == '▓':
+                        color = self.red
+                    else:
+                        color = self.white
+                    canvas.put(start_x + j, fy, char, color)
 
     def generate_frame(self, width, height, time_offset):
         # Crear matriz de caracteres
-        canvas = [[" " for _ in range(width)] for _ in range(height)]
-        colors = [["" for _ in range(width)] for _ in range(height)]
+        canvas = self.canvas
+        canvas.resize(width, height)
+        canvas.clear()
 
         # Fondo estrellado
-        for _ in range(width * height // 50):  # Algunas estrellas de fondo
-            x = random.randint(0, width-1)
-            y = random.randint(0, height//2)  # Solo en la parte superior
-            if random.random() < 0.3:
-                canvas[y][x] = "·"
-                colors[y][x] = self.white
+        count = width * height // 50  # Algunas estrellas de fondo
+        xs = self.rng.integers(0, max(1, width), count)
+        ys = self.rng.integers(0, height // 2 + 1, count)  # Solo en la parte superior
+        stars = self.rng.mask(count, 0.3)
+        canvas.plot(xs[stars], ys[stars], "·", self.white)
 
         # Crear nuevos fuegos artificiales
         self.create_firework(time_offset)
 
         # Limpiar fuegos artificiales viejos
-        self.fireworks = [fw for fw in self.fireworks
-                         if time_offset - fw['birth_time'] < 3]
+        self.fireworks.kill(time_offset - self.fireworks.birth_time >= 3)
 
         # Dibujar fuegos artificiales
-        for fw in self.fireworks:
-            pixels = self.draw_firework(fw, width, height, time_offset)
-            for px, py, color, char in pixels:
-                if 0 <= py < height and 0 <= px < width:
-                    canvas[py][px] = char
-                    colors[py][px] = color
+        self.draw_fireworks(canvas, time_offset)
 
 
         # Texto "¡VIVA CHILE MIERDA!" grande que aparece ocasionalmente
@@ -216,18 +225,10 @@ class FiestasPatriasVisual(VisualBase):
             start_y = height // 8
             for line_idx, line in enumerate(big_text):
                 text_y = start_y + line_idx
-                if text_y < height:
-                    text_x = max(0, width // 2 - len(line) // 2)
-                    for i, char in enumerate(line):
-                        if text_x + i < width and char != ' ':
-                            canvas[text_y][text_x + i] = char
-                            # Colores alternos por línea
-                            if line_idx % 3 == 0:
-                                colors[text_y][text_x + i] = self.red
-                            elif line_idx % 3 == 1:
-                                colors[text_y][text_x + i] = self.white
-                            else:
-                                colors[text_y][text_x + i] = self.blue
+                text_x = max(0, width // 2 - len(line) // 2)
+                # Colores alternos por línea
+                color = (self.red, self.white, self.blue)[line_idx % 3]
+                canvas.text(text_x, text_y, line, color, skip_spaces=True)
 
         # Dibujar empanadas flotantes
         for emp in self.empanadas:
@@ -246,8 +247,7 @@ class FiestasPatriasVisual(VisualBase):
                 # ASCII empanada más visible
                 empanada_chars = ["◢◣", "◤◥", "▰▱", "◉◎"]
                 char = empanada_chars[int(time_offset * 2) % len(empanada_chars)]
-                canvas[y][x] = char[0] if x % 2 == 0 else char[1]
-                colors[y][x] = self.orange
+                canvas.put(x, y, char[0] if x % 2 == 0 else char[1], self.orange)
 
         # Dibujar bailarines (representados como figuras simples)
         for dancer in self.dancers:
@@ -274,24 +274,20 @@ class FiestasPatriasVisual(VisualBase):
                 else:
                     char = "♩"  # Nota musical
 
-                canvas[y][x] = char
-                colors[y][x] = random.choice([self.red, self.blue, self.white])
+                color = self.rng.choice([self.red, self.blue, self.white])
+                canvas.put(x, y, char, color)
 
                 # Agregar sombra o complemento al lado
-                if x + 1 < width and canvas[y][x + 1] == " ":
-                    canvas[y][x + 1] = "~"  # Movimiento
-                    colors[y][x + 1] = colors[y][x]
+                if x + 1 < width and canvas.get(x + 1, y) == " ":
+                    canvas.put(x + 1, y, "~", color)  # Movimiento
 
         # Banderitas chilenas en la parte inferior
         banner_y = height - 3
         if banner_y > 0:
-            for x in range(0, width, 6):
-                if x < width:
-                    canvas[banner_y][x] = "▲"
-                    colors[banner_y][x] = self.red if (x // 6) % 2 == 0 else self.blue
-                if x + 1 < width:
-                    canvas[banner_y][x + 1] = "▲"
-                    colors[banner_y][x + 1] = self.white
+            xs = np.arange(0, width, 6)
+            colors = np.where(((xs // 6) % 2 == 0)[:, None], self.red, self.blue)
+            canvas.plot(xs, np.full(xs.size, banner_y), "▲", colors)
+            canvas.plot(xs + 1, np.full(xs.size, banner_y), "▲", self.white)
 
         # Crear mensaje "18 DE SEPTIEMBRE" ocasionalmente
         if int(time_offset) % 10 < 3:  # Aparece cada 10 segundos por 3 segundos
@@ -299,17 +295,7 @@ class FiestasPatriasVisual(VisualBase):
             date_x = width // 2 - len(date_text) // 2
             date_y = height - 1
             if date_y > 0 and date_x > 0:
-                for i, char in enumerate(date_text):
-                    if date_x + i < width:
-                        canvas[date_y][date_x + i] = char
-                        colors[date_y][date_x + i] = self.gold
+                canvas.text(date_x, date_y, date_text, self.gold)
 
         # Convertir canvas a strings
-        pattern = []
-        for y in range(height):
-            row = ""
-            for x in range(width):
-                row += colors[y][x] + canvas[y][x]
-            pattern.append(row + reset_color())
-
-        return pattern
\ No newline at end of file
+        return canvas.to_rows()
\ No newline at end of file
@@ -1,12 +1,14 @@
 import math
-import random
 import sys
 import os
 import time
+import numpy as np
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from core.visual_base import VisualBase
-from core.utils import rgb_to_ansi, reset_color
+from core.canvas import Canvas, codepoints
+from core.particles import ParticleSystem
+from core.raster3d import Camera, rotation_matrix
 
 class GeminiAwakeningVisual(VisualBase):
     """
@@ -28,39 +30,42 @@ class GeminiAwakeningVisual(VisualBase):
         self.frame_count = 0
         
         # --- LORENZ ATTRACTOR PARTICLES (The Core) ---
-        self.num_lorenz = 300
-        self.lorenz_particles = []
-        # Estado inicial cerca de 0,1,10 para que la mariposa se dibuje
-        for i in range(self.num_lorenz):
-            self.lorenz_particles.append({
-                'x': random.normalvariate(0, 0.1),
-                'y': random.normalvariate(0, 0.1), 
-                'z': random.normalvariate(20, 0.1), # Z desplazado
-                'trail': [], # Lista de (x,y,z) previos
-                'color_offset': random.random() * 6.28
-            })
+        # VISUAL_GEMINI_PARTICLES cambia la cantidad (miles siguen siendo baratos)
+        try:
+            self.num_lorenz = max(1, int(os.getenv('VISUAL_GEMINI_PARTICLES', 300)))
+        except ValueError:
+            self.num_lorenz = 300
+        # Estado (N, 3) cerca de 0,0,20 (Z desplazado) para que la mariposa se dibuje
+        self.lorenz = self.rng.normal((0.0, 0.0, 20.0), 0.1, (self.num_lorenz, 3))
+        # Trail corto para no saturar ASCII: anillo (N, T, 3) de posiciones previas
+        self.trail_length = 4
+        self.trail = np.zeros((self.num_lorenz, self.trail_length, 3))
+        self.trail_head = -1  # Última ranura escrita
+        self.trail_count = 0  # Ranuras con datos
             
         # Parámetros Lorenz
         self.sigma = 10.0
         self.rho = 28.0
         self.beta = 8.0 / 3.0
-        self.dt = 0.015  # Paso de tiempo
+        self.dt = 0.015  # Paso de tiempo (RK4)
         
         # --- ORBITAL DATA SPHERE (The Halo) ---
+        # Coordenadas esféricas como partículas: x/y = theta/phi, vx/vy = sus velocidades
         self.num_orbitals = 100
-        self.orbitals = []
+        self.orbital_chars = ['·', '°', 'x', 'o', '+', '◈']
+        self.orbitals = ParticleSystem(capacity=self.num_orbitals, channels=('radius', 'glyph'))
         for _ in range(self.num_orbitals):
-            theta = random.uniform(0, math.pi * 2)
-            phi = random.uniform(0, math.pi)
-            radius = random.uniform(35, 45)
-            self.orbitals.append({
-                'theta': theta,
-                'phi': phi,
-                'radius': radius,
-                'speed_theta': random.uniform(-0.02, 0.02),
-                'speed_phi': random.uniform(-0.01, 0.01),
-                'char': random.choice(['·', '°', 'x', 'o', '+', '◈'])
-            })
+            theta = self.rng.uniform(0, math.pi * 2)
+            phi = self.rng.uniform(0, math.pi)
+            radius = self.rng.uniform(35, 45)
+            self.orbitals.spawn(
+                x=theta,
+                y=phi,
+                radius=radius,
+                vx=self.rng.uniform(-0.02, 0.02),
+                vy=self.rng.uniform(-0.01, 0.01),
+                glyph=self.rng.randrange(len(self.orbital_chars)),
+            )
 
         # Textos de estado para el HUD glitch
         self.status_messages = [
@@ -74,176 +79,149 @@ class GeminiAwakeningVisual(VisualBase):
         self.current_status = 0
         self.status_timer = 0
 
-    def _get_lorenz_color(self, i, time_offset, z_depth):
-        """Genera colores ciberpunk/etéreos basados en índice y tiempo."""
+        self.orbital_codes = codepoints(''.join(self.orbital_chars))
+        self.canvas = Canvas(depth=True)
+        # Proyección compartida por el atractor y el halo
+        self.camera = Camera(distance=40, focal=50, aspect_x=2.0)
+
+    def _lorenz_derivative(self, state):
+        x, y, z = state[:, 0], state[:, 1], state[:, 2]
+        return np.stack([
+            self.sigma * (y - x),
+            x * (self.rho - z) - y,
+            x * y - self.beta * z,
+        ], axis=1)
+
+    def _step_lorenz(self):
+        """Avanza todas las partículas un paso RK4 y lo guarda en el anillo"""
+        dt = self.dt
+        state = self.lorenz
+        k1 = self._lorenz_derivative(state)
+        k2 = self._lorenz_derivative(state + k1 * (dt / 2))
+        k3 = self._lorenz_derivative(state + k2 * (dt / 2))
+        k4 = self._lorenz_derivative(state + k3 * dt)
+        state += (k1 + 2 * k2 + 2 * k3 + k4) * (dt / 6)
+
+        self.trail_head = (self.trail_head + 1) % self.trail_length
+        self.trail[:, self.trail_head] = state
+        self.trail_count = min(self.trail_count + 1, self.trail_length)
+
+    def _trail_points(self):
+        """(N, n, 3) trail de cada partícula, de la más vieja a la cabeza"""
+        order = (self.trail_head - np.arange(self.trail_count)[::-1]) % self.trail_length
+        return self.trail[:, order]
+
+    def _get_lorenz_colors(self, time_offset):
+        """Colores ciberpunk/etéreos por partícula según índice y tiempo."""
         # Gradiente base: Cyan -> Magenta -> Gold
         # Fase oscilante
-        phase = time_offset * 0.5 + i * 0.05
-        
-        r = int(128 + 127 * math.sin(phase))
-        g = int(128 + 127 * math.sin(phase + 2.0)) # Desfase para variedad
-        b = int(128 + 127 * math.sin(phase + 4.0))
-        
+        index = np.arange(self.num_lorenz)
+        phase = time_offset * 0.5 + index * 0.05
+        rgb = np.empty((self.num_lorenz, 3), dtype=np.int64)
+        for channel, offset in enumerate((0.0, 2.0, 4.0)):  # Desfase para variedad
+            rgb[:, channel] = (128 + 127 * np.sin(phase + offset)).astype(np.int64)
+
         # Boost de "Gold" para Sat/Usuario
-        if i % 20 == 0:
-             r, g, b = 255, 215, 0 # Gold
-             
-        # Hacer más brillante si está "cerca" (z_depth menor)
-        # En nuestra proyección, z grande es lejos? Depende de la rotación.
-        # Asumiremos z_depth como coordenada Z rotada.
-        
-        return rgb_to_ansi(r, g, b)
+        rgb[index % 20 == 0] = (255, 215, 0)
+        return rgb
 
     def generate_frame(self, width, height, time_offset):
         self.frame_count += 1
         cx, cy = width // 2, height // 2
-        
-        # Buffer de pantalla: (x, y) -> (char, color_ansi, z_depth)
-        # Usamos z_depth para ocultamiento (Z-buffer simple)
-        buffer = {}
-        
-        # Rotación global de la cámara
+
+        canvas = self.canvas
+        canvas.resize(width, height)
+        canvas.clear()
+
+        # Rotación global de la cámara: eje Y y luego eje X, una sola matriz
         cam_rot_y = time_offset * 0.3
         cam_rot_x = math.sin(time_offset * 0.2) * 0.5
-        
+        camera = self.camera
+        camera.center = (cx, cy)
+        camera.orient(rotation_matrix(('y', -cam_rot_y), ('x', cam_rot_x)))
+
         # --- 1. ACTUALIZAR Y DIBUJAR ATRACTOR DE LORENZ ---
         scale = 0.8 # Escala del atractor para que quepa
-        
-        for i, p in enumerate(self.lorenz_particles):
-            # Ecuaciones de Lorenz
-            dx = (self.sigma * (p['y'] - p['x'])) * self.dt
-            dy = (p['x'] * (self.rho - p['z']) - p['y']) * self.dt
-            dz = (p['x'] * p['y'] - self.beta * p['z']) * self.dt
-            
-            p['x'] += dx
-            p['y'] += dy
-            p['z'] += dz
-            
-            # Guardar trail (historia) - solo últimos 5 puntos
-            p['trail'].append((p['x'], p['y'], p['z']))
-            if len(p['trail']) > 4: # Trail corto para no saturar ASCII
-                p['trail'].pop(0)
-            
-            # Dibujar trail + cabeza
-            points_to_draw = p['trail'][:]
-            
-            for t_idx, (tx, ty, tz) in enumerate(points_to_draw):
-                # Centrar el atractor (aprox en 0,0,25)
-                tx_c = (tx) * scale
-                ty_c = (ty) * scale
-                tz_c = (tz - 25) * scale # Centrar en Z
-                
-                # Rotación 3D
-                # Eje Y
-                x_r = tx_c * math.cos(cam_rot_y) - tz_c * math.sin(cam_rot_y)
-                z_r = tx_c * math.sin(cam_rot_y) + tz_c * math.cos(cam_rot_y)
-                
-                # Eje X
-                y_r = ty_c * math.cos(cam_rot_x) - z_r * math.sin(cam_rot_x)
-                z_r = ty_c * math.sin(cam_rot_x) + z_r * math.cos(cam_rot_x)
-                
-                # Proyección
-                fov = 50
-                viewer_dist = 40
-                if z_r + viewer_dist < 1: continue # Clipping
-                
-                factor = fov / (viewer_dist + z_r)
-                
-                px = int(x_r * factor * 2.0 + cx)
-                py = int(y_r * factor + cy)
-                
-                if 0 <= px < width and 0 <= py < height:
-                    # Caracter y Color
-                    if t_idx == len(points_to_draw) - 1:
-                        # Cabeza
-                        char = "●"
-                        color = self._get_lorenz_color(i, time_offset, z_r)
-                    else:
-                        # Cola
-                        char = "·"
-                        # Color más oscuro para la cola
-                        color = rgb_to_ansi(50, 50, 100) 
-                    
-                    # Z-Buffer check
-                    if (px, py) not in buffer or buffer[(px, py)][2] < z_r:
-                        buffer[(px, py)] = (char, color, z_r)
+
+        self._step_lorenz()
+        trail = self._trail_points()
+        count, length = trail.shape[:2]
+
+        # Centrar el atractor (aprox en 0,0,25)
+        points = ((trail - (0.0, 0.0, 25.0)) * scale).reshape(-1, 3)
+        # Cabeza brillante, cola más oscura
+        chars = np.full((count, length), ord("·"), dtype=np.uint32)
+        chars[:, -1] = ord("●")
+        colors = np.empty((count, length, 3), dtype=np.int64)
+        colors[:] = (50, 50, 100)
+        colors[:, -1] = self._get_lorenz_colors(time_offset)
+        # Z-buffer: en cada celda queda el punto de mayor z
+        camera.draw(canvas, points, chars.ravel(), colors.reshape(-1, 3))
 
         # --- 2. ACTUALIZAR Y DIBUJAR ESFERA ORBITAL ---
         orbit_scale = 1.0 + 0.1 * math.sin(time_offset * 2) # Respiración
-        
-        for p in self.orbitals:
-            # Actualizar ángulos
-            p['theta'] += p['speed_theta']
-            p['phi'] += p['speed_phi']
-            
-            r = p['radius'] * orbit_scale
-            
-            # Esféricas a Cartesianas
-            ox = r * math.sin(p['phi']) * math.cos(p['theta'])
-            oy = r * math.sin(p['phi']) * math.sin(p['theta'])
-            oz = r * math.cos(p['phi'])
-            
-            # Rotación 3D (igual que Lorenz para consistencia)
-            x_r = ox * math.cos(cam_rot_y) - oz * math.sin(cam_rot_y)
-            z_r = ox * math.sin(cam_rot_y) + oz * math.cos(cam_rot_y)
-            
-            y_r = oy * math.cos(cam_rot_x) - z_r * math.sin(cam_rot_x)
-            z_r = oy * math.sin(cam_rot_x) + z_r * math.cos(cam_rot_x)
-            
-            # Proyección
-            if z_r + 40 < 1: continue
-            factor = 50 / (40 + z_r)
-            
-            px = int(x_r * factor * 2.0 + cx)
-            py = int(y_r * factor + cy)
-            
-            if 0 <= px < width and 0 <= py < height:
-                # Color basado en profundidad para dar volumen
-                depth_val = int(max(50, min(255, 255 - (z_r + 20) * 5)))
-                color = rgb_to_ansi(0, depth_val, depth_val) # Cyan variations
-                
-                if (px, py) not in buffer or buffer[(px, py)][2] < z_r:
-                    buffer[(px, py)] = (p['char'], color, z_r)
+
+        # Actualizar ángulos
+        orbitals = self.orbitals
+        orbitals.step()
+        theta, phi = orbitals.x, orbitals.y
+
+        r = orbitals.radius * orbit_scale
+
+        # Esféricas a Cartesianas
+        sphere = np.stack([
+            r * np.sin(phi) * np.cos(theta),
+            r * np.sin(phi) * np.sin(theta),
+            r * np.cos(phi),
+        ], axis=1)
+
+        # Misma cámara que el atractor; sólo gana donde queda más cerca
+        sphere = camera.transform(sphere)
+        z_r = sphere[:, 2]
+        # Color basado en profundidad para dar volumen (variaciones de cyan)
+        depth_val = np.clip(255 - (z_r + 20) * 5, 50, 255).astype(int)
+        colors = np.zeros((len(sphere), 3), dtype=np.int64)
+        colors[:, 1] = depth_val
+        colors[:, 2] = depth_val
+        camera.draw(canvas, sphere, self.orbital_codes[orbitals.glyph.astype(np.intp)], colors, rotated=True)
 
         # --- 3. HUD FUTURISTA ---
         # Marco exterior sutil
-        frame_color = rgb_to_ansi(0, 100, 200)
-        
+        frame_color = (0, 100, 200)
+
         # Esquinas
-        buffer[(1, 1)] = ("╔", frame_color, -1000)
-        buffer[(width-2, 1)] = ("╗", frame_color, -1000)
-        buffer[(1, height-2)] = ("╚", frame_color, -1000)
-        buffer[(width-2, height-2)] = ("╝", frame_color, -1000)
-        
+        canvas.put(1, 1, "╔", frame_color)
+        canvas.put(width-2, 1, "╗", frame_color)
+        canvas.put(1, height-2, "╚", frame_color)
+        canvas.put(width-2, height-2, "╝", frame_color)
+
         # Texto superior
         title = " G E M I N I   3   P R O "
         title_x = cx - len(title)//2
-        for k, char in enumerate(title):
-            col = rgb_to_ansi(0, 255, 255)
-            buffer[(title_x + k, 1)] = (char, col, -1000)
-            
+        canvas.text(title_x, 1, title, (0, 255, 255))
+
         # Barra de estado dinámica
         if self.frame_count % 50 == 0:
             self.current_status = (self.current_status + 1) % len(self.status_messages)
-        
+
         status_msg = self.status_messages[self.current_status]
         # Efecto de "tipeado" o glitch
         display_msg = ""
         for ch in status_msg:
-            if random.random() > 0.95:
-                display_msg += random.choice(["#", "@", "&", "?", "!"])
+            if self.rng.random() > 0.95:
+                display_msg += self.rng.choice(["#", "@", "&", "?", "!"])
             else:
                 display_msg += ch
-                
+
         status_x = cx - len(display_msg)//2
         status_y = height - 2
-        
-        for k, char in enumerate(display_msg):
-            # Gradiente en el texto
-            c_r = 255
-            c_g = int(100 + 155 * (k / len(display_msg)))
-            c_b = 100
-            buffer[(status_x + k, status_y)] = (char, rgb_to_ansi(c_r, c_g, c_b), -1000)
+
+        # Gradiente en el texto
+        gradient = np.empty((len(display_msg), 3), dtype=np.int64)
+        gradient[:, 0] = 255
+        gradient[:, 1] = (100 + 155 * (np.arange(len(display_msg)) / len(display_msg))).astype(np.int64)
+        gradient[:, 2] = 100
+        canvas.text(status_x, status_y, display_msg, gradient)
 
         # Stats laterales
         stats = [
@@ -253,24 +231,16 @@ class GeminiAwakeningVisual(VisualBase):
             f"USR: SAT"
         ]
         for idx, stat in enumerate(stats):
-            for k, char in enumerate(stat):
-                buffer[(2, 4 + idx)] = (char, rgb_to_ansi(100, 200, 100), -1000)
+            # Todas las letras caen en la misma celda: queda la última
+            canvas.put(2, 4 + idx, stat[-1], (100, 200, 100))
 
         # --- 4. RENDER FINAL ---
-        pattern = []
-        for y in range(height):
-            row = ""
-            for x in range(width):
-                if (x, y) in buffer:
-                    char, color, _ = buffer[(x, y)]
-                    row += color + char
-                else:
-                    # Fondo con ruido digital muy tenue (Matrix style faded)
-                    if random.random() > 0.99:
-                        val = random.randint(20, 50)
-                        row += rgb_to_ansi(0, val, 0) + random.choice(['0', '1'])
-                    else:
-                        row += " "
-            pattern.append(row + reset_color())
-            
-        return pattern
+        # Fondo con ruido digital muy tenue (Matrix style faded) en celdas vacías
+        noise = self.rng.mask((height, width), 0.01) & ~canvas.colored
+        count = int(noise.sum())
+        if count:
+            green = np.zeros((count, 3), dtype=np.int64)
+            green[:, 1] = self.rng.integers(20, 51, count)
+            canvas.paint(noise, codepoints("01")[self.rng.integers(0, 2, count)], green)
+
+        return canvas.to_rows()
@@ -1,10 +1,12 @@
 import math
 import sys
 import os
+import numpy as np
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from core.visual_base import VisualBase
-from core.utils import rgb_to_ansi, reset_color
+from core.canvas import Canvas, codepoints, hash2d
+from core.hyperbolic import PoincareDisk
 
 class HyperbolicPurpleVisual(VisualBase):
     """Psychedelic purple hyperbolic geometry in Poincaré disk model"""
@@ -18,6 +20,12 @@ class HyperbolicPurpleVisual(VisualBase):
     
     def __init__(self):
         self.time = 0
+        self.canvas = Canvas()
+        # Intensity thresholds (exclusive) for the character ramp
+        self.ramp = codepoints('·░▒▓█')
+        self.ramp_levels = np.array([0.2, 0.4, 0.6, 0.8])
+        # Per-size disk coordinates
+        self.disk = None
         
     def hyperbolic_distance(self, p1, p2):
         """Calculate hyperbolic distance between two points in Poincaré disk"""
@@ -57,141 +65,90 @@ class HyperbolicPurpleVisual(VisualBase):
     
     def generate_frame(self, width, height, time_offset):
         self.time = time_offset
-        
-        # Create frame buffer
-        frame_buffer = [[' ' for _ in range(width)] for _ in range(height)]
-        color_buffer = [['' for _ in range(width)] for _ in range(height)]
-        
+        t = time_offset
+
+        canvas = self.canvas
+        canvas.resize(width, height)
+        canvas.clear()
+
         # Center and scale for Poincaré disk
         cx, cy = width // 2, height // 2
         radius = min(width, height) * 0.45
-        
-        # Generate hyperbolic tessellation patterns
-        for y in range(height):
-            for x in range(width):
-                # Convert to disk coordinates [-1, 1]
-                disk_x = (x - cx) / radius
-                disk_y = (y - cy) / radius
-                
-                # Only draw inside unit disk
-                r = math.sqrt(disk_x**2 + disk_y**2)
-                if r >= 1.0:
-                    continue
-                
-                # Multiple layers of hyperbolic patterns
-                intensity = 0
-                base_color = [80, 20, 120]  # Deep purple base
-                
-                # Layer 1: Hyperbolic circles (horocycles)
-                for i in range(8):
-                    angle = (i * math.pi / 4) + time_offset * 0.3
-                    center_r = 0.3 + 0.4 * math.sin(time_offset * 0.5 + i)
-                    horo_x = center_r * math.cos(angle)
-                    horo_y = center_r * math.sin(angle)
-                    
-                    # Distance to horocycle center
-                    dist = math.sqrt((disk_x - horo_x)**2 + (disk_y - horo_y)**2)
-                    
-                    # Hyperbolic distance effect
-                    hyperbolic_factor = 1 / (1 - r**2)
-                    wave = math.sin(dist * hyperbolic_factor * 15 + time_offset * 2) * 0.5 + 0.5
-                    intensity += wave * (1 - r) * 0.3
-                
-                # Layer 2: Radial hyperbolic lines
-                theta = math.atan2(disk_y, disk_x)
-                for i in range(12):
-                    line_angle = i * math.pi / 6 + time_offset * 0.4
-                    angle_diff = abs(theta - line_angle)
-                    angle_diff = min(angle_diff, 2 * math.pi - angle_diff)
-                    
-                    if angle_diff < 0.2:
-                        # Hyperbolic radial distance
-                        hyperbolic_r = math.atanh(r) if r < 0.99 else 5
-                        wave = math.sin(hyperbolic_r * 3 + time_offset * 3) * 0.5 + 0.5
-                        intensity += wave * 0.4
-                
-                # Layer 3: Spiral patterns in hyperbolic space
-                spiral_r = math.atanh(min(r, 0.99))
-                spiral_theta = theta * 3 + spiral_r * 2 + time_offset
-                spiral_wave = math.sin(spiral_theta) * 0.5 + 0.5
-                intensity += spiral_wave * (1 - r**2) * 0.5
-                
-                # Layer 4: Psychedelic interference patterns
-                for freq in [5, 8, 13]:
-                    wave1 = math.sin(disk_x * freq + time_offset * 1.5) * 0.5 + 0.5
-                    wave2 = math.sin(disk_y * freq * 1.3 + time_offset * 2.1) * 0.5 + 0.5
-                    interference = wave1 * wave2
-                    intensity += interference * 0.2
-                
-                # Clamp intensity
-                intensity = max(0, min(1, intensity))
-                
-                # Create psychedelic purple color palette
-                if intensity > 0.1:
-                    # Multiple purple hues based on position and time
-                    hue_shift = math.sin(r * 5 + time_offset) * 0.5 + 0.5
-                    brightness = intensity * (0.7 + 0.3 * math.sin(time_offset * 2))
-                    
-                    # Color variations
-                    r_val = int((base_color[0] + hue_shift * 100) * brightness)
-                    g_val = int((base_color[1] + hue_shift * 60) * brightness)
-                    b_val = int((base_color[2] + 100 + hue_shift * 135) * brightness)
-                    
-                    # Ensure purple dominance
-                    r_val = min(255, max(0, r_val))
-                    g_val = min(150, max(0, g_val))  # Keep green low for purple
-                    b_val = min(255, max(100, b_val))  # Keep blue high
-                    
-                    # Character based on intensity
-                    if intensity > 0.8:
-                        char = '█'
-                    elif intensity > 0.6:
-                        char = '▓'
-                    elif intensity > 0.4:
-                        char = '▒'
-                    elif intensity > 0.2:
-                        char = '░'
-                    else:
-                        char = '·'
-                    
-                    # Add some sparkles for psychedelic effect
-                    if hash((x, y, int(time_offset * 10))) % 200 < intensity * 10:
-                        char = '✦'
-                        r_val = min(255, r_val + 50)
-                        g_val = min(255, g_val + 30)
-                        b_val = min(255, b_val + 50)
-                    
-                    frame_buffer[y][x] = char
-                    color_buffer[y][x] = rgb_to_ansi(r_val, g_val, b_val)
-        
+        if self.disk is None or self.disk.shape != (height, width):
+            self.disk = PoincareDisk(width, height, cx, cy, radius)
+        disk = self.disk
+
+        # Only draw inside unit disk (every array below is over its cells)
+        r = disk.r
+        half_distance = disk.distance * 0.5
+
+        # Layer 1: Hyperbolic circles (horocycles), all 8 at once
+        phase = np.arange(8)
+        angle = (phase * math.pi / 4) + t * 0.3
+        center_r = 0.3 + 0.4 * np.sin(t * 0.5 + phase)
+        # Distance to horocycle center
+        dist = disk.euclidean_to(center_r * np.cos(angle), center_r * np.sin(angle))
+        # Hyperbolic distance effect
+        wave = np.sin(dist * (disk.conformal * 7.5) + t * 2) * 0.5 + 0.5
+        intensity = wave.sum(axis=0) * ((1 - r) * 0.3)
+
+        # Layer 2: Radial hyperbolic lines
+        hyperbolic_r = np.where(r < 0.99, half_distance, 5)
+        radial_wave = np.sin(hyperbolic_r * 3 + t * 3) * 0.5 + 0.5
+        angle_diff = disk.angle_to(np.arange(12) * math.pi / 6 + t * 0.4)
+        intensity += np.count_nonzero(angle_diff < 0.2, axis=0) * (radial_wave * 0.4)
+
+        # Layer 3: Spiral patterns in hyperbolic space
+        spiral_theta = disk.theta * 3 + half_distance * 2 + t
+        spiral_wave = np.sin(spiral_theta) * 0.5 + 0.5
+        intensity += spiral_wave * (1 - r ** 2) * 0.5
+
+        # Layer 4: Psychedelic interference patterns
+        freq = np.array([5, 8, 13])[:, None]
+        wave1 = np.sin(disk.x * freq + t * 1.5) * 0.5 + 0.5
+        wave2 = np.sin(disk.y * freq * 1.3 + t * 2.1) * 0.5 + 0.5
+        intensity += (wave1 * wave2).sum(axis=0) * 0.2
+
+        # Clamp intensity
+        intensity = np.clip(intensity, 0, 1)
+        lit = intensity > 0.1
+
+        # Create psychedelic purple color palette
+        # Multiple purple hues based on position and time
+        base_color = [80, 20, 120]  # Deep purple base
+        hue_shift = np.sin(r * 5 + t) * 0.5 + 0.5
+        brightness = intensity * (0.7 + 0.3 * math.sin(t * 2))
+
+        # Color variations, ensuring purple dominance
+        r_val = np.clip(((base_color[0] + hue_shift * 100) * brightness).astype(np.int32), 0, 255)
+        g_val = np.clip(((base_color[1] + hue_shift * 60) * brightness).astype(np.int32), 0, 150)  # Keep green low
+        b_val = np.clip(((base_color[2] + 100 + hue_shift * 135) * brightness).astype(np.int32), 100, 255)  # Keep blue high
+
+        # Character based on intensity
+        chars = self.ramp[np.searchsorted(self.ramp_levels, intensity, side='left')]
+
+        # Add some sparkles for psychedelic effect
+        sparkle = hash2d(disk.xs, disk.ys, int(t * 10)) % 200 < intensity * 10
+        chars = np.where(sparkle, ord('✦'), chars)
+        r_val = np.where(sparkle, np.minimum(255, r_val + 50), r_val)
+        g_val = np.where(sparkle, np.minimum(255, g_val + 30), g_val)
+        b_val = np.where(sparkle, np.minimum(255, b_val + 50), b_val)
+
+        colors = np.stack([r_val, g_val, b_val], axis=-1)
+        canvas.paint(disk.mask(lit), chars[lit], colors[lit])
+
         # Add boundary circle with special effects
-        for angle_i in range(360):
-            angle = math.radians(angle_i)
-            # Slightly inside unit circle for visibility
-            boundary_r = 0.98
-            bound_x = cx + int(boundary_r * radius * math.cos(angle))
-            bound_y = cy + int(boundary_r * radius * math.sin(angle))
-            
-            if 0 <= bound_x < width and 0 <= bound_y < height:
-                # Animated boundary
-                wave = math.sin(angle_i * 0.1 + time_offset * 3) * 0.5 + 0.5
-                brightness = 0.8 + wave * 0.2
-                
-                frame_buffer[bound_y][bound_x] = '●'
-                color_buffer[bound_y][bound_x] = rgb_to_ansi(
-                    int(150 * brightness), 
-                    int(50 * brightness), 
-                    int(200 * brightness)
-                )
-        
-        # Convert to pattern format
-        pattern = []
-        for y in range(height):
-            row = ""
-            for x in range(width):
-                char = frame_buffer[y][x]
-                color = color_buffer[y][x]
-                row += color + char
-            pattern.append(row + reset_color())
-        
-        return pattern
\ No newline at end of file
+        angle_i = np.arange(360)
+        angle = np.radians(angle_i)
+        # Slightly inside unit circle for visibility
+        boundary_r = 0.98
+        bound_x = cx + np.trunc(boundary_r * radius * np.cos(angle)).astype(np.int64)
+        bound_y = cy + np.trunc(boundary_r * radius * np.sin(angle)).astype(np.int64)
+
+        # Animated boundary
+        wave = np.sin(angle_i * 0.1 + t * 3) * 0.5 + 0.5
+        brightness = 0.8 + wave * 0.2
+        boundary_rgb = (np.array([150, 50, 200]) * brightness[:, None]).astype(np.int32)
+        canvas.plot(bound_x, bound_y, '●', boundary_rgb)
+
+        return canvas.to_rows()
@@ -1,82 +1,145 @@
-import math
-import random
 import sys
 import os
+
+import numpy as np
+
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from core.visual_base import VisualBase
-from core.utils import rgb_to_ansi, reset_color
+from core.canvas import Canvas
+from core.output import CanvasDiff
+
+# Glyphs cycled along a drop
+GLYPH_RING = 30
+
 
 class MatrixVisual(VisualBase):
-    """Simplified Matrix digital rain"""
-    
+    """Simplified Matrix digital rain.
+
+    Drops live in per-column arrays (head row, speed, length and a ring of
+    glyphs), so a frame only computes the cells a drop covers. The canvas is
+    kept between frames: last frame's lit cells are blanked, the new ones
+    painted, and only those cells are diffed, so the cost and the output
+    follow the number of lit cells rather than the screen area. When most
+    of the rain moved down by the same number of rows, the terminal scrolls
+    it instead of having it rewritten.
+    """
+
     metadata = {
         "name": "Digital Matrix Pro",
         "author": "sat",
-        "version": "2.1", 
+        "version": "2.1",
         "description": "Clean Matrix digital rain with green falling code"
     }
-    
+
     def __init__(self):
-        self.drops = {}
         self.matrix_chars = [
-            "ﾊ", "ﾐ", "ﾋ", "ｰ", "ｳ", "ｼ", "ﾅ", "ﾓ", "ﾆ", "ｻ", "ﾜ", "ﾂ", "ｵ", "ﾘ", "ｱ", "ﾎ", 
+            "ﾊ", "ﾐ", "ﾋ", "ｰ", "ｳ", "ｼ", "ﾅ", "ﾓ", "ﾆ", "ｻ", "ﾜ", "ﾂ", "ｵ", "ﾘ", "ｱ", "ﾎ",
             "ﾃ", "ﾏ", "ｹ", "ﾒ", "ｴ", "ｶ", "ｷ", "ﾑ", "ﾕ", "ﾗ", "ｾ", "ﾈ", "ｽ", "ﾀ", "ﾇ", "ﾍ",
             "0", "1", "2", "3", "4", "5", "6", "7", "8", "9",
             ":", ";", "<", ">", "*", "+", "-", "=", "|", "Z", "I", "O", "N"
         ]
-    
+        # Per-drop state, one entry per rain column (None until the first frame)
+        self.columns = None
+        self.heads = None
+        self.speeds = None
+        self.lengths = None
+        self.glyphs = None
+        self.canvas = Canvas()
+        self.diff = CanvasDiff(self.canvas)
+        # Flat indices of the cells lit last frame
+        self._lit = np.zeros(0, dtype=np.intp)
+
+    def _glyph_ring(self):
+        return [ord(self.rng.choice(self.matrix_chars)) for _ in range(GLYPH_RING)]
+
+    def _init_drops(self, width, height):
+        columns, heads, speeds, lengths, glyphs = [], [], [], [], []
+        for x in range(0, width, 2):  # Every other column
+            if self.rng.random() > 0.4:
+                columns.append(x)
+                heads.append(self.rng.randint(-20, -1))
+                speeds.append(self.rng.uniform(0.5, 2.0))
+                lengths.append(self.rng.randint(8, min(20, height)))
+                glyphs.append(self._glyph_ring())
+        self.columns = np.array(columns, dtype=np.intp)
+        self.heads = np.array(heads, dtype=np.float64)
+        self.speeds = np.array(speeds, dtype=np.float64)
+        self.lengths = np.array(lengths, dtype=np.intp)
+        self.glyphs = np.array(glyphs, dtype=np.uint32).reshape(-1, GLYPH_RING)
+
+    def _update_drops(self, height):
+        """Advance the drops; returns the rows each one moved (-1 if restarted)"""
+        before = self.heads.astype(np.intp)
+        self.heads += self.speeds
+        moved = self.heads.astype(np.intp) - before
+        # Drops that left the screen restart above it, in column order
+        for i in np.flatnonzero(self.heads > height + self.lengths).tolist():
+            self.heads[i] = self.rng.randint(-30, -5)
+            self.speeds[i] = self.rng.uniform(0.5, 2.0)
+            self.glyphs[i] = self._glyph_ring()
+            moved[i] = -1
+        return moved
+
+    @staticmethod
+    def _scroll_hint(moved, drop, height):
+        """Rows to scroll the screen down by, or 0.
+
+        A drop's glyphs and colors move with its head, so a drop that moved
+        by the scroll only needs its new head written while every other
+        visible drop is rewritten: scroll by the move the most lit cells
+        share (which is 0 when most of the rain stayed put).
+        """
+        moves = moved[drop]
+        votes = np.bincount(moves[moves >= 0])
+        lines = int(np.argmax(votes)) if votes.size else 0
+        return lines if lines < height else 0
+
+    def _lit_cells(self, width, height):
+        """Rows, columns and distance from the head of every visible drop cell"""
+        heads = self.heads.astype(np.intp)
+        top = np.maximum(heads, 0)
+        bottom = np.minimum(heads + self.lengths, height)
+        counts = np.maximum(bottom - top, 0)
+        counts[self.columns >= width] = 0
+        drop = np.repeat(np.arange(counts.size), counts)
+        ys = np.repeat(top - (np.cumsum(counts) - counts), counts) + np.arange(int(counts.sum()))
+        return drop, ys, ys - heads[drop]
+
     def generate_frame(self, width, height, time_offset):
-        # Initialize drops for each column
-        if not self.drops:
-            for x in range(0, width, 2):  # Every other column
-                if random.random() > 0.4:
-                    self.drops[x] = {
-                        'y': random.randint(-20, -1),
-                        'speed': random.uniform(0.5, 2.0),
-                        'length': random.randint(8, min(20, height)),
-                        'chars': [random.choice(self.matrix_chars) for _ in range(30)]
-                    }
-        
-        # Update drops
-        for x, drop in self.drops.items():
-            drop['y'] += drop['speed']
-            if drop['y'] > height + drop['length']:
-                drop['y'] = random.randint(-30, -5)
-                drop['speed'] = random.uniform(0.5, 2.0)
-                drop['chars'] = [random.choice(self.matrix_chars) for _ in range(30)]
-        
-        # Generate pattern
-        pattern = []
-        for y in range(height):
-            row = ""
-            for x in range(width):
-                char = " "
-                color = ""
-                
-                # Check if this position has a matrix character
-                if x in self.drops:
-                    drop = self.drops[x]
-                    drop_y = int(drop['y'])
-                    distance = y - drop_y
-                    
-                    if 0 <= distance < drop['length']:
-                        char = drop['chars'][distance % len(drop['chars'])]
-                        
-                        # Color intensity based on position in drop
-                        if distance == 0:
-                            # Head - bright white-green
-                            color = rgb_to_ansi(200, 255, 200)
-                        elif distance < 3:
-                            # Near head - bright green
-                            color = rgb_to_ansi(0, 255, 100)
-                        else:
-                            # Tail - fading green
-                            intensity = 255 * (1.0 - distance / drop['length'])
-                            color = rgb_to_ansi(0, int(intensity), 0)
-                
-                row += color + char if color else char
-            
-            pattern.append(row + reset_color())
-        
-        return pattern
\ No newline at end of file
+        if self.columns is None:
+            self._init_drops(width, height)
+        moved = self._update_drops(height)
+
+        canvas = self.canvas
+        if canvas.resize(width, height):
+            self._lit = np.zeros(0, dtype=np.intp)
+
+        drop, ys, distance = self._lit_cells(width, height)
+        lengths = self.lengths[drop]
+        # Head - bright white-green, near head - bright green, tail - fading green
+        rgb = np.zeros((drop.size, 3), dtype=np.uint8)
+        rgb[:, 1] = (255 * (1.0 - distance / lengths)).astype(np.uint8)
+        rgb[distance < 3] = (0, 255, 100)
+        rgb[distance == 0] = (200, 255, 200)
+
+        lit = ys * width + self.columns[drop]
+        chars = canvas.chars.reshape(-1)
+        colored = canvas.colored.reshape(-1)
+        chars[self._lit] = 32
+        colored[self._lit] = False
+        chars[lit] = self.glyphs[drop, distance % GLYPH_RING]
+        canvas.rgb.reshape(-1, 3)[lit] = rgb
+        colored[lit] = True
+
+        touched = [self._lit, lit]
+        shift = None
+        lines = self._scroll_hint(moved, drop, height)
+        if lines:
+            shift = (0, height, lines)
+            # Where the scroll moves last frame's lit cells
+            landed = self._lit + lines * width
+            touched.append(landed[landed < width * height])
+        patch = self.diff.patch(cells=np.concatenate(touched), shift=shift)
+        self._lit = lit
+        return patch
@@ -1,10 +1,12 @@
 import math
 import sys
 import os
+import numpy as np
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from core.visual_base import VisualBase
-from core.utils import rgb_to_ansi, reset_color
+from core.canvas import Canvas, hash2d
+from core.raster3d import Camera, rotation_matrix
 
 class MobiusVisual(VisualBase):
     """3D rotating Möbius strip with dynamic colors"""
@@ -16,132 +18,94 @@ class MobiusVisual(VisualBase):
         "description": "3D rotating Möbius strip with mathematical precision and flowing colors"
     }
     
+    # Mesh resolution at the reference size (strip scale ~10 cells); larger
+    # terminals get proportionally denser meshes so the surface stays solid
+    U_STEPS = 120  # Parameter along the strip
+    V_STEPS = 30  # Parameter across the width
+    REFERENCE_SCALE = 10.8  # min(80, 24) * 0.45
+
     def __init__(self):
         self.rotation_x = 0
         self.rotation_y = 0
         self.rotation_z = 0
-        
+        self.canvas = Canvas(depth=True)
+        # Perspective projection; Y compressed for the terminal aspect ratio
+        self.camera = Camera(distance=200, aspect_y=-0.5)
+        self.mesh_density = None
+
+    def _build_mesh(self, density):
+        """Unit-scale surface points, chars and color basis for a density factor"""
+        self.mesh_density = density
+        u_steps = self.U_STEPS * density
+        v_steps = self.V_STEPS * density
+        u_i, v_i = np.meshgrid(np.arange(u_steps), np.arange(v_steps), indexing='ij')
+        u_i = u_i.ravel()
+        v_i = v_i.ravel()
+        u = (u_i / u_steps) * 4 * math.pi - 2 * math.pi  # -2π to 2π
+        v = (v_i / v_steps) * 2 - 1  # -1 to 1
+
+        # Möbius strip parametric equations
+        radius = 1 + 0.5 * v * np.cos(u / 2)
+        self.points = np.stack([radius * np.cos(u), radius * np.sin(u), 0.5 * v * np.sin(u / 2)], axis=1)
+        # Color phase is u + t: sin(u + a) = sin(u)cos(a) + cos(u)sin(a)
+        self.sin_u = np.sin(u)
+        self.cos_u = np.cos(u)
+
+        # Choose character based on surface normal/orientation; grid lines keep
+        # the same width in parameter space at any density
+        abs_v = np.abs(v)
+        self.surface_chars = np.where(
+            (u_i % (4 * density) < density) | (v_i % (3 * density) < density), ord('█'),
+            np.where(abs_v > 0.7, ord('▓'), np.where(abs_v > 0.4, ord('▒'), ord('░')))
+        ).astype(np.uint32)
+
     def generate_frame(self, width, height, time_offset):
         # Update rotation angles
         self.rotation_x = time_offset * 0.8
         self.rotation_y = time_offset * 1.2
         self.rotation_z = time_offset * 0.5
-        
-        # Create frame buffer
-        frame_buffer = [[' ' for _ in range(width)] for _ in range(height)]
-        color_buffer = [['' for _ in range(width)] for _ in range(height)]
-        z_buffer = [[-float('inf') for _ in range(width)] for _ in range(height)]
-        
-        # Center coordinates
-        cx, cy = width // 2, height // 2
-        
-        # Generate Möbius strip points - more detail for larger size
-        u_steps = 120  # Parameter along the strip
-        v_steps = 30  # Parameter across the width
-        
-        for u_i in range(u_steps):
-            for v_i in range(v_steps):
-                # Parametric equations for Möbius strip
-                u = (u_i / u_steps) * 4 * math.pi - 2 * math.pi  # -2π to 2π
-                v = (v_i / v_steps) * 2 - 1  # -1 to 1
-                
-                # Möbius strip parametric equations
-                x = (1 + 0.5 * v * math.cos(u/2)) * math.cos(u)
-                y = (1 + 0.5 * v * math.cos(u/2)) * math.sin(u)
-                z = 0.5 * v * math.sin(u/2)
-                
-                # Scale the strip - even larger!
-                scale = min(width, height) * 0.45
-                x *= scale
-                y *= scale
-                z *= scale
-                
-                # 3D rotation matrices
-                # Rotation around X axis
-                y_rot = y * math.cos(self.rotation_x) - z * math.sin(self.rotation_x)
-                z_rot = y * math.sin(self.rotation_x) + z * math.cos(self.rotation_x)
-                y, z = y_rot, z_rot
-                
-                # Rotation around Y axis
-                x_rot = x * math.cos(self.rotation_y) + z * math.sin(self.rotation_y)
-                z_rot = -x * math.sin(self.rotation_y) + z * math.cos(self.rotation_y)
-                x, z = x_rot, z_rot
-                
-                # Rotation around Z axis
-                x_rot = x * math.cos(self.rotation_z) - y * math.sin(self.rotation_z)
-                y_rot = x * math.sin(self.rotation_z) + y * math.cos(self.rotation_z)
-                x, y = x_rot, y_rot
-                
-                # Project to 2D (perspective projection)
-                distance = 200
-                if z > -distance:
-                    factor = distance / (distance + z)
-                    screen_x = int(cx + x * factor)
-                    screen_y = int(cy - y * factor * 0.5)  # Compress Y for terminal aspect ratio
-                    
-                    # Check bounds
-                    if 0 <= screen_x < width and 0 <= screen_y < height:
-                        # Z-buffer test
-                        if z > z_buffer[screen_y][screen_x]:
-                            z_buffer[screen_y][screen_x] = z
-                            
-                            # Choose character based on surface normal/orientation
-                            if u_i % 4 == 0 or v_i % 3 == 0:
-                                char = '█'
-                            elif abs(v) > 0.7:
-                                char = '▓'
-                            elif abs(v) > 0.4:
-                                char = '▒'
-                            else:
-                                char = '░'
-                            
-                            frame_buffer[screen_y][screen_x] = char
-                            
-                            # Dynamic color based on position and time
-                            color_phase = u + time_offset * 2
-                            r = int(128 + 127 * math.sin(color_phase))
-                            g = int(128 + 127 * math.sin(color_phase + 2))
-                            b = int(128 + 127 * math.sin(color_phase + 4))
-                            
-                            # Adjust brightness based on Z (depth)
-                            brightness = (z + scale) / (2 * scale)
-                            brightness = max(0.3, min(1.0, brightness))
-                            
-                            r = int(r * brightness)
-                            g = int(g * brightness)
-                            b = int(b * brightness)
-                            
-                            color_buffer[screen_y][screen_x] = rgb_to_ansi(r, g, b)
-        
-        # Add some sparkles on the strip edges
-        for _ in range(width // 8):
-            for y in range(height):
-                for x in range(width):
-                    if frame_buffer[y][x] != ' ':
-                        # Check if it's an edge (has empty neighbor)
-                        is_edge = False
-                        for dx in [-1, 0, 1]:
-                            for dy in [-1, 0, 1]:
-                                nx, ny = x + dx, y + dy
-                                if 0 <= nx < width and 0 <= ny < height:
-                                    if frame_buffer[ny][nx] == ' ':
-                                        is_edge = True
-                                        break
-                            if is_edge:
-                                break
-                        
-                        if is_edge and hash((x, y, int(time_offset * 10))) % 100 < 5:
-                            color_buffer[y][x] = rgb_to_ansi(255, 255, 255)
-                            frame_buffer[y][x] = '✦'
-        
-        # Convert to pattern format
-        pattern = []
-        for y in range(height):
-            row = ""
-            for x in range(width):
-                char = frame_buffer[y][x]
-                color = color_buffer[y][x]
-                row += color + char
-            pattern.append(row + reset_color())
-        
-        return pattern
\ No newline at end of file
+
+        canvas = self.canvas
+        canvas.resize(width, height)
+        canvas.clear()
+
+        # Scale the strip - even larger!
+        scale = min(width, height) * 0.45
+        density = max(1, round(scale / self.REFERENCE_SCALE))
+        if density != self.mesh_density:
+            self._build_mesh(density)
+
+        # Rotate and scale every mesh point in one multiply
+        camera = self.camera
+        camera.center = (width // 2, height // 2)
+        camera.orient(rotation_matrix(
+            ('x', self.rotation_x), ('y', self.rotation_y), ('z', self.rotation_z)
+        ), scale)
+        points = camera.transform(self.points)
+        z = points[:, 2]
+
+        # Dynamic color based on position and time
+        rgb = np.empty((z.size, 3), dtype=np.int32)
+        for channel, offset in enumerate((0, 2, 4)):
+            phase = time_offset * 2 + offset
+            wave = self.sin_u * math.cos(phase) + self.cos_u * math.sin(phase)
+            rgb[:, channel] = 128 + 127 * wave
+
+        # Adjust brightness based on Z (depth)
+        brightness = np.clip((z + scale) / (2 * scale), 0.3, 1.0)
+        rgb = (rgb * brightness[:, None]).astype(np.int32)
+
+        camera.draw(canvas, points, self.surface_chars, rgb, rotated=True)
+
+        # Add some sparkles on the strip edges (a drawn cell with an empty neighbor)
+        empty = canvas.chars == ord(' ')
+        padded = np.zeros((height + 2, width + 2), dtype=bool)
+        padded[1:-1, 1:-1] = empty
+        near_empty = np.zeros_like(empty)
+        for dy in (0, 1, 2):
+            for dx in (0, 1, 2):
+                near_empty |= padded[dy:dy + height, dx:dx + width]
+        noise = hash2d(canvas.xs, canvas.ys, int(time_offset * 10)) % 100
+        canvas.paint(~empty & near_empty & (noise < 5), '✦', (255, 255, 255))
+
+        return canvas.to_rows()
@@ -1,12 +1,16 @@
 import math
-import random
 import sys
 import os
+import numpy as np
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from core.visual_base import VisualBase
-from core.utils import rgb_to_ansi, reset_color
+from core.canvas import Canvas, codepoints
+from core.color import hsv_to_rgb
+from core.reaction_diffusion import GrayScott
+from core.resample import BilinearSampler
+from core import profiler
 
 
 class MyceliumObservatoryVisual(VisualBase):
@@ -20,55 +24,76 @@ class MyceliumObservatoryVisual(VisualBase):
         "ai_creator": "gpt-5-codex",
     }
 
+    # Same spores and growth on every run
+    rng_seed = 1337
+
+    # Simulation grid when VISUAL_MYCELIUM_SIM_RATIO is not set: the same
+    # pattern scale and cost on every display, resampled at compose time
+    sim_size = (160, 48)
+
     def __init__(self):
-        random.seed(1337)
         self.prev_size = (0, 0)
-        self.u_field = []
-        self.v_field = []
-        self.rd_buffer_u = []
-        self.rd_buffer_v = []
-        self.glow = []
+        self.sim_grid = (0, 0)
+        self.sampler = None
+        self.glow = None
         self.branches = []
         self.frame_count = 0
         self.char_ramp = [" ", ".", "·", "*", "o", "0", "#", "▒", "▓", "█"]
+        self.ramp = codepoints("".join(self.char_ramp))
+        self.canvas = Canvas()
         self.branch_limit = 22
         self.aspect = 1.8  # compensate terminal cell proportions
-        self.wave_x = []
-        self.wave_y = []
-        self.col_wave_x = []
-        self.col_wave_y = []
-        self.vein = []
-        self.ortho_weight = 0.5
-        self.diag_weight = 0.2
-        self.center_weight = self.ortho_weight * 4 + self.diag_weight * 4
+        self.vein = None
         self.spore_interval = 120
 
         # Gray-Scott parameters
-        self.Du = 0.16
-        self.Dv = 0.08
         self.feed = 0.035
         self.kill = 0.062
-        self.dt = 1.0
-
-    def _ensure_state(self, width, height):
-        if (width, height) == self.prev_size:
-            return
-
-        self.prev_size = (width, height)
-        total = width * height
-
-        self.u_field = [1.0 for _ in range(total)]
-        self.v_field = [0.0 for _ in range(total)]
-        self.rd_buffer_u = [0.0 for _ in range(total)]
-        self.rd_buffer_v = [0.0 for _ in range(total)]
-        self.glow = [0.0 for _ in range(total)]
+        self.rd = GrayScott(du=0.16, dv=0.08, dt=1.0, ortho=0.5, diag=0.2)
+        # Simulation steps per frame; 0 scales them with the simulation
+        # grid so growth fronts still cross big grids (VISUAL_MYCELIUM_SUBSTEPS)
+        try:
+            self.substeps = max(0, int(os.getenv('VISUAL_MYCELIUM_SUBSTEPS', 0)))
+        except ValueError:
+            self.substeps = 0
+        # Simulation cells per display cell (e.g. 0.5 = half resolution);
+        # 0 uses the fixed sim_size grid
+        try:
+            self.sim_ratio = max(0.0, float(os.getenv('VISUAL_MYCELIUM_SIM_RATIO', 0)))
+        except ValueError:
+            self.sim_ratio = 0.0
+
+    @property
+    def u_field(self):
+        return self.rd.u
+
+    @property
+    def v_field(self):
+        return self.rd.v
+
+    def _sim_dimensions(self, width, height):
+        if self.sim_ratio:
+            return max(1, round(width * self.sim_ratio)), max(1, round(height * self.sim_ratio))
+        return self.sim_size
+
+    def _reset_simulation(self, width, height):
+        self.sim_grid = (width, height)
+        self.rd.resize(width, height)
+        self.glow = np.zeros((height, width), dtype=np.float32)
         self.branches = []
-        self.vein = [0.0 for _ in range(total)]
+        self.vein = np.zeros((height, width), dtype=np.float32)
         self.frame_count = 0
-        self.wave_x = [(random.random() - 0.5) * 2.0 + x * 0.12 for x in range(width)]
-        self.wave_y = [(random.random() - 0.5) * 2.0 + y * 0.17 for y in range(height)]
-        self.col_wave_x = [math.sin(x * 0.11) for x in range(width)]
-        self.col_wave_y = [math.cos(y * 0.09) for y in range(height)]
+        wave_x = [(self.rng.random() - 0.5) * 2.0 + x * 0.12 for x in range(width)]
+        wave_y = [(self.rng.random() - 0.5) * 2.0 + y * 0.17 for y in range(height)]
+        # Feed/kill wave phase per cell, split so each substep only needs
+        # sin/cos of its scalar phase shift (angle-addition identities)
+        phase = np.add.outer(np.array(wave_y), np.array(wave_x))
+        self.wave_sin = np.sin(phase).astype(np.float32)
+        self.wave_cos = np.cos(phase).astype(np.float32)
+        self.wave_sin12 = np.sin(phase * 1.2).astype(np.float32)
+        self.wave_cos12 = np.cos(phase * 1.2).astype(np.float32)
+        self._feed = np.empty((height, width), dtype=np.float32)
+        self._kill = np.empty((height, width), dtype=np.float32)
 
         # Seed initial nutrient patches
         for _ in range(12):
@@ -78,36 +103,64 @@ class MyceliumObservatoryVisual(VisualBase):
         for _ in range(12):
             self._spawn_branch(width, height)
 
-    def _index(self, width, x, y):
-        return y * width + x
+    def _ensure_state(self, width, height):
+        if (width, height) == self.prev_size:
+            return
+
+        self.prev_size = (width, height)
+        sim_width, sim_height = self._sim_dimensions(width, height)
+        if (sim_width, sim_height) != self.sim_grid:
+            self._reset_simulation(sim_width, sim_height)
+        # Fields are toroidal, so sampling wraps around the edges too
+        self.sampler = BilinearSampler(sim_width, sim_height, width, height, wrap=True)
+
+        self.canvas.resize(width, height)
+        # Compose-time coordinates: column/row waves and cell offsets
+        xs = np.arange(width, dtype=np.float32)
+        ys = np.arange(height, dtype=np.float32)
+        self.col_wave_x = np.sin(xs * 0.11)[None, :]
+        self.col_wave_y = np.cos(ys * 0.09)[:, None]
+        self.col_x = xs[None, :]
+        self.row_y = ys[:, None]
+        self.depth_offset = (xs[None, :] - width * 0.5) * 0.07 + (ys[:, None] - height * 0.5) * 0.05
+
+    def _disk(self, width, height, x, y, radius):
+        """Toroidal row/column indices and distances of a disk around (x, y)"""
+        cx = int(x) % width
+        cy = int(y) % height
+        offsets = np.arange(-radius, radius + 1)
+        dy, dx = offsets[:, None], offsets[None, :]
+        rows = ((cy + offsets) % height)[:, None]
+        cols = ((cx + offsets) % width)[None, :]
+        return np.broadcast_to(rows, (offsets.size,) * 2), np.broadcast_to(cols, (offsets.size,) * 2), dx, dy
 
     def _seed_spot(self, width, height):
-        cx = random.randint(int(width * 0.2), int(width * 0.8))
-        cy = random.randint(int(height * 0.2), int(height * 0.8))
-        radius = random.randint(2, max(3, min(width, height) // 8))
-        for y in range(max(0, cy - radius), min(height, cy + radius)):
-            for x in range(max(0, cx - radius), min(width, cx + radius)):
-                dx = x - cx
-                dy = y - cy
-                if dx * dx + dy * dy <= radius * radius:
-                    idx = self._index(width, x, y)
-                    self.v_field[idx] = min(1.0, self.v_field[idx] + random.uniform(0.2, 0.6))
-                    self.u_field[idx] = max(0.2, self.u_field[idx] - random.uniform(0.05, 0.1))
+        cx = self.rng.randint(int(width * 0.2), int(width * 0.8))
+        cy = self.rng.randint(int(height * 0.2), int(height * 0.8))
+        radius = self.rng.randint(2, max(3, min(width, height) // 8))
+        ys = np.arange(max(0, cy - radius), min(height, cy + radius))[:, None]
+        xs = np.arange(max(0, cx - radius), min(width, cx + radius))[None, :]
+        inside = (xs - cx) ** 2 + (ys - cy) ** 2 <= radius * radius
+        ys, xs = np.broadcast_arrays(ys, xs)
+        ys, xs = ys[inside], xs[inside]
+        v, u = self.v_field, self.u_field
+        v[ys, xs] = np.minimum(1.0, v[ys, xs] + self.rng.batch(ys.size, 0.2, 0.6))
+        u[ys, xs] = np.maximum(0.2, u[ys, xs] - self.rng.batch(ys.size, 0.05, 0.1))
 
     def _spawn_branch(self, width, height):
         if len(self.branches) >= self.branch_limit:
             return
 
-        x = random.uniform(0, width - 1)
-        y = random.uniform(0, height - 1)
-        angle = random.uniform(0, math.tau)
+        x = self.rng.uniform(0, width - 1)
+        y = self.rng.uniform(0, height - 1)
+        angle = self.rng.uniform(0, math.tau)
         branch = {
             "x": x,
             "y": y,
             "dx": math.cos(angle),
             "dy": math.sin(angle) / self.aspect,
             "age": 0,
-            "burst": random.uniform(0.12, 0.35),
+            "burst": self.rng.uniform(0.12, 0.35),
         }
         self.branches.append(branch)
 
@@ -115,35 +168,24 @@ class MyceliumObservatoryVisual(VisualBase):
         ix = int(x)
         iy = int(y)
         if 0 <= ix < width and 0 <= iy < height:
-            idx = self._index(width, ix, iy)
             if glow_amt:
-                self.glow[idx] = min(2.0, self.glow[idx] + glow_amt)
+                self.glow[iy, ix] = min(2.0, self.glow[iy, ix] + glow_amt)
             if trail_amt:
-                self.vein[idx] = min(1.6, self.vein[idx] + trail_amt)
+                self.vein[iy, ix] = min(1.6, self.vein[iy, ix] + trail_amt)
 
     def _enrich_patch(self, width, height, x, y, radius, intensity):
         if width == 0 or height == 0:
             return
 
-        cx = int(x) % width
-        cy = int(y) % height
-        w = width
-        v_field = self.v_field
-        u_field = self.u_field
-        for dy in range(-radius, radius + 1):
-            yy = (cy + dy) % height
-            row = yy * w
-            abs_dy = abs(dy)
-            for dx in range(-radius, radius + 1):
-                if abs(dx) + abs_dy > radius:
-                    continue
-                xx = (cx + dx) % width
-                idx = row + xx
-                falloff = 1.0 - (abs(dx) + abs_dy) / (radius + 1.0)
-                boost = intensity * falloff
-                v_field[idx] = min(1.3, v_field[idx] + 0.09 * boost)
-                u_field[idx] = max(0.0, u_field[idx] - 0.04 * boost)
-                self.vein[idx] = min(1.4, self.vein[idx] + 0.05 * boost)
+        rows, cols, dx, dy = self._disk(width, height, x, y, radius)
+        manhattan = np.abs(dx) + np.abs(dy)
+        inside = manhattan <= radius
+        rows, cols = rows[inside], cols[inside]
+        boost = intensity * (1.0 - manhattan[inside] / (radius + 1.0))
+        v, u, vein = self.v_field, self.u_field, self.vein
+        v[rows, cols] = np.minimum(1.3, v[rows, cols] + 0.09 * boost)
+        u[rows, cols] = np.maximum(0.0, u[rows, cols] - 0.04 * boost)
+        vein[rows, cols] = np.minimum(1.4, vein[rows, cols] + 0.05 * boost)
 
     def _advance_branches(self, width, height, time_offset):
         if not self.branches:
@@ -156,8 +198,8 @@ class MyceliumObservatoryVisual(VisualBase):
             gx = self._sample_gradient(self.v_field, width, height, branch["x"], branch["y"], axis=0)
             gy = self._sample_gradient(self.v_field, width, height, branch["x"], branch["y"], axis=1)
 
-            branch["dx"] = branch["dx"] * 0.65 + gradient_scale * gx + random.uniform(-0.1, 0.1)
-            branch["dy"] = branch["dy"] * 0.65 + gradient_scale * gy + random.uniform(-0.08, 0.08)
+            branch["dx"] = branch["dx"] * 0.65 + gradient_scale * gx + self.rng.uniform(-0.1, 0.1)
+            branch["dy"] = branch["dy"] * 0.65 + gradient_scale * gy + self.rng.uniform(-0.08, 0.08)
 
             norm = math.hypot(branch["dx"], branch["dy"] * self.aspect)
             if norm > 1e-5:
@@ -184,7 +226,7 @@ class MyceliumObservatoryVisual(VisualBase):
                 0.05,
                 0.12,
             )
-            if random.random() < 0.08:
+            if self.rng.random() < 0.08:
                 self._deposit_energy(
                     width,
                     height,
@@ -195,9 +237,9 @@ class MyceliumObservatoryVisual(VisualBase):
                 )
 
             if branch["age"] % 7 == 0:
-                idx = self._index(width, int(branch["x"]), int(branch["y"]))
-                self.v_field[idx] = min(1.2, self.v_field[idx] + 0.08 * branch["burst"])
-                self.u_field[idx] = max(0.0, self.u_field[idx] - 0.04 * branch["burst"])
+                ix, iy = int(branch["x"]), int(branch["y"])
+                self.v_field[iy, ix] = min(1.2, self.v_field[iy, ix] + 0.08 * branch["burst"])
+                self.u_field[iy, ix] = max(0.0, self.u_field[iy, ix] - 0.04 * branch["burst"])
             if branch["age"] % 45 == 0:
                 self._enrich_patch(width, height, branch["x"], branch["y"], 3, 0.8 + branch["burst"])
 
@@ -210,7 +252,7 @@ class MyceliumObservatoryVisual(VisualBase):
             if (
                 branch["age"] > 120
                 and len(self.branches) < self.branch_limit
-                and random.random() < 0.02
+                and self.rng.random() < 0.02
             ):
                 child = {
                     "x": branch["x"],
@@ -218,7 +260,7 @@ class MyceliumObservatoryVisual(VisualBase):
                     "dx": branch["dy"],
                     "dy": -branch["dx"],
                     "age": 0,
-                    "burst": random.uniform(0.1, 0.28),
+                    "burst": self.rng.uniform(0.1, 0.28),
                 }
                 self.branches.append(child)
 
@@ -228,238 +270,139 @@ class MyceliumObservatoryVisual(VisualBase):
 
         ix = int(fx) % width
         iy = int(fy) % height
-        row = iy * width
 
         if axis == 0:
-            left = field[row + (ix - 1) % width]
-            right = field[row + (ix + 1) % width]
-            return (right - left) * 0.5
+            left = field[iy, (ix - 1) % width]
+            right = field[iy, (ix + 1) % width]
+            return float(right - left) * 0.5
         else:
-            up = field[((iy - 1) % height) * width + ix]
-            down = field[((iy + 1) % height) * width + ix]
-            return (down - up) * 0.5
+            up = field[(iy - 1) % height, ix]
+            down = field[(iy + 1) % height, ix]
+            return float(down - up) * 0.5
 
     def _spore_burst(self, width, height):
         if not self.branches or width == 0 or height == 0:
             return
 
-        branch = random.choice(self.branches)
-        cx = int(branch["x"]) % width
-        cy = int(branch["y"]) % height
-        radius = random.randint(2, max(3, min(width, height) // 5))
-        glow = self.glow
-        v_field = self.v_field
-        u_field = self.u_field
-        w = width
-
-        for dy in range(-radius, radius + 1):
-            yy = (cy + dy) % height
-            row = yy * w
-            for dx in range(-radius, radius + 1):
-                dist_sq = dx * dx + dy * dy
-                if dist_sq > radius * radius:
-                    continue
-                xx = (cx + dx) % width
-                idx = row + xx
-                falloff = 1.0 - (dist_sq ** 0.5) / (radius + 1.0)
-                if falloff <= 0.0:
-                    continue
-                glow[idx] = min(1.8, glow[idx] + 0.7 * falloff)
-                v_field[idx] = min(1.4, v_field[idx] + 0.18 * falloff)
-                u_field[idx] = max(0.0, u_field[idx] - 0.07 * falloff)
-                self.vein[idx] = min(1.6, self.vein[idx] + 0.12 * falloff)
+        branch = self.rng.choice(self.branches)
+        radius = self.rng.randint(2, max(3, min(width, height) // 5))
+        rows, cols, dx, dy = self._disk(width, height, branch["x"], branch["y"], radius)
+        dist_sq = dx * dx + dy * dy
+        inside = dist_sq <= radius * radius
+        rows, cols = rows[inside], cols[inside]
+        falloff = 1.0 - np.sqrt(dist_sq[inside]) / (radius + 1.0)
+        glow, v, u, vein = self.glow, self.v_field, self.u_field, self.vein
+        glow[rows, cols] = np.minimum(1.8, glow[rows, cols] + 0.7 * falloff)
+        v[rows, cols] = np.minimum(1.4, v[rows, cols] + 0.18 * falloff)
+        u[rows, cols] = np.maximum(0.0, u[rows, cols] - 0.07 * falloff)
+        vein[rows, cols] = np.minimum(1.6, vein[rows, cols] + 0.12 * falloff)
 
     def _update_reaction_diffusion(self, width, height, time_offset):
         if width == 0 or height == 0:
             return
 
-        Du = self.Du
-        Dv = self.Dv
-        dt = self.dt
-        ortho = self.ortho_weight
-        diag = self.diag_weight
-        center = self.center_weight
-        wave_x = self.wave_x
-        wave_y = self.wave_y
-
         feed_base = self.feed + 0.005 * math.sin(time_offset * 0.05)
         kill_base = self.kill + 0.003 * math.cos(time_offset * 0.04)
+        feed = self._feed
+        kill = self._kill
 
-        u = self.u_field
-        v = self.v_field
-        buf_u = self.rd_buffer_u
-        buf_v = self.rd_buffer_v
+        substeps = self.substeps
+        if not substeps:
+            # Two steps at 80x24, more as the area grows (capped at 8)
+            substeps = max(2, min(8, round(2 * math.sqrt(width * height / (80 * 24)))))
 
-        for iteration in range(2):
+        for iteration in range(substeps):
             phase_shift = time_offset * 0.07 + iteration * 0.9
-            for y in range(height):
-                y_up = y - 1 if y > 0 else height - 1
-                y_down = y + 1 if y < height - 1 else 0
-                row = y * width
-                row_up = y_up * width
-                row_down = y_down * width
-                wave_y_val = wave_y[y]
-
-                for x in range(width):
-                    x_left = x - 1 if x > 0 else width - 1
-                    x_right = x + 1 if x < width - 1 else 0
-                    idx = row + x
-
-                    u_c = u[idx]
-                    v_c = v[idx]
-
-                    ortho_u = (
-                        u[row + x_left] + u[row + x_right] +
-                        u[row_up + x] + u[row_down + x]
-                    )
-                    diag_u = (
-                        u[row_up + x_left] + u[row_up + x_right] +
-                        u[row_down + x_left] + u[row_down + x_right]
-                    )
-                    lap_u = ortho_u * ortho + diag_u * diag - u_c * center
-
-                    ortho_v = (
-                        v[row + x_left] + v[row + x_right] +
-                        v[row_up + x] + v[row_down + x]
-                    )
-                    diag_v = (
-                        v[row_up + x_left] + v[row_up + x_right] +
-                        v[row_down + x_left] + v[row_down + x_right]
-                    )
-                    lap_v = ortho_v * ortho + diag_v * diag - v_c * center
-
-                    wave_phase = phase_shift + wave_x[x] + wave_y_val
-                    feed_local = feed_base + 0.006 * math.sin(wave_phase)
-                    kill_local = kill_base + 0.004 * math.cos(wave_phase * 1.2)
-
-                    uvv = u_c * v_c * v_c
-                    du = Du * lap_u - uvv + feed_local * (1.0 - u_c)
-                    dv = Dv * lap_v + uvv - (feed_local + kill_local) * v_c
-
-                    buf_u[idx] = max(0.0, min(1.2, u_c + du * dt))
-                    buf_v[idx] = max(0.0, min(1.2, v_c + dv * dt))
-
-            u, buf_u = buf_u, u
-            v, buf_v = buf_v, v
-
-        self.u_field = u
-        self.v_field = v
-        self.rd_buffer_u = buf_u
-        self.rd_buffer_v = buf_v
+            # feed = base + 0.006 * sin(shift + wave), kill = base + 0.004 * cos(1.2 * (shift + wave))
+            np.multiply(self.wave_cos, np.float32(0.006 * math.sin(phase_shift)), out=feed)
+            feed += np.float32(0.006 * math.cos(phase_shift)) * self.wave_sin
+            feed += np.float32(feed_base)
+            np.multiply(self.wave_cos12, np.float32(0.004 * math.cos(phase_shift * 1.2)), out=kill)
+            kill -= np.float32(0.004 * math.sin(phase_shift * 1.2)) * self.wave_sin12
+            kill += np.float32(kill_base)
+            self.rd.step(feed, kill)
 
         # Occasional nutrient surge
         if self.frame_count % 90 == 10:
             self._seed_spot(width, height)
 
-    def _hsv_to_rgb(self, h, s, v):
-        h = h % 1.0
-        s = max(0.0, min(1.0, s))
-        v = max(0.0, min(1.0, v))
-        i = int(h * 6)
-        f = h * 6 - i
-        p = v * (1 - s)
-        q = v * (1 - f * s)
-        t = v * (1 - (1 - f) * s)
-        i = i % 6
-        if i == 0:
-            r, g, b = v, t, p
-        elif i == 1:
-            r, g, b = q, v, p
-        elif i == 2:
-            r, g, b = p, v, t
-        elif i == 3:
-            r, g, b = p, q, v
-        elif i == 4:
-            r, g, b = t, p, v
-        else:
-            r, g, b = v, p, q
-        return int(r * 255), int(g * 255), int(b * 255)
-
     def _compose_frame(self, width, height, time_offset):
-        pattern = []
         if width == 0 or height == 0:
-            return pattern
+            return []
 
+        # Phases are wrapped to one turn so float32 keeps its precision
+        tau = math.tau
         flicker = 0.55 + 0.45 * math.sin(time_offset * 0.33)
-        swirl_phase = time_offset * 0.19
-        hue_time = time_offset * 0.23
-        spore_phase = time_offset * 0.52
-        parallax_phase = time_offset * 0.17
+        swirl_phase = (time_offset * 0.19 * 1.3) % tau
+        hue_time = (time_offset * 0.23) % tau
+        spore_phase = (time_offset * 0.52) % tau
+        spore_phase_slow = (time_offset * 0.52 * 0.8) % tau
+        parallax_phase = (time_offset * 0.17) % tau
         glow_decay = 0.92
         trail_decay = 0.955
 
-        glow = self.glow
-        u_field = self.u_field
-        v_field = self.v_field
-        vein = self.vein
-        ramp = self.char_ramp
-        ramp_max = len(ramp) - 1
-        col_wave_x = self.col_wave_x
-        col_wave_y = self.col_wave_y
-
-        for y in range(height):
-            row_chars = []
-            wave_y_val = col_wave_y[y] if col_wave_y else 0.0
-            row = y * width
-            for x in range(width):
-                idx = row + x
-                gl = glow[idx] * glow_decay
-                glow[idx] = gl
-                trail = vein[idx] * trail_decay
-                vein[idx] = trail
-                u_val = u_field[idx]
-                v_val = v_field[idx]
-
-                wave_phase = swirl_phase + col_wave_x[x] + wave_y_val
-                spore_wave = math.sin(spore_phase + x * 0.18 + wave_y_val * 1.7)
-                spore_wave += 0.6 * math.cos(spore_phase * 0.8 + x * 0.07 - y * 0.11)
-                spore = max(0.0, spore_wave) * (0.22 + 0.55 * (v_val + gl))
-
-                lum = v_val - 0.33 * u_val + gl + 0.18 * trail + 0.18 * math.sin(wave_phase * 1.3)
-                lum += 0.32 * spore
-                lum = max(0.0, min(1.4, lum))
-                lum = lum * (0.6 + lum * 0.4)
-                lum_norm = max(0.0, min(1.0, lum))
-
-                ramp_level = min(1.0, lum_norm + 0.35 * trail + 0.18 * spore)
-                ramp_idx = int(ramp_level * ramp_max)
-                ch = ramp[ramp_idx]
-
-                depth = 0.5 + 0.5 * math.sin(
-                    parallax_phase
-                    + (x - width * 0.5) * 0.07
-                    + (y - height * 0.5) * 0.05
-                    + v_val * 0.9
-                    - u_val * 0.6
-                )
-                depth = max(0.0, min(1.0, depth))
-
-                hue = 0.56 + 0.22 * math.sin(hue_time + col_wave_x[x] * 1.8 + wave_y_val * 1.2)
-                hue += 0.25 * (depth - 0.5) + 0.14 * ramp_level
-                sat = 0.6 + 0.32 * ramp_level + 0.12 * max(0.0, spore_wave)
-                val = 0.26 + 0.74 * (
-                    lum_norm * flicker
-                    + min(1.0, gl) * 0.35
-                    + depth * 0.25
-                    + trail * 0.28
-                )
-
-                r, g, b = self._hsv_to_rgb(hue, sat, val)
-                color = rgb_to_ansi(r, g, b) if ramp_level > 0.05 else ""
-
-                row_chars.append(color + ch if color else ch)
-
-            pattern.append("".join(row_chars) + reset_color())
-
-        return pattern
+        self.glow *= np.float32(glow_decay)
+        self.vein *= np.float32(trail_decay)
+        sample = self.sampler
+        gl = sample(self.glow)
+        trail = sample(self.vein)
+        u_val = sample(self.u_field)
+        v_val = sample(self.v_field)
+        wx, wy = self.col_wave_x, self.col_wave_y
+        x, y = self.col_x, self.row_y
+
+        # The sines of "column term + row term" are separable, so they are
+        # built from row and column vectors instead of per-cell sin calls:
+        # sin(a + b) = sin(a)cos(b) + cos(a)sin(b)
+        def wave_sin(col, row):
+            return np.sin(col) * np.cos(row) + np.cos(col) * np.sin(row)
+
+        def wave_cos(col, row):
+            return np.cos(col) * np.cos(row) - np.sin(col) * np.sin(row)
+
+        spore_wave = wave_sin(spore_phase + x * 0.18, wy * 1.7)
+        spore_wave += 0.6 * wave_cos(spore_phase_slow + x * 0.07, -y * 0.11)
+        spore_pos = np.maximum(spore_wave, 0)
+        spore = spore_pos * (0.22 + 0.55 * (v_val + gl))
+
+        lum = v_val - 0.33 * u_val + gl + 0.18 * trail
+        lum += 0.18 * wave_sin(swirl_phase + wx * 1.3, wy * 1.3)
+        lum += 0.32 * spore
+        np.clip(lum, 0.0, 1.4, out=lum)
+        lum *= 0.6 + lum * 0.4
+        lum_norm = np.minimum(lum, 1.0, out=lum)
+
+        ramp_level = np.minimum(lum_norm + 0.35 * trail + 0.18 * spore, 1.0)
+        ramp_idx = (ramp_level * (len(self.ramp) - 1)).astype(np.intp)
+
+        depth = np.sin(parallax_phase + self.depth_offset + v_val * 0.9 - u_val * 0.6)
+        depth = np.clip(0.5 + 0.5 * depth, 0.0, 1.0)
+
+        hue = 0.56 + 0.22 * wave_sin(hue_time + wx * 1.8, wy * 1.2)
+        hue += 0.25 * (depth - 0.5) + 0.14 * ramp_level
+        sat = 0.6 + 0.32 * ramp_level + 0.12 * spore_pos
+        val = 0.26 + 0.74 * (
+            lum_norm * flicker
+            + np.minimum(gl, 1.0) * 0.35
+            + depth * 0.25
+            + trail * 0.28
+        )
+
+        canvas = self.canvas
+        canvas.chars[...] = np.take(self.ramp, ramp_idx)
+        canvas.rgb[...] = hsv_to_rgb(hue, sat, val)
+        canvas.colored[...] = ramp_level > 0.05
+        return canvas.to_rows()
 
     def generate_frame(self, width, height, time_offset):
         self._ensure_state(width, height)
         self.frame_count += 1
 
-        self._update_reaction_diffusion(width, height, time_offset)
-        self._advance_branches(width, height, time_offset)
+        sim_width, sim_height = self.sim_grid
+        self._update_reaction_diffusion(sim_width, sim_height, time_offset)
+        self._advance_branches(sim_width, sim_height, time_offset)
         if self.frame_count % self.spore_interval == 0:
-            self._spore_burst(width, height)
+            self._spore_burst(sim_width, sim_height)
 
-        return self._compose_frame(width, height, time_offset)
+        with profiler.section("compose"):
+            return self._compose_frame(width, height, time_offset)
@@ -1,11 +1,15 @@
 import math
-import random
 import sys
 import os
+import numpy as np
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from core.visual_base import VisualBase
-from core.utils import rgb_to_ansi, reset_color
+from core.canvas import Canvas, codepoints
+from core.output import CanvasDiff
+from core.particles import ParticleSystem
+from core.density import OrbitDensity
+from core.accumulation import AccumulationBuffer
 
 class QuantumGhostVisual(VisualBase):
     """
@@ -35,17 +39,26 @@ class QuantumGhostVisual(VisualBase):
         # State
         self.palette = self._generate_psychedelic_palette()
         self.chars = "  .:-=+*#%@"
-        self.buffer = {} 
+        self.ramp = codepoints(self.chars)
+        self.buffer = AccumulationBuffer()
+        self.canvas = Canvas()
+        # Only cells that changed go out (the rain overlay is folded into the
+        # mirrored density, so it never shifts whole rows worth scrolling)
+        self.diff = CanvasDiff(self.canvas)
+        # 200k points per layer (was 20k sequential iterations); each hit is
+        # weighted so densities keep the scale the palette was tuned for
+        self.engine = OrbitDensity(orbits=4000, steps=50, rng=self.rng)
+        self.hit_weight = 20000 / self.engine.points
         self.width = 0
         self.height = 0
         
         # Effects
-        self.particles = [] # Explosions
+        self.particles = ParticleSystem(capacity=128) # Explosions
         self.matrix_drops = {} # Matrix rain
         self.glitch_mode = False
 
     def _generate_wild_params(self):
-        return [random.uniform(-3.0, 3.0) for _ in range(4)]
+        return [self.rng.uniform(-3.0, 3.0) for _ in range(4)]
 
     def _generate_psychedelic_palette(self):
         palette = []
@@ -54,14 +67,20 @@ class QuantumGhostVisual(VisualBase):
             r = int(127.5 + 127.5 * math.sin(6.28 * t))
             g = int(127.5 + 127.5 * math.sin(6.28 * t + 1.5)) 
             b = int(127.5 + 127.5 * math.sin(6.28 * t + 3.0))
-            palette.append(rgb_to_ansi(r, g, b))
-        return palette
+            palette.append((r, g, b))
+        return np.array(palette, dtype=np.uint8)
 
     def generate_frame(self, width, height, time_offset):
         if width != self.width or height != self.height:
-            self.buffer = {}
+            self.buffer.resize(width, height)
+            self.canvas.resize(width, height)
             self.width = width
             self.height = height
+            # Drops in columns that no longer exist would index past the edge
+            self.matrix_drops = {col: y for col, y in self.matrix_drops.items() if col < width}
+            # Starfield background (static)
+            xs, ys = self.canvas.xs, self.canvas.ys
+            self.stars = (xs * ys * 123 + xs) % 97 == 0
 
         # 1. Update Chaos Engines
         # -----------------------
@@ -69,75 +88,61 @@ class QuantumGhostVisual(VisualBase):
             self.params_1[i] += (self.target_1[i] - self.params_1[i]) * 0.02
             self.params_2[i] += (self.target_2[i] - self.params_2[i]) * 0.03
             
-            if random.random() > 0.98: self.target_1 = self._generate_wild_params()
-            if random.random() > 0.98: self.target_2 = self._generate_wild_params()
+            if self.rng.random() > 0.98: self.target_1 = self._generate_wild_params()
+            if self.rng.random() > 0.98: self.target_2 = self._generate_wild_params()
 
         # 2. Core Simulation (Dual Layer)
         # -------------------------------
-        density_map = {} # Sparse map
         scale = min(width, height) * 0.45
         cx, cy = width // 2, height // 2
-        
-        # Function to run solver
-        def run_solver(params, count, turbulence_func):
-            a, b, c, d = params
-            x, y = 0.1, 0.1
-            for _ in range(count):
-                xn = math.sin(a * y) + c * math.cos(a * x)
-                yn = math.sin(b * x) + d * math.cos(b * y)
-                x, y = xn, yn
-                
-                tx, ty = turbulence_func(x, y)
-                px = int(cx + tx * scale)
-                py = int(cy + ty * scale * 0.5)
-                
-                if 0 <= px < width and 0 <= py < height:
-                    density_map[(px, py)] = density_map.get((px, py), 0) + 1
+        # Orbits are float32; wrapping the time keeps sin(y + t) accurate
+        phase = np.float32(time_offset % (2 * math.pi))
+
+        def project(turbulence):
+            def to_cells(x, y):
+                tx, ty = turbulence(x, y)
+                return cx + tx * scale, cy + ty * scale * 0.5
+            return to_cells
 
         # Layer 1: Fluid
-        run_solver(self.params_1, 20000, 
-                   lambda x, y: (x + 0.2*math.sin(y+time_offset), y + 0.2*math.cos(x+time_offset)))
-        
+        density = self.engine.run(
+            self.params_1, width, height,
+            project(lambda x, y: (x + 0.2*np.sin(y+phase), y + 0.2*np.cos(x+phase))),
+            self.hit_weight)
+
         # Layer 2: Jitter
-        run_solver(self.params_2, 20000, 
-                   lambda x, y: (x + 0.4*math.cos(y*3), y + 0.4*math.sin(x*3)))
+        self.engine.run(
+            self.params_2, width, height,
+            project(lambda x, y: (x + 0.4*np.cos(y*3), y + 0.4*np.sin(x*3))),
+            self.hit_weight, out=density)
 
         # 3. Particle System (Explosions)
         # -------------------------------
         # Spawn new particles at high density points
-        if density_map:
-            # Find a few intense points
-            peaks = [k for k, v in density_map.items() if v > 5]
-            if peaks and random.random() > 0.5:
-                spawn = random.choice(peaks)
-                # Boom
-                for _ in range(5):
-                    self.particles.append({
-                        'x': spawn[0], 'y': spawn[1],
-                        'vx': random.uniform(-1, 1), 'vy': random.uniform(-0.5, 0.5),
-                        'life': 1.0,
-                        'color_idx': random.randint(0, 511)
-                    })
+        peaks = np.flatnonzero(density > 5)
+        if peaks.size and self.rng.random() > 0.5:
+            spawn_y, spawn_x = divmod(int(self.rng.choice(peaks)), width)
+            # Boom (life 1.0 fading by 0.05 per frame -> 20 frames)
+            self.particles.spawn(
+                5, x=spawn_x, y=spawn_y,
+                vx=[self.rng.uniform(-1, 1) for _ in range(5)],
+                vy=[self.rng.uniform(-0.5, 0.5) for _ in range(5)],
+                lifetime=20,
+            )
         
         # Update Particles
-        active_particles = []
-        for p in self.particles:
-            p['x'] += p['vx']
-            p['y'] += p['vy']
-            p['life'] -= 0.05
-            if p['life'] > 0:
-                active_particles.append(p)
-                px, py = int(p['x']), int(p['y'])
-                if 0 <= px < width and 0 <= py < height:
-                    # Add to density map directly for rendering
-                    density_map[(px, py)] = density_map.get((px, py), 0) + 10
-        self.particles = active_particles
+        self.particles.step()
+        px = self.particles.x.astype(int)
+        py = self.particles.y.astype(int)
+        inside = (px >= 0) & (px < width) & (py >= 0) & (py < height)
+        # Add to density map directly for rendering
+        np.add.at(density, (py[inside], px[inside]), 10)
 
         # 4. Matrix Rain Overlay (Subtle)
         # -------------------------------
         # Spawn drops
-        if random.random() > 0.7:
-            col = random.randint(0, width - 1)
+        if self.rng.random() > 0.7:
+            col = self.rng.randint(0, width - 1)
             self.matrix_drops[col] = 0
             
         # Update drops
@@ -147,62 +152,37 @@ class QuantumGhostVisual(VisualBase):
             if y_pos < height:
                 active_drops[col] = y_pos
                 # Add to density
-                density_map[(col, int(y_pos))] = density_map.get((col, int(y_pos)), 0) + 5
+                density[int(y_pos), col] += 5
         self.matrix_drops = active_drops
 
         # 5. Buffer & Render
         # ------------------
         # Decay buffer
-        remove_keys = []
-        for k in self.buffer:
-            self.buffer[k] *= 0.85 # Slower decay = longer trails
-            if self.buffer[k] < 0.5: remove_keys.append(k)
-        for k in remove_keys: del self.buffer[k]
-        
-        # Add density to buffer
-        for k, v in density_map.items():
-            self.buffer[k] = self.buffer.get(k, 0) + v * 5
+        self.buffer.decay(0.85, floor=0.5) # Slower decay = longer trails
 
-        max_val = 1
-        if self.buffer: max_val = max(self.buffer.values())
+        # Add density to buffer
+        self.buffer.add(density, 5)
 
         # Palette cycling
         shift = int(time_offset * 150) % 512
-        
-        pattern = []
-        for y in range(height):
-            row = ""
-            for x in range(width):
-                # Quad Symmetry
-                rx, ry = x, y
-                if x > width//2: rx = width-1-x
-                if y > height//2: ry = height-1-y
-                
-                val = self.buffer.get((rx, ry), 0)
-                
-                # Random Glitch
-                if random.random() > 0.999:
-                    row += rgb_to_ansi(255, 255, 255) + random.choice(["?", "!", "&", "$"])
-                    continue
-
-                if val > 1:
-                    norm = math.log(val) / math.log(max_val + 5)
-                    norm = min(1.0, norm * 1.4)
-                    
-                    char_idx = int(norm * (len(self.chars) - 1))
-                    char = self.chars[char_idx]
-                    
-                    # Color
-                    col_idx = (int(norm * 400) + shift) % 512
-                    color = self.palette[col_idx]
-                    
-                    row += color + char
-                else:
-                    # Starfield background (static)
-                    if (x * y * 123 + x) % 97 == 0:
-                         row += rgb_to_ansi(30, 30, 60) + "."
-                    else:
-                        row += " "
-            pattern.append(row + reset_color())
-            
-        return pattern
+
+        # Quad Symmetry
+        norm, lit = self.buffer.log_normalize(offset=5, gain=1.4, data=self.buffer.mirrored())
+
+        canvas = self.canvas
+        char_idx = (norm * (len(self.ramp) - 1)).astype(np.intp)
+        col_idx = ((norm * 400).astype(np.intp) + shift) % 512
+        canvas.chars[...] = np.where(lit, self.ramp[char_idx], np.where(self.stars, ord("."), ord(" ")))
+        # Unlit cells only show the starfield's dim blue (30, 30, 60)
+        canvas.rgb[...] = np.where(lit[..., None], self.palette[col_idx], np.uint8(30))
+        canvas.rgb[~lit, 2] = 60
+        canvas.colored[...] = lit | self.stars
+
+        # Random Glitch
+        glitch = self.rng.mask((height, width), 0.001)
+        count = int(glitch.sum())
+        if count:
+            glyphs = codepoints("?!&$")[self.rng.integers(0, 4, count)]
+            canvas.paint(glitch, glyphs, (255, 255, 255))
+
+        return self.diff.patch()
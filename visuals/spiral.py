@@ -1,13 +1,21 @@
-import math
 import sys
 import os
+import numpy as np
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from core.visual_base import VisualBase
-from core.utils import rgb_to_ansi, reset_color
+from core.shader import ShaderVisual
+from core.polar import PolarLookup, PolarTexture
 
-class SpiralVisual(VisualBase):
-    """Hypnotic spiral patterns radiating from center"""
+# Spiral values the colors are computed for
+SHADES = np.linspace(-1.0, 1.0, 256)
+
+
+class SpiralVisual(ShaderVisual):
+    """Hypnotic spiral patterns radiating from center
+
+    The spiral is a fixed wave in (radius, angle) that drifts outward and
+    turns, so it is sampled from a polar texture instead of evaluated.
+    """
     
     metadata = {
         "name": "Hypnotic Spiral", 
@@ -15,36 +23,32 @@ class SpiralVisual(VisualBase):
         "version": "1.0",
         "description": "Mesmerizing spiral patterns radiating from center"
     }
-    
-    def generate_frame(self, width, height, time_offset):
-        pattern = []
-        center_x, center_y = width // 2, height // 2
-        
-        for y in range(height):
-            row = ""
-            for x in range(width):
-                # Distance from center
-                dx = x - center_x
-                dy = y - center_y
-                distance = math.sqrt(dx*dx + dy*dy)
-                angle = math.atan2(dy, dx)
-                
-                # Spiral effect
-                spiral_val = math.sin(distance * 0.3 - time_offset * 2) * math.cos(angle * 3 + time_offset)
-                
-                # Color based on spiral value and position
-                r = int((math.sin(spiral_val + time_offset) + 1) * 127)
-                g = int((math.cos(spiral_val + time_offset + 1) + 1) * 127)  
-                b = int((math.sin(spiral_val + time_offset + 2) + 1) * 127)
-                
-                # Character selection
-                chars = " ·:;+=xX$&"
-                char_index = int((spiral_val + 1) * 4.5)
-                char_index = max(0, min(len(chars) - 1, char_index))
-                
-                char = chars[char_index]
-                color = rgb_to_ansi(r, g, b)
-                row += color + char
-                
-            pattern.append(row + reset_color())
-        return pattern
\ No newline at end of file
+
+    # Character selection
+    char_ramp = " ·:;+=xX$&"
+
+    # sin(rho) * cos(3 * phi): one radial period, one third of a turn
+    texture = PolarTexture(
+        lambda rho, phi: np.sin(rho) * np.cos(phi * 3),
+        extent=2 * np.pi, radial_bins=1024, angular_bins=512, folds=3, wrap=True,
+    )
+
+    def origin(self, width, height):
+        return width // 2, height // 2
+
+    def shade(self, grid, t):
+        # Spiral effect: sin(r * 0.3 - t * 2) * cos(theta * 3 + t)
+        lookup = grid.cached('polar', PolarLookup.of_grid)
+        spiral_val = self.texture.sample(lookup, rotate=-t / 3, zoom=0.3, shift=-t * 2)
+
+        # Color based on spiral value (a 256-entry palette per frame)
+        shades = SHADES + t
+        palette = np.stack((
+            (np.sin(shades) + 1) * 127,
+            (np.cos(shades + 1) + 1) * 127,
+            (np.sin(shades + 2) + 1) * 127,
+        ))
+        level = ((spiral_val + 1) * 127.5 + 0.5).astype(np.intp)
+        r, g, b = palette[:, level]
+
+        return (spiral_val + 1) / 2, (r, g, b)